@@ -1,32 +1,59 @@
 from flask_socketio import SocketIO, emit
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
 import os, time, shutil, zipfile, subprocess
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
 import json
 from pathlib import Path
 import tempfile
 import psutil
 import uuid
+import threading
+from collections import OrderedDict
 
-try:
-    from graph import agent
-    print("✅ Loaded self-healing agent")
-    AGENT_AVAILABLE = True
-except ImportError as e:
-    print(f"⚠️ Agent not available: {e}")
-    agent = None
-    AGENT_AVAILABLE = False
+# The graph (LangGraph, LangChain, pydantic models) is imported + compiled on first use
+agent = None
+AGENT_AVAILABLE = None  # unknown until get_agent() runs
 
-from tools import PROJECTS_ROOT, get_project_path, list_all_projects, project_exists
+def get_agent():
+    """Load the self-healing agent once; `agent` can be preset (e.g. a stub in benchmarks)"""
+    global agent, AGENT_AVAILABLE
+    if agent is None and AGENT_AVAILABLE is None:
+        try:
+            from graph import get_agent as build_agent
+            agent = build_agent()
+            print("✅ Loaded self-healing agent")
+        except ImportError as e:
+            print(f"⚠️ Agent not available: {e}")
+            agent = None
+        AGENT_AVAILABLE = agent is not None
+    return agent
+
+from paths import PROJECTS_ROOT, get_project_path, list_all_projects, project_exists, storage
+from telemetry import metrics, span
+from fast_path import try_fast_path
+from project_index import catalog as project_catalog
+from project_store import TEMP_PREFIX, detect_project_type, get_project_store, record_file_soon, update_store
+from lifecycle import discard_archive
+from file_batch import add_commit_listener, flush_staged, write_files
+from snapshots import get_snapshot_store, snapshot_before, undo_last_run
+from chat_store import ChatStore, SUMMARY_MODE, llm_summarizer, split_run_history
+from session_store import open_session_registry, WORKER_ID
 
 app = Flask(__name__)
 CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet")
-
-CURRENT_PROJECTS = {}
-RUNNING_PROCESSES = {}
+# Set by serve.py when several workers share clients (e.g. redis://localhost:6379/0)
+MESSAGE_QUEUE = os.getenv("DEVDOST_MESSAGE_QUEUE") or None
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode="eventlet", message_queue=MESSAGE_QUEUE)
+
+# session -> current project, project -> running dev server; shared across workers
+SESSIONS = open_session_registry()
+
+# chat history lives in the registry too, so a client reconnecting to another worker keeps it
+if SUMMARY_MODE == "llm":
+    import llms
+    chat_store = ChatStore(summarizer=llm_summarizer(llms.llm_fast), registry=SESSIONS)
+else:
+    chat_store = ChatStore(registry=SESSIONS)
 MAX_FILE_SIZE = 1024 * 1024
 
 # ==================================================USABLE FUNCTIONS=================================================
@@ -35,7 +62,7 @@ def safe_write_file(file_path, content):
     file_path = Path(file_path)
     temp_fd, temp_path = tempfile.mkstemp(
         dir=file_path.parent,
-        prefix=".tmp_",
+        prefix=TEMP_PREFIX,
         suffix=file_path.suffix
     )
 
@@ -59,7 +86,7 @@ def get_all_files(project_name=None):
     if project_name:
         projects = [project_name] if project_exists(project_name) else []
     else:
-        projects = list_all_projects()
+        projects = [p for p in list_all_projects() if not storage.is_archived(p)]  # no mass restore
 
     for proj in projects:
         project_path = get_project_path(proj)
@@ -102,43 +129,12 @@ def get_all_files(project_name=None):
 
     return files_data
 
-def detect_project_type(project_path):
-    """Detect project type"""
-    project_path = Path(project_path)
-
-    if (project_path / "package.json").exists():
-        try:
-            with open(project_path / "package.json", "r") as f:
-                package_data = json.load(f)
-                dependencies = package_data.get("dependencies", {})
-
-                if "next" in dependencies:
-                    return "nextjs"
-                elif "react" in dependencies:
-                    return "react"
-                else:
-                    return "nodejs"
-        except:
-            return "nodejs"
-
-    if (project_path / "requirements.txt").exists():
-        return "python"
-
-    if (project_path / "index.html").exists():
-        return "html"
-
-    if (project_path / "main.py").exists() or (project_path / "app.py").exists():
-        return "python"
-
-    return "unknown"
-
 def stop_project(project_name):
     """Stop a running project and ALL child processes"""
-    if project_name in RUNNING_PROCESSES:
-        process = RUNNING_PROCESSES[project_name]
-
+    entry = SESSIONS.get_process(project_name)
+    if entry is not None:
         try:
-            parent = psutil.Process(process.pid)
+            parent = psutil.Process(entry["pid"])
             children = parent.children(recursive=True)
 
             for child in children:
@@ -162,7 +158,7 @@ def stop_project(project_name):
         except Exception as e:
             print(f"⚠️ Stop error: {e}")
         finally:
-            del RUNNING_PROCESSES[project_name]
+            SESSIONS.remove_process(project_name)
             print(f"🛑 Stopped: {project_name}")
             socketio.emit("project_status", {
                 "project": project_name,
@@ -170,30 +166,42 @@ def stop_project(project_name):
                 "message": "Project stopped"
             })
 
+# first prompt (normalized) -> generated title; "todo app banao" is a very common opener
+CHAT_TITLE_CACHE = OrderedDict()
+CHAT_TITLE_CACHE_SIZE = 512
+_title_lock = threading.Lock()
+
+def _title_key(message):
+    return " ".join(message.lower().split())[:200]
+
+def cached_chat_name(user_message):
+    with _title_lock:
+        key = _title_key(user_message)
+        name = CHAT_TITLE_CACHE.get(key)
+        if name is not None:
+            CHAT_TITLE_CACHE.move_to_end(key)
+        return name
+
+def remember_chat_name(user_message, name):
+    with _title_lock:
+        CHAT_TITLE_CACHE[_title_key(user_message)] = name
+        CHAT_TITLE_CACHE.move_to_end(_title_key(user_message))
+        while len(CHAT_TITLE_CACHE) > CHAT_TITLE_CACHE_SIZE:
+            CHAT_TITLE_CACHE.popitem(last=False)
+
 def generate_chat_name_with_groq(user_message):
     """
-    Generate chat name using YOUR EXISTING llm_fast
+    Generate chat name using llm_fast (cached per first prompt)
     """
+    cached = cached_chat_name(user_message)
+    if cached:
+        return cached
     try:
-        prompt = f"""Generate a very short (2-4 words maximum) descriptive title for this chat:
+        import llms
+        from prompts import render_prompt
+        from telemetry import traced_invoke
 
-User message: "{user_message}"
-
-Rules:
-- Maximum 4 words
-- Be specific and clear
-- Use title case
-- NO quotes, NO special characters
-
-Examples:
-- "create a todo app" → React Todo App
-- "help me fix python bug" → Python Bug Fix
-- "build portfolio website" → Portfolio Website
-
-Return ONLY the title:"""
-
-        # ✅ ChatGroq (LangChain) syntax
-        response = llm_fast.invoke(prompt)  # Simple invoke
+        response = traced_invoke(llms.llm_fast, render_prompt("chat_title", user_message=user_message[:500]), "chat_name")
         
         # Extract content
         name = response.content.strip()
@@ -205,13 +213,23 @@ Return ONLY the title:"""
         if len(name) > 40:
             name = name[:40].rsplit(' ', 1)[0]
         
+        if not name:
+            return fallback_chat_name(user_message)
         print(f"✅ Generated chat name: {name}")
-        return name if name else fallback_chat_name(user_message)
+        remember_chat_name(user_message, name)
+        return name
         
     except Exception as e:
         print(f"⚠️ Groq naming error: {e}")
         return fallback_chat_name(user_message)
 
+def name_chat_in_background(chat_id, user_message, client_sid, placeholder):
+    """Background task: replace the placeholder title once the LLM answers"""
+    name = generate_chat_name_with_groq(user_message)
+    if name and name != placeholder:
+        socketio.emit("chat_name_generated", {"chat_id": chat_id, "name": name}, to=client_sid)
+        print(f"✅ Chat name sent: {name}")
+
 def fallback_chat_name(message):
     """Fallback if Groq fails"""
     stop_words = {'create', 'make', 'build', 'a', 'an', 'the', 'for', 'me', 'please', 'can', 'you', 'help'}
@@ -229,12 +247,19 @@ def test():
     """Test endpoint"""
     return jsonify({
         "status": "ok",
-        "agent_available": agent is not None,
+        "agent_available": AGENT_AVAILABLE is not False,
         "projects": list_all_projects()
     })
 
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus scrape endpoint (per-stage latency, tokens, fallbacks, cache hits)"""
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 @socketio.on("chat_message")
 def handle_chat_message(data):
+    # Reply to the asking client only; with a message queue this reaches it on any worker
+    client_sid = request.sid
     try:
         user_message = data.get("message", "")
         session_id = data.get("session_id", "default")
@@ -250,25 +275,52 @@ def handle_chat_message(data):
         print(f"🎯 First message: {is_first_message}")  # ✅ NEW
         print("="*60 + "\n")
 
-        current_project = CURRENT_PROJECTS.get(session_id)
+        current_project = SESSIONS.get_current_project(session_id)
 
-        # ✅ NEW: Generate chat name FIRST if first message (runs fast in background)
+        # Server-side bounded history; the client copy only seeds a chat we don't know yet
+        history_key = chat_id or session_id
+        if not chat_store.has(history_key):
+            chat_store.seed(history_key, data.get("chat_history", []))
+        context = chat_store.context(history_key)
+
+        # Chat name: placeholder (or cached title) now, LLM title later - never blocks the agent
         if is_first_message and chat_id:
             try:
-                print("📝 Generating chat name with Groq...")
-                chat_name = generate_chat_name_with_groq(user_message)
-                
-                # Emit name immediately
+                cached = cached_chat_name(user_message)
+                chat_name = cached or fallback_chat_name(user_message)
                 socketio.emit("chat_name_generated", {
                     "chat_id": chat_id,
                     "name": chat_name
-                })
-                print(f"✅ Chat name sent: {chat_name}")
+                }, to=client_sid)
+                if cached is None:
+                    socketio.start_background_task(name_chat_in_background, chat_id, user_message, client_sid, chat_name)
             except Exception as e:
                 print(f"⚠️ Chat naming skipped: {e}")
 
+        # Greetings / project list / project switch: answered without the graph or any LLM call
+        fast = try_fast_path(user_message, current_project)
+        if fast is not None:
+            if fast.current_project and fast.current_project != current_project:
+                SESSIONS.set_current_project(session_id, fast.current_project)
+            chat_store.add_turn(history_key, user_message, fast.message, [])
+            socketio.emit("chat_response", {
+                "success": True,
+                "message": fast.message,
+                "current_project": fast.current_project,
+                "chat_history": chat_store.window_dicts(history_key),
+                "status": "DONE"
+            }, to=client_sid)
+            chat_store.compact(history_key)
+            return
+
         # ✅ Rest of your existing code remains EXACTLY THE SAME
+        followed = {"project": current_project}
         def emit_progress_local(message, project_name=None, stage=None, thinking=False):
+            # a project being generated streams its files to this client as they are written
+            if project_name and project_name != followed.get("project"):
+                follow_project(client_sid, project_name)
+                followed["project"] = project_name
+
             payload = {
                 "message": message,
                 "project": project_name,
@@ -282,43 +334,49 @@ def handle_chat_message(data):
                 payload["thinking"] = True
 
             print(f"📡 Progress Emit: {payload}")
-            socketio.emit("ai_progress", payload, broadcast=True)
+            socketio.emit("ai_progress", payload, to=client_sid)
             socketio.sleep(0.05)
 
         state = {
             "user_prompt": user_message,
             "current_project": current_project,
-            "chat_history": data.get("chat_history", []),
+            "chat_history": context,
             "_emit_progress": emit_progress_local
         }
 
-        socketio.emit("agent_started", {"message": "Processing..."})
+        socketio.emit("agent_started", {"message": "Processing..."}, to=client_sid)
 
-        result = agent.invoke(state, config={"recursion_limit":100})
+        with span("agent.run", kind="run", source="socket", session_id=session_id):
+            chat_agent = get_agent()
+            if chat_agent is None:
+                raise RuntimeError("Agent not available")
+            result = chat_agent.invoke(state, config={"recursion_limit":100})
+        flush_staged(result.get("current_project"))  # a coder loop cut short leaves files staged
 
         if result.get("current_project"):
-            CURRENT_PROJECTS[session_id] = result["current_project"]
-
-        chat_history = result.get("chat_history", [])
-        response_message = ""
+            SESSIONS.set_current_project(session_id, result["current_project"])
 
-        if chat_history and chat_history[-1]["role"] == "assistant":
-            response_message = chat_history[-1]["content"]
+        response_message, progress_lines = split_run_history(result.get("chat_history", []), len(context))
 
         if not response_message:
             response_message = "✅ Completed"
 
+        chat_store.add_turn(history_key, user_message, response_message, progress_lines)
+
         socketio.emit("chat_response", {
             "success": True,
             "message": response_message,
             "current_project": result.get("current_project"),
-            "chat_history": chat_history,
+            "chat_history": chat_store.window_dicts(history_key),
             "status": result.get("status", "DONE")
-        })
+        }, to=client_sid)
+
+        # Fold old turns into the summary after replying, off the latency path
+        chat_store.compact(history_key)
 
     except Exception as e:
         print("❌ Chat error:", e)
-        socketio.emit("chat_error", {"error": str(e)})
+        socketio.emit("chat_error", {"error": str(e)}, to=client_sid)
 
 @app.route("/chat", methods=["POST"])
 def chat_http():
@@ -330,32 +388,58 @@ def chat_http():
 
 @app.route("/projects", methods=["GET"])
 def get_projects():
-    """Get list of all projects"""
+    """Get list of all projects (?q=name for a fuzzy search, best match first)"""
     try:
-        projects = list_all_projects()
+        query = request.args.get("q", "").strip()
+        if query:
+            limit = min(request.args.get("limit", 10, type=int), 100)
+            return jsonify({"projects": [name for name, _ in project_catalog.search(query, limit=limit)]})
+        if "page" in request.args or "sort" in request.args:
+            # paginated metadata from the project store (?page=1&per_page=50&sort=updated_at&order=desc)
+            page = max(request.args.get("page", 1, type=int), 1)
+            per_page = min(max(request.args.get("per_page", 50, type=int), 1), 500)
+            sort = request.args.get("sort", "name")
+            descending = request.args.get("order", "asc").lower() == "desc"
+            try:
+                items, total = get_project_store().list_projects((page - 1) * per_page, per_page, sort, descending)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify({
+                "projects": [item["name"] for item in items],
+                "items": items,
+                "page": page,
+                "per_page": per_page,
+                "total": total
+            })
+        projects = project_catalog.names()
         return jsonify({"projects": projects})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/projects/<project_name>", methods=["GET"])
 def get_project_info(project_name):
-    """Get project info"""
+    """Get project info (?files=0 for metadata only)"""
     try:
         if not project_exists(project_name):
             return jsonify({"error": "Project not found"}), 404
 
-        files = get_all_files(project_name)
-        project_path = get_project_path(project_name)
-        project_type = detect_project_type(project_path)
-        is_running = project_name in RUNNING_PROCESSES
-
-        return jsonify({
+        meta = get_project_store().get(project_name) or {}
+        is_running = SESSIONS.is_running(project_name)
+        info = {
             "name": project_name,
-            "file_count": len(files),
-            "files": files,
-            "type": project_type,
-            "is_running": is_running
-        })
+            "file_count": meta.get("file_count", 0),
+            "type": meta.get("techstack") or detect_project_type(get_project_path(project_name)),
+            "is_running": is_running,
+            "size_bytes": meta.get("size_bytes", 0),
+            "created_at": meta.get("created_at"),
+            "last_run": meta.get("last_run"),
+            "tree_hash": meta.get("tree_hash"),
+            "archived_at": meta.get("archived_at")
+        }
+        if request.args.get("files", "1") != "0":
+            info["files"] = get_all_files(project_name)
+
+        return jsonify(info)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -363,18 +447,20 @@ def get_project_info(project_name):
 def delete_project(project_name):
     """Delete a project"""
     try:
-        project_path = get_project_path(project_name)
-        if not project_path.exists():
+        if not project_exists(project_name):
             return jsonify({"error": "Project not found"}), 404
 
-        if project_name in RUNNING_PROCESSES:
+        if SESSIONS.is_running(project_name):
             stop_project(project_name)
 
-        shutil.rmtree(project_path)
+        discard_archive(project_name)  # an archived project is just its archive - nothing to restore
+        project_path = get_project_path(project_name)
+        if project_path.exists():
+            snapshot_before(project_name, "before-delete")
+            shutil.rmtree(project_path)
 
-        for sid in list(CURRENT_PROJECTS.keys()):
-            if CURRENT_PROJECTS[sid] == project_name:
-                del CURRENT_PROJECTS[sid]
+        SESSIONS.forget_project(project_name)
+        update_store("delete_project", project_name)
 
         socketio.emit("project_deleted", {"name": project_name})
 
@@ -392,7 +478,9 @@ def switch_project(project_name):
         if not project_exists(project_name):
             return jsonify({"error": "Project not found"}), 404
 
-        CURRENT_PROJECTS[session_id] = project_name
+        get_project_path(project_name)  # restores an archived project before the client loads it
+        update_store("touch", project_name)
+        SESSIONS.set_current_project(session_id, project_name)
 
         return jsonify({
             "success": True,
@@ -401,6 +489,67 @@ def switch_project(project_name):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/projects/<project_name>/snapshots", methods=["GET"])
+def list_snapshots(project_name):
+    """Snapshots of a project, newest first"""
+    try:
+        return jsonify({"project": project_name, "snapshots": get_snapshot_store().list(project_name)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/projects/<project_name>/snapshots", methods=["POST"])
+def take_snapshot(project_name):
+    """Snapshot the project now ({label} optional)"""
+    try:
+        if not project_exists(project_name):
+            return jsonify({"error": "Project not found"}), 404
+        get_project_path(project_name)
+        label = (request.get_json(silent=True) or {}).get("label", "manual")
+        manifest = get_snapshot_store().take(project_name, label=label)
+        return jsonify({"success": True, "id": manifest["id"], "file_count": len(manifest["files"])})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/projects/<project_name>/snapshots/diff", methods=["GET"])
+def diff_snapshots(project_name):
+    """?from=<id>&to=<id> (no `to` = the project as it is now)"""
+    try:
+        from_id = request.args.get("from")
+        if not from_id:
+            return jsonify({"error": "from snapshot id required"}), 400
+        return jsonify(get_snapshot_store().diff(project_name, from_id, request.args.get("to")))
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _after_restore(project_name, changes):
+    socketio.emit("project_restored", {"project": project_name, **changes})
+    return jsonify({"success": True, **changes})
+
+@app.route("/projects/<project_name>/snapshots/<snapshot_id>/restore", methods=["POST"])
+def restore_snapshot(project_name, snapshot_id):
+    """Make the project match a snapshot (only differing files are written)"""
+    try:
+        if SESSIONS.is_running(project_name):
+            stop_project(project_name)
+        return _after_restore(project_name, get_snapshot_store().restore(project_name, snapshot_id))
+    except KeyError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/projects/<project_name>/undo", methods=["POST"])
+def undo_project_run(project_name):
+    """Roll back the latest agent run"""
+    try:
+        changes = undo_last_run(project_name)
+        if changes is None:
+            return jsonify({"error": "No agent run to undo"}), 404
+        return _after_restore(project_name, changes)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/run_project", methods=["POST"])
 def run_project():
     """Manual run endpoint"""
@@ -414,7 +563,7 @@ def run_project():
         if not project_exists(project_name):
             return jsonify({"success": False, "error": "Project not found"}), 404
 
-        if project_name in RUNNING_PROCESSES:
+        if SESSIONS.is_running(project_name):
             return jsonify({
                 "success": False,
                 "error": "Project already running"
@@ -422,6 +571,7 @@ def run_project():
 
         project_path = get_project_path(project_name)
         project_type = detect_project_type(project_path)
+        update_store("record_run", project_name)
 
         socketio.emit("ai_progress", {
             "message": f"🚀 Starting {project_name}...",
@@ -437,7 +587,7 @@ def run_project():
                 text=True
             )
 
-            RUNNING_PROCESSES[project_name] = process
+            SESSIONS.register_process(project_name, process.pid, port=8000, kind=project_type)
 
             socketio.emit("project_status", {
                 "project": project_name,
@@ -458,6 +608,14 @@ def run_project():
                 "BROWSER": "none"
             }
 
+            # restored from the archive: dependencies are not archived
+            if not (project_path / "node_modules").exists():
+                socketio.emit("ai_progress", {
+                    "message": "📦 Installing dependencies...",
+                    "project": project_name
+                })
+                subprocess.run(["npm", "install"], cwd=str(project_path), capture_output=True, timeout=600)
+
             if os.name == 'posix':
                 process = subprocess.Popen(
                     cmd,
@@ -479,7 +637,7 @@ def run_project():
                     creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
                 )
 
-            RUNNING_PROCESSES[project_name] = process
+            SESSIONS.register_process(project_name, process.pid, port=port, kind=project_type)
 
             socketio.emit("project_status", {
                 "project": project_name,
@@ -506,7 +664,7 @@ def stop_project_endpoint():
         if not project_name:
             return jsonify({"success": False, "error": "No project specified"}), 400
 
-        if project_name not in RUNNING_PROCESSES:
+        if not SESSIONS.is_running(project_name):
             return jsonify({"success": False, "error": "Project not running"}), 400
 
         stop_project(project_name)
@@ -528,6 +686,7 @@ def get_files():
             return jsonify([])
 
         files = get_all_files(project_name)
+        update_store("touch", project_name)
         return jsonify(files)
     except Exception as e:
         print(f"❌ Get files error: {e}")
@@ -550,6 +709,7 @@ def create_file():
 
         file_path.parent.mkdir(parents=True, exist_ok=True)
         safe_write_file(file_path, content)
+        update_store("record_file", project_name, name, content)
 
         files = get_all_files(project_name)
         new_file = next((f for f in files if f["name"] == name), None)
@@ -584,11 +744,32 @@ def save_file():
 
         file_path.parent.mkdir(parents=True, exist_ok=True)
         safe_write_file(file_path, content)
+        update_store("record_file", project_name, name, content)
 
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/save_files", methods=["POST"])
+def save_files():
+    """Save many files at once ({project, files: [{name, content}]}) - one atomic batch, one broadcast"""
+    try:
+        data = request.get_json()
+        project_name = data.get("project")
+        files = data.get("files") or []
+
+        if not project_name or not files or any(not f.get("name") for f in files):
+            return jsonify({"error": "Project and file names required"}), 400
+
+        try:
+            written = write_files(project_name, {f["name"]: f.get("content", "") for f in files})
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({"success": True, "saved": len(written)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/delete_file", methods=["POST"])
 def delete_file():
     """Delete file"""
@@ -606,10 +787,12 @@ def delete_file():
         if not file_path.exists():
             return jsonify({"error": "File not found"}), 404
 
+        snapshot_before(project_name, "before-delete")
         if file_path.is_file():
             file_path.unlink()
         else:
             shutil.rmtree(file_path)
+        update_store("remove_file", project_name, name)
 
         socketio.emit("file_deleted", {
             "id": str(uuid.uuid4()),
@@ -641,6 +824,7 @@ def rename_file():
 
         new_path.parent.mkdir(parents=True, exist_ok=True)
         old_path.rename(new_path)
+        update_store("move_file", project_name, old_name, new_name)
 
         socketio.emit("file_renamed", {
             "id": str(uuid.uuid4()),
@@ -691,6 +875,7 @@ def handle_update(data):
 
         file_path.parent.mkdir(parents=True, exist_ok=True)
         safe_write_file(file_path, content)
+        record_file_soon(project_name, name)  # per keystroke: coalesced with the watcher's record of this write
 
         emit("file_updated", {
             "id": str(uuid.uuid4()),
@@ -704,74 +889,50 @@ def handle_update(data):
 
 # ============================================FILE HANDLING FOR TWO WAY SYNC============================================
 
-class FileChangeHandler(FileSystemEventHandler):
-    def __init__(self):
-        self.last_modified = {}
-
-    def on_any_event(self, event):
-        if event.is_directory:
-            return
-
-        # ignore our atomic temp files
-        if Path(event.src_path).name.startswith(".tmp_"):
-            return
-
-        now = time.time()
-        if event.src_path in self.last_modified:
-            if now - self.last_modified[event.src_path] < 0.5:
-                return
-
-        self.last_modified[event.src_path] = now
-
-        if event.event_type in ("modified", "created"):
-            try:
-                time.sleep(0.1)
+def start_watcher():
+    """Single-process mode: the watcher emits through this app's SocketIO"""
+    from watcher import watch_projects
+    watch_projects(socketio, SESSIONS)
+
+def broadcast_file_batch(project_name, files):
+    """One event for a whole FileBatch commit instead of one per file"""
+    socketio.emit("files_batch", {
+        "project": project_name,
+        "files": [dict(f, id=str(uuid.uuid4()), project=project_name) for f in files]
+    })
 
-                rel_path = os.path.relpath(event.src_path, PROJECTS_ROOT)
-                project_name = rel_path.split(os.sep)[0]
-                file_rel_path = os.sep.join(rel_path.split(os.sep)[1:])
+add_commit_listener(broadcast_file_batch)
 
-                # best-effort text read
-                try:
-                    with open(event.src_path, "r", encoding="utf-8") as f:
-                        content = f.read()
-                except UnicodeDecodeError:
-                    return  # skip binary
-
-                payload = {
-                    "id": str(uuid.uuid4()),
-                    "project": project_name,
-                    "name": file_rel_path,   # << correct variable
-                    "content": content
-                }
-
-                if event.event_type == "created":
-                    socketio.emit("file_created", payload, broadcast=True)
-                else:
-                    socketio.emit("file_updated", payload, broadcast=True)
+def follow_project(client_sid, project_name):
+    """Client `client_sid` now views `project_name`: the watcher watches it while any client does"""
+    try:
+        if project_name:
+            SESSIONS.watch(client_sid, project_name)
+        else:
+            SESSIONS.unwatch(client_sid)
+    except Exception as e:
+        print(f"⚠️ Watch subscription failed: {e}")
 
-            except Exception as e:
-                print(f"❌ Watcher error: {e}")
+@socketio.on("watch_project")
+def handle_watch_project(data):
+    """Frontend reports the project it shows (null → none)"""
+    follow_project(request.sid, (data or {}).get("project"))
 
-def start_watcher():
-    observer = Observer()
-    event_handler = FileChangeHandler()
-    observer.schedule(event_handler, str(PROJECTS_ROOT), recursive=True)
-    observer.start()
-    print(f"👀 Watching: {PROJECTS_ROOT}")
+@socketio.on("disconnect")
+def handle_disconnect():
+    follow_project(request.sid, None)
 
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        observer.stop()
-    observer.join()
+def warm_agent():
+    """Background warm-up so the first chat doesn't pay for imports + compile"""
+    if get_agent() is not None:
+        from graph import warm_up
+        warm_up()
 
 def cleanup():
-    """Stop all running processes"""
+    """Stop the processes this worker started (other workers keep theirs)"""
     print("\n🧹 Cleaning up...")
-    for project_name in list(RUNNING_PROCESSES.keys()):
-        stop_project(project_name)
+    for entry in SESSIONS.list_processes(owner=WORKER_ID):
+        stop_project(entry["project"])
 
 import atexit
 atexit.register(cleanup)
@@ -783,7 +944,7 @@ if __name__ == "__main__":
     print(f"📂 Projects: {PROJECTS_ROOT}")
     print(f"🌐 Server: http://localhost:5000")
     print(f"💬 Chat: SocketIO 'chat_message' event")
-    print(f"🤖 Agent: {'✅ Loaded' if agent else '❌ Not available'}")
+    print("🤖 Agent: ⏳ Loading in background")
     print(f"✅ Real-time: SocketIO streaming enabled")
     print(f"✅ Recursion limit: 100")
     print(f"✅ File size limit: {MAX_FILE_SIZE / 1024}KB")
@@ -793,6 +954,7 @@ if __name__ == "__main__":
 
     import threading
     threading.Thread(target=start_watcher, daemon=True).start()
+    socketio.start_background_task(warm_agent)
 
     socketio.run(
         app,
@@ -0,0 +1,43 @@
+"""
+Compact chat entries shared by the graph state (states.py) and chat_store.py
+Kept free of pydantic/langchain imports so the web app can load it cheaply.
+"""
+
+class ChatRecord:
+    """Compact chat entry kept in graph state - converted to dicts at the app boundary"""
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+    @classmethod
+    def coerce(cls, item) -> "ChatRecord":
+        if isinstance(item, cls):
+            return item
+        return cls(item.get("role", "assistant"), item.get("content", ""))
+
+    def __getitem__(self, key: str):
+        # dict-style access for callers that still index records like {"role": ..., "content": ...}
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self) -> dict:
+        return {"role": self.role, "content": self.content}
+
+    def __repr__(self) -> str:
+        return f"{self.role}: {self.content}"
+
+def append_chat(existing: list, new: list) -> list:
+    """
+    Reducer for chat_history: nodes return only their new entries.
+    Returns a new list - LangGraph shallow-copies channels for conditional edges,
+    so extending `existing` in place would apply a step's entries twice.
+    """
+    return (existing or []) + [ChatRecord.coerce(item) for item in new or []]
+
+def chat_to_dicts(history) -> list:
+    """ChatRecords (or dicts) -> JSON-ready dicts"""
+    return [ChatRecord.coerce(item).to_dict() for item in history or []]
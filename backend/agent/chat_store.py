@@ -0,0 +1,223 @@
+"""
+Server-side, per-chat history with bounded size
+- conversation channel: user prompts + final assistant replies; the last WINDOW
+  turns stay verbatim, older turns are folded into a rolling summary
+- progress channel: node progress lines, kept in a short ring buffer and never
+  fed back into prompts or chat_response payloads
+- storage: the shared session registry when one is given, else this process's memory
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+from chat_records import ChatRecord
+
+WINDOW = int(os.getenv("DEVDOST_CHAT_WINDOW", "12"))
+# "extractive" (default, no LLM call) or "llm" (rolling summary by the fast model)
+SUMMARY_MODE = os.getenv("DEVDOST_CHAT_SUMMARY", "extractive").lower()
+MAX_MESSAGE_CHARS = 2000
+MAX_PROGRESS_CHARS = 300
+MAX_SUMMARY_CHARS = 1500
+PROGRESS_KEEP = 50
+SUMMARIZE_BATCH = 4
+MAX_SESSIONS = 1000
+
+def _clip(text: str, limit: int) -> str:
+    text = text or ""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"... [+{len(text) - limit} chars]"
+
+def extractive_summary(summary: str, turns: List[ChatRecord]) -> str:
+    """Cheap summarizer: first line of every folded turn, newest kept when over budget"""
+    lines = [summary] if summary else []
+    for turn in turns:
+        first_line = (turn.content or "").strip().split("\n", 1)[0]
+        lines.append(f"{turn.role}: {_clip(first_line, 160)}")
+    text = "\n".join(lines)
+    return text[-MAX_SUMMARY_CHARS:]
+
+def llm_summarizer(llm) -> Callable[[str, List[ChatRecord]], str]:
+    """Rolling LLM summary (e.g. llm_fast); falls back to extractive on any error"""
+    from telemetry import traced_invoke
+    from prompts import render_prompt
+
+    def summarize(summary: str, turns: List[ChatRecord]) -> str:
+        transcript = "\n".join(f"{t.role}: {_clip(t.content, 600)}" for t in turns)
+        prompt = render_prompt("chat_summary", summary=summary or "(empty)", transcript=transcript)
+        try:
+            return _clip(traced_invoke(llm, prompt, "chat_summary").content.strip(), MAX_SUMMARY_CHARS)
+        except Exception as e:
+            print(f"⚠️ Chat summary failed, using extractive: {e}")
+            return extractive_summary(summary, turns)
+
+    return summarize
+
+class ChatSession:
+    """History of one chat"""
+    __slots__ = ("conversation", "progress", "summary", "folded", "turns", "updated_at")
+
+    def __init__(self):
+        self.conversation: List[ChatRecord] = []
+        self.progress = deque(maxlen=PROGRESS_KEEP)
+        self.summary = ""
+        self.folded: List[ChatRecord] = []
+        self.turns = 0
+        self.updated_at = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "conversation": [r.to_dict() for r in self.conversation],
+            "progress": list(self.progress),
+            "summary": self.summary,
+            "folded": [r.to_dict() for r in self.folded],
+            "turns": self.turns,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChatSession":
+        session = cls()
+        session.conversation = [ChatRecord.coerce(r) for r in data.get("conversation", [])]
+        session.progress.extend(data.get("progress", []))
+        session.summary = data.get("summary", "")
+        session.folded = [ChatRecord.coerce(r) for r in data.get("folded", [])]
+        session.turns = data.get("turns", 0)
+        session.updated_at = data.get("updated_at", session.updated_at)
+        return session
+
+class ChatStore:
+    """
+    Per-chat bounded history. Thread-safe; summarization runs in compact(), outside the hot path.
+    With a `registry` (session_store.SessionRegistry) chats live in the shared backend so every
+    worker sees the same history; without one they stay in this process.
+    """
+
+    def __init__(self, window: int = WINDOW, summarizer: Optional[Callable] = None, registry=None):
+        self.window = window
+        self.summarizer = summarizer or extractive_summary
+        self.registry = registry
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, key: str) -> Optional[ChatSession]:
+        if self.registry is None:
+            return self._sessions.get(key)
+        data = self.registry.get_chat(key)
+        return ChatSession.from_dict(data) if data else None
+
+    def _save(self, key: str, session: ChatSession, created: bool = False):
+        session.updated_at = time.time()
+        if self.registry is not None:
+            self.registry.put_chat(key, session.to_dict())
+            if created:
+                self.registry.prune_chats(MAX_SESSIONS)
+            return
+        self._sessions[key] = session
+        self._sessions.move_to_end(key)
+        while len(self._sessions) > MAX_SESSIONS:
+            self._sessions.popitem(last=False)
+
+    def has(self, key: str) -> bool:
+        with self._lock:
+            return self._load(key) is not None
+
+    def seed(self, key: str, messages: list):
+        """Adopt a client-sent history once (e.g. after a server restart); progress entries are dropped"""
+        records = []
+        for item in messages or []:
+            if not isinstance(item, dict) or item.get("type") == "progress":
+                continue
+            role = "user" if item.get("role") == "user" else "assistant"
+            records.append(ChatRecord(role, _clip(str(item.get("content", "")), MAX_MESSAGE_CHARS)))
+        with self._lock:
+            if self._load(key) is not None:
+                return
+            session = ChatSession()
+            session.folded = records[:-self.window] if len(records) > self.window else []
+            session.conversation = records[-self.window:]
+            self._save(key, session, created=True)
+
+    def add_turn(self, key: str, user_message: str, reply: str, progress: Optional[list] = None):
+        """Record one finished exchange"""
+        with self._lock:
+            session = self._load(key)
+            created = session is None
+            if created:
+                session = ChatSession()
+            session.conversation.append(ChatRecord("user", _clip(user_message, MAX_MESSAGE_CHARS)))
+            session.conversation.append(ChatRecord("assistant", _clip(reply, MAX_MESSAGE_CHARS)))
+            for line in progress or []:
+                session.progress.append(_clip(line, MAX_PROGRESS_CHARS))
+            session.turns += 1
+            overflow = len(session.conversation) - self.window
+            if overflow > 0:
+                session.folded.extend(session.conversation[:overflow])
+                del session.conversation[:overflow]
+            self._save(key, session, created)
+
+    def compact(self, key: str, force: bool = False):
+        """Fold overflowed turns into the summary (may call an LLM - run after replying)"""
+        with self._lock:
+            session = self._load(key)
+            if session is None or not session.folded:
+                return
+            if len(session.folded) < SUMMARIZE_BATCH and not force:
+                return
+            turns, session.folded = session.folded, []
+            summary = session.summary
+            self._save(key, session)
+
+        new_summary = self.summarizer(summary, turns)
+
+        with self._lock:
+            # re-read: another turn may have landed while the summarizer ran
+            session = self._load(key)
+            if session is None:
+                return
+            session.summary = new_summary
+            self._save(key, session)
+
+    def context(self, key: str) -> List[ChatRecord]:
+        """Bounded history for the graph: summary (as one system entry) + recent window"""
+        with self._lock:
+            session = self._load(key)
+            if session is None:
+                return []
+            records = []
+            summary = session.summary
+            if session.folded:
+                # not compacted yet - keep the gist without waiting for the summarizer
+                summary = extractive_summary(summary, session.folded)
+            if summary:
+                records.append(ChatRecord("system", f"Earlier in this chat:\n{summary}"))
+            records.extend(session.conversation)
+            return records
+
+    def window_dicts(self, key: str) -> List[Dict]:
+        with self._lock:
+            session = self._load(key)
+            return [r.to_dict() for r in session.conversation] if session else []
+
+    def progress(self, key: str) -> List[str]:
+        with self._lock:
+            session = self._load(key)
+            return list(session.progress) if session else []
+
+    def clear(self, key: str):
+        with self._lock:
+            if self.registry is not None:
+                self.registry.delete_chat(key)
+            else:
+                self._sessions.pop(key, None)
+
+def split_run_history(history: list, start: int):
+    """Entries a graph run added after `start` → (final reply, progress lines)"""
+    new_entries = [ChatRecord.coerce(r) for r in history[start:]]
+    assistant = [r.content for r in new_entries if r.role == "assistant"]
+    if not assistant:
+        return "", []
+    return assistant[-1], assistant[:-1]
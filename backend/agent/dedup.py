@@ -0,0 +1,319 @@
+"""
+Cross-project content dedup
+Thousands of generated projects carry the same style.css, boilerplate
+index.html and Express src/index.js, each as its own copy. Generated and
+scaffolded trees are now keyed by content hash and stored once:
+
+    PROJECTS_ROOT/.blobs/<sha[:2]>/<sha>      one copy per distinct content
+
+and each project file shares that copy's data:
+
+- reflink (default): a copy-on-write clone (FICLONE - btrfs, XFS, bcachefs...).
+  The file is independent; the filesystem only copies blocks an edit touches.
+  Where clones are unsupported the file is written normally.
+- hardlink: the file IS the blob (any filesystem). Copy-on-write comes from
+  every writer here replacing files by rename (safe_write_file, FileBatch,
+  write_file, copy_file) - an edit gets a new inode and leaves the other
+  projects alone. Opt-in: an external tool editing a project file in place
+  would change it in every project sharing it.
+- off: plain writes.
+
+Blobs are only added for settled trees: an adopted scaffold, the watcher's
+hourly sweep over projects written since the last one (open/running ones
+skipped), and `python dedup.py [project...]`. Writes in between - generation,
+tool copies - only clone blobs that already exist, and interactive edits are
+plain atomic writes, so editing a file never leaves a trail of blobs.
+
+Snapshots (snapshots.py) keep their file contents in the same pool, so a
+file, its dedup blob and its snapshot copy are one blob with one GC. Snapshots
+never add hardlinks themselves, but in hardlink mode a blob already linked into
+projects is shared with the snapshots holding that content too.
+
+Select with DEVDOST_DEDUP=reflink|hardlink|off. Files under
+DEVDOST_DEDUP_MIN_BYTES (default 1024) are written normally - they fit in
+one block anyway. The hourly sweep also drops blobs nothing uses.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable
+
+from paths import PROJECTS_ROOT, storage
+from project_store import IGNORED_DIRS, TEMP_PREFIX, get_project_store, is_temp_file
+from telemetry import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: no clones, hardlinks still work
+    fcntl = None
+
+REFLINK, HARDLINK, OFF = "reflink", "hardlink", "off"
+DEDUP_MODE = os.getenv("DEVDOST_DEDUP", REFLINK)
+MIN_DEDUP_BYTES = int(os.getenv("DEVDOST_DEDUP_MIN_BYTES", "1024"))
+BLOB_DIR = ".blobs"
+FICLONE = 0x40049409  # _IOW(0x94, 9, int)
+# reflink blobs nobody cloned for this long are dropped (the clones keep their data)
+UNUSED_BLOB_SECONDS = 7 * 86400
+HASH_CHUNK = 1024 * 1024
+
+metrics.describe("devdost_dedup_bytes_saved_total", "counter", "Bytes written as shared blob data instead of new copies")
+
+def encode_text(content: str) -> bytes:
+    """Bytes a text-mode write of `content` would produce (same newline translation)"""
+    return content.replace("\n", os.linesep).encode("utf-8")
+
+class BlobPool:
+    """Content-addressed pool the project files share data with"""
+
+    def __init__(self, root: Path, mode: str = REFLINK):
+        if mode not in (REFLINK, HARDLINK, OFF):
+            print(f"⚠️ Unknown dedup mode '{mode}', using {OFF}")
+            mode = OFF
+        self.root = Path(root)
+        self.mode = mode
+        self._reflink_ok = fcntl is not None  # flips off at the first filesystem that refuses clones
+        self._lock = threading.Lock()
+
+    def blob_path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha
+
+    def _mark_used(self, blob: Path):
+        """Refresh a blob's mtime so collect_garbage (in another process) keeps it a while"""
+        if self.mode != HARDLINK or blob.stat().st_nlink == 1:
+            os.utime(blob)  # a hardlinked blob shares its mtime with project files - left alone
+
+    def _ensure_blob(self, sha: str, data: bytes) -> Path:
+        blob = self.blob_path(sha)
+        if blob.exists():
+            self._mark_used(blob)
+            return blob
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        temp = blob.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, blob)
+        return blob
+
+    def _clone_fd(self, src_fd: int, dest: Path) -> bool:
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return True
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                self._reflink_ok = False
+                print(f"ℹ️ Reflinks unsupported under {self.root}, dedup off ({e.strerror})")
+                return False
+            raise
+        finally:
+            os.close(dst_fd)
+
+    def _clone(self, blob: Path, dest: Path) -> bool:
+        src_fd = os.open(blob, os.O_RDONLY)
+        try:
+            return self._clone_fd(src_fd, dest)
+        finally:
+            os.close(src_fd)
+
+    def _share(self, blob: Path, dest: Path) -> bool:
+        """Make fresh `dest` share `blob`'s data (False: caller copies)"""
+        try:
+            if self.mode == HARDLINK:
+                os.link(blob, dest)
+                return True
+            if self.mode == REFLINK and self._reflink_ok:
+                return self._clone(blob, dest)
+        except OSError as e:
+            if e.errno not in (errno.EMLINK, errno.EXDEV, errno.EPERM, errno.EACCES, errno.ENOSPC):
+                raise
+            # too many links / another filesystem / no permission: the caller copies instead
+        return False
+
+    def add_file(self, path: Path) -> str:
+        """Keep a file's current content in the pool whatever its size or the mode (snapshots).
+        Cloned or copied, never hardlinked: a later in-place edit of the file must not
+        reach the snapshot. Returns its sha256"""
+        path = Path(path)
+        with open(path, "rb") as f:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                digest.update(chunk)
+            sha = digest.hexdigest()
+            blob = self.blob_path(sha)
+            if blob.exists():
+                self._mark_used(blob)
+                return sha
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            temp = blob.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+            try:
+                # cloned from the open file: exactly the content that was hashed
+                if not (self.mode == REFLINK and self._reflink_ok and self._clone_fd(f.fileno(), temp)):
+                    f.seek(0)
+                    with open(temp, "wb") as out:
+                        shutil.copyfileobj(f, out)
+                os.replace(temp, blob)
+            except Exception:
+                temp.unlink(missing_ok=True)
+                raise
+        return sha
+
+    def materialize(self, sha: str, dest: Path):
+        """Create fresh `dest` with a blob's content - a clone or a copy, never a hardlink (snapshot restore)"""
+        blob = self.blob_path(sha)
+        if not (self.mode == REFLINK and self._reflink_ok and self._clone(blob, Path(dest))):
+            shutil.copyfile(blob, dest)
+
+    def place(self, dest: Path, data: bytes, new_blob: bool = True) -> bool:
+        """Create `dest` (a fresh path - callers rename it into place) holding `data`,
+        sharing the pool's copy where possible. new_blob=False only shares content
+        the pool already has. Returns True if shared"""
+        dest = Path(dest)
+        sha = None
+        if self.mode != OFF and len(data) >= MIN_DEDUP_BYTES and (self.mode != REFLINK or self._reflink_ok):
+            sha = hashlib.sha256(data).hexdigest()
+            if not new_blob and not self.blob_path(sha).exists():
+                sha = None
+        if sha is None:
+            with open(dest, "wb") as f:
+                f.write(data)
+            return False
+
+        shared = False
+        for _ in range(2):  # a blob collected between the two steps is simply written again
+            blob = self._ensure_blob(sha, data)
+            try:
+                shared = self._share(blob, dest)
+                break
+            except FileNotFoundError:
+                continue
+        if not shared:
+            with open(dest, "wb") as f:
+                f.write(data)
+            return False
+        metrics.inc("devdost_dedup_bytes_saved_total", len(data))
+        return True
+
+    def dedupe_file(self, path: Path) -> bool:
+        """Swap an existing file for a shared one with the same content"""
+        path = Path(path)
+        stat = path.stat()
+        if self.mode == OFF or stat.st_size < MIN_DEDUP_BYTES or (self.mode == HARDLINK and stat.st_nlink > 1):
+            return False
+        data = path.read_bytes()
+        temp = path.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+        try:
+            if not self.place(temp, data):
+                temp.unlink(missing_ok=True)
+                return False
+            if self.mode == REFLINK:
+                _copy_stat(stat, temp)
+            now = path.stat()
+            if (now.st_ino, now.st_size, now.st_mtime_ns) != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                temp.unlink(missing_ok=True)  # written meanwhile - never replace a newer edit with older content
+                return False
+            os.replace(temp, path)
+            return True
+        except Exception:
+            temp.unlink(missing_ok=True)
+            raise
+
+    def dedupe_tree(self, project_path: Path) -> int:
+        """dedupe_file over a project's sources (dependency/build dirs skipped). Returns files shared"""
+        shared = 0
+        for root, dirs, names in os.walk(project_path):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            for name in names:
+                if is_temp_file(name):
+                    continue
+                try:
+                    shared += self.dedupe_file(Path(root) / name)
+                except OSError as e:
+                    print(f"⚠️ Dedup of {name} skipped: {e}")
+        return shared
+
+    def collect_garbage(self, keep: Iterable[str], unused_seconds: float = UNUSED_BLOB_SECONDS) -> int:
+        """Drop blobs nothing uses: not in `keep` (the shas snapshots hold), not hardlinked into
+        a project and not cloned recently. Returns how many were removed"""
+        keep = set(keep)
+        removed = 0
+        cutoff = time.time() - unused_seconds
+        link_cutoff = time.time() - 3600  # a blob written right now is linked a moment later
+        with self._lock:
+            for blob in self.root.glob("*/*"):
+                try:
+                    stat = blob.stat()
+                except FileNotFoundError:
+                    continue
+                if is_temp_file(blob.name):
+                    unused = stat.st_mtime < link_cutoff
+                elif blob.name in keep or stat.st_nlink > 1:
+                    unused = False
+                else:
+                    unused = stat.st_mtime < (link_cutoff if self.mode == HARDLINK else cutoff)
+                if unused:
+                    blob.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+def _copy_stat(stat: os.stat_result, path: Path):
+    os.chmod(path, stat.st_mode & 0o7777)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+pool = BlobPool(PROJECTS_ROOT / BLOB_DIR, DEDUP_MODE)
+
+def write_file(path, content: str):
+    """Atomically write a text file, sharing content the pool already has (replaces, never edits in place)"""
+    path = Path(path)
+    temp = path.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}{path.suffix}")
+    try:
+        pool.place(temp, encode_text(content), new_blob=False)
+        os.replace(temp, path)
+    except Exception:
+        temp.unlink(missing_ok=True)
+        raise
+
+def copy_file(src, dst, *, follow_symlinks=True) -> str:
+    """shutil.copy2 stand-in (usable as copytree's copy_function) that shares known content and replaces `dst`"""
+    dst = Path(dst)
+    if dst.is_dir():
+        dst = dst / Path(src).name
+    temp = dst.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+    try:
+        pool.place(temp, Path(src).read_bytes(), new_blob=False)
+        if os.stat(temp).st_nlink == 1:
+            _copy_stat(os.stat(src), temp)  # a hardlink keeps the blob's metadata - changing it would touch every sharer
+        os.replace(temp, dst)
+    except Exception:
+        temp.unlink(missing_ok=True)
+        raise
+    return str(dst)
+
+def dedupe_changed(since: float, active=()) -> int:
+    """Share the files of projects written since `since`, except `active` (open/running) ones"""
+    if pool.mode == OFF:
+        return 0
+    active = set(active)
+    shared = 0
+    for name in get_project_store().changed_projects(since):
+        if name not in active and storage.path_for(name).is_dir():
+            shared += pool.dedupe_tree(storage.path_for(name))
+    return shared
+
+if __name__ == "__main__":
+    if pool.mode == OFF:
+        print("DEVDOST_DEDUP=off - nothing to do")
+        sys.exit(0)
+    names = sys.argv[1:] or [n for n in storage.list_projects() if storage.path_for(n).is_dir()]
+    total = 0
+    for name in names:
+        count = pool.dedupe_tree(storage.path_for(name))
+        total += count
+        print(f"🔗 {name}: {count} file(s) shared")
+    print(f"🔗 Shared {total} file(s) across {len(names)} project(s) ({pool.mode})")
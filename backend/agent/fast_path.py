@@ -0,0 +1,100 @@
+"""
+Pre-graph fast path for trivial turns
+Greetings, "show all projects" and "switch to todo-app" used to run the whole
+graph: normalize_state, the classifier and (for a switch) an llm_fast call just
+to pull the project name out of the text. try_fast_path answers them with rules
+and a fuzzy lookup in the project catalog - no LLM, a few milliseconds.
+Anything ambiguous returns None and goes through the graph as before.
+"""
+
+import re
+from typing import List, Optional
+
+from project_index import catalog
+from telemetry import record_event
+
+GREETING_WORDS = {
+    "hi", "hii", "hiii", "hello", "helo", "hey", "heyy", "namaste", "namaskar", "hola", "yo",
+    "sup", "gm", "morning", "evening", "afternoon",
+}
+GREETING_FILLER = {"good", "there", "devdost", "dost", "bhai", "bro", "ji", "sir", "ai", "everyone", "all"}
+MAX_GREETING_WORDS = 5
+
+LIST_PATTERNS = [
+    r"^(show|list|dikha\w*|batao)( me)?( all| my| saare| mere)? projects?( list)?$",
+    r"^(all|my|saare|mere|kitne|how many) projects?( hai| hain| hain\?| are there| list| dikha\w*| batao| show)*$",
+    r"^projects?( list| dikha\w*| batao| show)$",
+]
+
+SWITCH_VERBS = r"\b(switch|open|load|select|kholo|khol|khole|chalo)\b"
+SWITCH_STOP = {
+    "switch", "open", "load", "select", "kholo", "khol", "khole", "chalo", "to", "into", "back", "project",
+    "the", "my", "mera", "wala", "wale", "ko", "par", "pe", "on", "please", "karo", "kar", "do", "me", "mein",
+    "app", "now", "ab", "abhi",
+}
+# words that mean it's not a plain switch (file ops, new project, run...)
+NOT_TRIVIAL = r"\b(file|files|folder|bana|banao|create|new|naya|delete|run|chala|chalao|fix|add|change)\b"
+
+class FastReply:
+    """Answer produced without the graph"""
+
+    __slots__ = ("intent", "message", "current_project")
+
+    def __init__(self, intent: str, message: str, current_project: Optional[str] = None):
+        self.intent = intent
+        self.message = message
+        self.current_project = current_project
+
+def _normalize(text: str) -> str:
+    text = re.sub(r"[^\w\s\-?]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+def is_greeting(text: str) -> bool:
+    words = text.replace("?", " ").split()
+    if not words or len(words) > MAX_GREETING_WORDS:
+        return False
+    return any(w in GREETING_WORDS for w in words) and all(w in GREETING_WORDS or w in GREETING_FILLER for w in words)
+
+def greeting_reply(current_project: Optional[str]) -> str:
+    message = "👋 नमस्ते! मैं DevDost AI हूँ। बताइए क्या बनाना है - website, app या game?"
+    if current_project:
+        message += f"\n\n📁 अभी आप `{current_project}` project पर हैं।"
+    return message
+
+def project_list_reply(projects: List[str]) -> str:
+    # same text as project_manager_agent
+    return f"📂 **आपके projects:**\n" + "\n".join([f" • `{p}`" for p in projects]) if projects else "📂 अभी कोई project नहीं है"
+
+def switch_query(text: str) -> str:
+    """What's left of a switch request once verbs and filler are gone ("todo app kholo" → "todo")"""
+    return " ".join(w for w in _normalize(text).replace("?", " ").split() if w not in SWITCH_STOP)
+
+def resolve_switch(text: str) -> Optional[str]:
+    """Project named in a switch request, or None if there is no clear match"""
+    query = switch_query(text)
+    return catalog.resolve(query) if query else None
+
+def try_fast_path(user_prompt: str, current_project: Optional[str] = None) -> Optional[FastReply]:
+    """Deterministic reply for greetings / project list / project switch; None → run the graph"""
+    text = _normalize(user_prompt)
+    if not text:
+        return None
+
+    if is_greeting(text):
+        record_event("fast_path", intent="CHAT")
+        return FastReply("CHAT", greeting_reply(current_project), current_project)
+
+    if re.search(NOT_TRIVIAL, text):
+        return None
+
+    if any(re.match(p, text) for p in LIST_PATTERNS):
+        record_event("fast_path", intent="PROJECT_LIST")
+        return FastReply("PROJECT_LIST", project_list_reply(catalog.names()), current_project)
+
+    if re.search(SWITCH_VERBS, text):
+        project_name = resolve_switch(text)
+        if project_name:
+            record_event("fast_path", intent="PROJECT_SWITCH")
+            return FastReply("PROJECT_SWITCH", f"✅ **अब आप `{project_name}` project पर काम कर रहे हैं**", project_name)
+
+    return None
@@ -0,0 +1,200 @@
+"""
+Batched multi-file writes
+Writing N files one by one meant N temp-file/replace rounds, N watcher events
+and N full-content broadcasts. A FileBatch stages files in memory and commits
+them together:
+
+1. every file goes to a temp next to its target (.tmp_batch_<id>_<name>); each
+   temp and the directories holding them are fsynced
+2. only then an intent journal in the project root listing temp → target is
+   written and fsynced - a durable journal always points at complete temps
+3. the temps are renamed over their targets, the target directories are
+   fsynced, then the journal is removed
+
+A crash before step 3 leaves the old files untouched; a crash during it is
+rolled forward from the journal (recover_batches, run before the next commit
+and when a project is opened). One store transaction records every file, and
+commit listeners get ONE notification per batch (the app broadcasts it).
+Temps share content the dedup pool already has (dedup.py).
+
+Only the batch's own files and directories are synced (never the whole
+filesystem, which other projects and node_modules share).
+DEVDOST_BATCH_FSYNC=off skips the fsyncs (same durability as a plain write).
+"""
+
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from dedup import encode_text, pool
+from paths import get_project_path, safe_path_for_project
+from project_store import IGNORED_DIRS, TEMP_PREFIX, update_store
+
+BATCH_PREFIX = f"{TEMP_PREFIX}batch_"  # so every check for atomic temps also skips batch temps
+JOURNAL_SUFFIX = ".journal"
+FSYNC = os.getenv("DEVDOST_BATCH_FSYNC", "on") != "off"
+
+_listeners: List[Callable[[str, List[dict]], None]] = []
+_staged: Dict[str, Dict[str, str]] = {}
+_staged_lock = threading.Lock()
+
+def add_commit_listener(fn: Callable[[str, List[dict]], None]):
+    """fn(project, files) after every committed batch; files = [{"name", "content", "created"}]"""
+    _listeners.append(fn)
+
+def remove_commit_listener(fn):
+    if fn in _listeners:
+        _listeners.remove(fn)
+
+def _fsync(path: Path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _sync_dirs(files: List[Path]):
+    """fsync the directories holding `files` (their new/renamed entries)"""
+    if not FSYNC or os.name == "nt":
+        return  # directories cannot be opened for fsync on Windows
+    for directory in dict.fromkeys(path.parent for path in files):
+        _fsync(directory)
+
+def _durable(files: List[Path]):
+    """fsync each file, then the directories holding them"""
+    if not FSYNC:
+        return
+    for path in files:
+        _fsync(path)
+    _sync_dirs(files)
+
+def recover_batches(project_name: str) -> int:
+    """Finish batches interrupted mid-rename (roll forward). Returns how many journals were replayed"""
+    project_root = get_project_path(project_name)
+    try:
+        journals = [e.path for e in os.scandir(project_root)
+                    if e.name.startswith(BATCH_PREFIX) and e.name.endswith(JOURNAL_SUFFIX)]
+    except FileNotFoundError:
+        return 0
+    for journal in journals:
+        try:
+            with open(journal, "r", encoding="utf-8") as f:
+                entries = json.load(f)["files"]
+            replayed = []
+            for temp, target in entries:
+                temp_path = project_root / temp
+                if temp_path.exists():
+                    os.replace(temp_path, project_root / target)
+                    replayed.append(target)
+            _sync_dirs([project_root / target for target in replayed])
+            # temps are synced before their journal, so the files on disk ARE the batch's
+            # content - the store digests them from disk (None = read the file)
+            update_store("record_files", project_name, [(target, None) for target in replayed])
+        except (ValueError, KeyError, OSError) as e:
+            # a torn journal was never committed - the targets were not touched
+            print(f"⚠️ Dropping unfinished batch {Path(journal).name}: {e}")
+            _drop_temps(project_root, Path(journal).name[len(BATCH_PREFIX):-len(JOURNAL_SUFFIX)])
+        os.unlink(journal)
+    return len(journals)
+
+def _drop_temps(project_root: Path, batch_id: str):
+    """Delete the temps of one batch (its journal is unreadable, so search the tree)"""
+    prefix = f"{BATCH_PREFIX}{batch_id}_"
+    for root, dirs, names in os.walk(project_root):
+        dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+        for name in names:
+            if name.startswith(prefix):
+                os.unlink(os.path.join(root, name))
+
+class FileBatch:
+    """Files staged for one project, written in one commit"""
+
+    def __init__(self, project_name: str):
+        self.project_name = project_name
+        self._files: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def write(self, filepath: str, content: str):
+        """Stage a file (validated now; the last write to a path wins)"""
+        safe_path_for_project(self.project_name, filepath)
+        with self._lock:
+            self._files[filepath.replace("\\", "/")] = content
+
+    def __len__(self):
+        return len(self._files)
+
+    def commit(self) -> List[dict]:
+        """Write every staged file; returns [{"name", "content", "created"}] in staging order"""
+        with self._lock:
+            files, self._files = self._files, {}
+        if not files:
+            return []
+
+        project_root = get_project_path(self.project_name)
+        project_root.mkdir(parents=True, exist_ok=True)
+        recover_batches(self.project_name)
+
+        batch_id = uuid.uuid4().hex[:12]
+        journal = project_root / f"{BATCH_PREFIX}{batch_id}{JOURNAL_SUFFIX}"
+        staged = []  # (temp, target, name, content, created)
+        try:
+            for name, content in files.items():
+                target = safe_path_for_project(self.project_name, name)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temp = target.with_name(f"{BATCH_PREFIX}{batch_id}_{target.name}")
+                pool.place(temp, encode_text(content), new_blob=False)  # content the pool already has is shared, not copied
+                staged.append((temp, target, name, content, not target.exists()))
+
+            _durable([t for t, _, _, _, _ in staged])  # temps first: the journal must never outlive them
+            with open(journal, "w", encoding="utf-8") as f:
+                json.dump({"files": [[t.relative_to(project_root).as_posix(), n] for t, _, n, _, _ in staged]}, f)
+            _durable([journal])
+        except Exception:
+            for temp, _, _, _, _ in staged:
+                temp.unlink(missing_ok=True)
+            journal.unlink(missing_ok=True)
+            raise
+
+        for temp, target, _, _, _ in staged:
+            os.replace(temp, target)
+        _sync_dirs([target for _, target, _, _, _ in staged])
+        os.unlink(journal)
+
+        update_store("record_files", self.project_name, [(n, c) for _, _, n, c, _ in staged])
+        changed = [{"name": n, "content": c, "created": created} for _, _, n, c, created in staged]
+        for listener in list(_listeners):
+            try:
+                listener(self.project_name, changed)
+            except Exception as e:
+                print(f"⚠️ Batch listener failed: {e}")
+        return changed
+
+def write_files(project_name: str, files: Dict[str, str]) -> List[dict]:
+    """Write many files in one batch"""
+    batch = FileBatch(project_name)
+    for name, content in files.items():
+        batch.write(name, content)
+    return batch.commit()
+
+# ---------- per-project staging (a multi-step writer like the coder) ----------
+
+def stage_file(project_name: str, filepath: str, content: str) -> int:
+    """Hold a file for the project's next batch; returns how many files are staged"""
+    safe_path_for_project(project_name, filepath)
+    with _staged_lock:
+        files = _staged.setdefault(project_name, {})
+        files[filepath.replace("\\", "/")] = content
+        return len(files)
+
+def pop_staged(project_name: Optional[str]) -> Dict[str, str]:
+    """Take the project's staged files (path -> content)"""
+    with _staged_lock:
+        return _staged.pop(project_name, {}) if project_name else {}
+
+def flush_staged(project_name: Optional[str]) -> List[dict]:
+    """Commit whatever is still staged for the project (no-op when nothing is)"""
+    files = pop_staged(project_name)
+    return write_files(project_name, files) if files else []
@@ -1,235 +1,157 @@
 import json
+import re
 import subprocess
 import time
 import os
+import shutil
+import hashlib
+from collections import OrderedDict
+import threading
 from pathlib import Path
+from typing import Dict, List, Tuple, Optional
 from dotenv import load_dotenv
-from langchain_core.globals import set_verbose, set_debug
-from langchain_groq.chat_models import ChatGroq
-from langgraph.constants import END
-from langgraph.graph import StateGraph
-from langchain_core.prompts import ChatPromptTemplate
 from prompts import *
 from states import *
 from tools import *
 from intent_classifier import IntentClassifier
+from validators import validate_content, extract_code
+from file_batch import stage_file, pop_staged
+from snapshots import RUN_LABEL, snapshot_before
+from fast_path import try_fast_path, resolve_switch
+from project_index import catalog as project_catalog
+from model_router import HEAVY, route_coder, route_chat, record_outcome
+from telemetry import traced_node, traced_invoke, traced_structured, traced_tool, record_event, span
+from scaffold import (
+    SLOW_KINDS, guess_techstack, scaffold_kind, start_scaffold,
+    reconcile_scaffold, register_scaffold, finish_scaffold
+)
 
 # Load environment
 _ = load_dotenv()
-set_debug(False)
-set_verbose(False)
 
-# ✅ Use your exact LLM setup
-llm_heavy = ChatGroq(model="openai/gpt-oss-120b", temperature=0.3, max_retries=2)
-llm_fast = ChatGroq(model="llama-3.1-8b-instant", temperature=0.3, max_retries=2)
+# ✅ Clients are created on first call (llms.py); rebinding these names swaps them (benchmarks)
+from llms import LazyLLM, llm_heavy, llm_fast
 
 MAX_RETRIES = 2
 
+# "combined": one structured call returns name + Plan + TaskPlan
+# "staged": separate name / plan / architect calls
+PLANNING_MODE = os.getenv("DEVDOST_PLANNING_MODE", "combined").lower()
+
 # ===================== HELPER FUNCTIONS =====================
 
-def emit_chat_progress(state: dict, message: str) -> dict:
-    """Add detailed progress message to chat history AND emit via socketio"""
-    
-    # Add to chat history
-    state["chat_history"].append({
-        "role": "assistant",
-        "content": message
-    })
-    
+STATE_DEFAULTS = {
+    "user_prompt": "",
+    "current_project": None,
+    "plan": None,
+    "task_plan": None,
+    "coder_state": None,
+    "status": None,
+    "intent": None,
+    "initialization_done": False,
+    "project_structure": "html",
+    "run_attempts": 0,
+    "last_error": None,
+    "file_retry_count": dict,
+    "debug_history": list,
+    "chat_history": list,
+    "max_retries": MAX_RETRIES,
+    "coder_iterations": 0,
+    "max_coder_iterations": 50,
+    "messages": list,
+}
+
+# Node-local buffer of chat entries produced during one step (never part of State)
+NEW_CHAT_KEY = "_new_chat"
+
+def emit_progress(state: dict, message: str):
+    """Push a progress line to the socket callback only (no chat history)"""
     print(f"💬 CHAT: {message}")
-    
-    
-    # Get callback
+
     emit_fn = state.get("_emit_progress")
-    
+
     if emit_fn is not None:
         if callable(emit_fn):
             try:
                 emit_fn(message, state.get("current_project"))
-                print("✅ Successfully emitted via callback")
             except Exception as e:
                 print(f"⚠️ Emit error: {e}")
                 import traceback
                 traceback.print_exc()
         else:
             print("⚠️ Callback exists but not callable!")
-    else:
-        print("⚠️ No emit callback found in state")
-    
-    return state
 
-def normalize_state(state: dict) -> dict:
-    """Ensure all required keys exist with defaults"""
-    
-    # ✅ SAVE callback PEHLE
-    saved_callback = state.get("_emit_progress", None)
-    
-    defaults = {
-        "user_prompt": "",
-        "chat_history": [],
-        "current_project": None,
-        "plan": None,
-        "task_plan": None,
-        "coder_state": None,
-        "status": None,
-        "intent": None,
-        "initialization_done": False,
-        "project_structure": "html",
-        "run_attempts": 0,
-        "last_error": None,
-        "debug_history": [],
-        "file_retry_count": {},
-        "max_retries": MAX_RETRIES,
-        "coder_iterations": 0,
-        "max_coder_iterations": 50,
-        "messages": []
-    }
-    
-    for key, val in defaults.items():
-        if key not in state or state[key] is None:
-            if isinstance(val, list):
-                state[key] = []
-            elif isinstance(val, dict):
-                state[key] = {}
-            else:
-                state[key] = val
-    
-    # ✅ RESTORE callback - CRITICAL!
-    if saved_callback is not None:
-        state["_emit_progress"] = saved_callback
-        print(f"✅ Restored callback in normalize_state")
-    
+def add_chat(state: dict, role: str, content: str) -> dict:
+    """Buffer a chat entry for this step - returned via node_update, appended by the reducer"""
+    state.setdefault(NEW_CHAT_KEY, []).append(ChatRecord(role, content))
     return state
 
-def initialize_project(project_name: str, techstack: str, state: dict) -> dict:
-    """Initialize project with chat updates"""
-    project_path = get_project_path(project_name)
-    techstack_lower = techstack.lower()
-
-    state = emit_chat_progress(state, f"🔧 **आपका प्रोजेक्ट बन रहा है:** `{project_name}`")
+def emit_chat_progress(state: dict, message: str) -> dict:
+    """Add detailed progress message to chat history AND emit via socketio"""
+    add_chat(state, "assistant", message)
+    emit_progress(state, message)
+    return state
 
-    try:
-        # REACT
-        if "react" in techstack_lower and "next" not in techstack_lower:
-            state = emit_chat_progress(state, "⚛️ React app का structure बना रहे हैं (2-3 मिनट लगेंगे)...")
-
-            if project_path.exists():
-                import shutil
-                shutil.rmtree(project_path)
-
-            result = subprocess.run(
-                ["npx","--yes","create-react-app",project_name],
-                cwd=str(PROJECTS_ROOT),
-                text=True,
-                timeout=400,
-                capture_output=True
-            )
+def node_update(state: dict, **changes) -> dict:
+    """Partial update for LangGraph: only changed keys + this step's new chat entries"""
+    return {"chat_history": state.pop(NEW_CHAT_KEY, []), **changes}
 
-            if result.returncode == 0:
-                state = emit_chat_progress(state, "✅ **React app तैयार है!**")
-                return {**state, "initialization_done": True, "project_structure": "react"}
-            else:
-                raise Exception("React init failed")
-
-        # NEXT JS
-        elif "next" in techstack_lower:
-            state = emit_chat_progress(state, "⚡ Next.js app का structure बना रहे हैं (2-3 मिनट लगेंगे)...")
-
-            if project_path.exists():
-                import shutil
-                shutil.rmtree(project_path)
-
-            result = subprocess.run(
-                ["npx","--yes","create-next-app@latest",project_name,"--typescript","--tailwind","--app","--no-git"],
-                cwd=str(PROJECTS_ROOT),
-                text=True,
-                timeout=400,
-                capture_output=True
-            )
+def llm_for(route) -> object:
+    """Model client for a routing decision (module globals, so benchmarks can swap them)"""
+    return llm_heavy if route.tier == HEAVY else llm_fast
 
-            if result.returncode == 0:
-                state = emit_chat_progress(state, "✅ **Next.js app तैयार है!**")
-                return {**state, "initialization_done": True, "project_structure": "nextjs"}
-            else:
-                raise Exception("Next.js init failed")
+def normalize_state(state: dict) -> dict:
+    """Fill missing keys with defaults (in place, on the node's own input view)"""
+    for key, default in STATE_DEFAULTS.items():
+        if state.get(key) is None:
+            state[key] = default() if callable(default) else default
+    return state
 
-        # NODE / EXPRESS
-        elif "node" in techstack_lower or "express" in techstack_lower:
-            state = emit_chat_progress(state, "📦 Node.js project शुरू कर रहे हैं...")
+def slugify_project_name(name: str) -> str:
+    """Normalize an LLM-suggested name into a safe project directory name"""
+    name = (name or "").strip().strip("`'\"").lower()
+    name = re.sub(r"[^a-z0-9]+", "-", name).strip("-")
+    return "-".join(name.split("-")[:4])[:40].strip("-")
 
-            project_path.mkdir(parents=True, exist_ok=True)
-            result = subprocess.run(
-                ["npm", "init", "-y"],
-                cwd=str(project_path),
-                text=True,
-                timeout=30,
-                capture_output=True
-            )
+def heuristic_project_name(user_prompt: str) -> str:
+    words = re.findall(r'\b\w+\b', user_prompt.lower())
+    return slugify_project_name("-".join(words[:2])) or "web-app"
 
-            if result.returncode == 0:
-                if "express" in techstack_lower:
-                    state = emit_chat_progress(state, "🔥 Express install हो रहा है...")
-                    subprocess.run(
-                        ["npm","install","express"],
-                        cwd=str(project_path),
-                        text=True,
-                        timeout=60,
-                        capture_output=True
-                    )
-
-                    # EXPRESS scaffold
-                    src_path = project_path / "src"
-                    src_path.mkdir(exist_ok=True)
-                    with open(src_path / "index.js","w") as f:
-                        f.write("""const express = require('express');
-const app = express();
-app.use(express.json());
-
-app.get('/', (req, res) => {
-  res.json({ message: "Server running ✅" });
-});
-
-const PORT = process.env.PORT || 3000;
-app.listen(PORT, () => console.log("Server started on port", PORT));
-""")
-                    state = emit_chat_progress(state, "✅ **Node.js Express server तैयार है!**")
-                    return {**state, "initialization_done": True, "project_structure": "nodejs"}
-                else:
-                    src_path = project_path / "src"
-                    src_path.mkdir(exist_ok=True)
-                    with open(src_path / "index.js","w") as f:
-                        f.write("console.log('Node.js project initialized ✅');")
+def scaffold_emitter(state: dict):
+    """Progress callback for background scaffold jobs - socket only, the node may have returned already"""
+    return lambda message: emit_progress(state, message)
 
-                    state = emit_chat_progress(state, "✅ **Node.js project तैयार है!**")
-                    return {**state, "initialization_done": True, "project_structure": "nodejs"}
+def initialize_project(project_name: str, techstack: str, state: dict) -> dict:
+    """Initialize project with chat updates (blocking). Returns the state changes"""
+    state = emit_chat_progress(state, f"🔧 **आपका प्रोजेक्ट बन रहा है:** `{project_name}`")
+    job = start_scaffold(techstack, emit=scaffold_emitter(state))
+    structure = job.adopt(project_name)
+    return {"initialization_done": True, "project_structure": structure}
 
-        else:
-            state = emit_chat_progress(state, "📄 HTML/CSS/JS project बना रहे हैं...")
-            project_path.mkdir(parents=True, exist_ok=True)
-            state = emit_chat_progress(state, "✅ **Project folder तैयार है!**")
-            return {**state, "initialization_done": True, "project_structure": "html"}
+def join_scaffold(state: dict) -> dict:
+    """Wait for the background scaffold of the current project (started by the planner). Returns the state changes"""
+    project_name = state.get("current_project")
+    if not project_name:
+        return {}
 
+    try:
+        with span("scaffold.join", kind="internal"):
+            structure = finish_scaffold(project_name)
     except Exception as e:
-        print(f"⚠️ Init error: {e}")
-        state = emit_chat_progress(state, f"⚠️ कुछ दिक्कत आई, basic setup उपयोग कर रहे हैं")
-        project_path.mkdir(parents=True, exist_ok=True)
-        return {**state, "initialization_done": True, "project_structure": "html"}
-
-# ===================== AGENT NODES =====================
-
-import re
-from typing import Dict, List, Tuple, Optional
+        print(f"⚠️ Scaffold join error: {e}")
+        get_project_path(project_name).mkdir(parents=True, exist_ok=True)
+        structure = "html"
 
+    if structure is None:
+        return {}
+    return {"initialization_done": True, "project_structure": structure}
 
+# ===================== AGENT NODES =====================
 
 def chat_classifier_agent(state: dict) -> dict:
     """Enhanced classifier with two-stage detection"""
-    saved_callback = state.get("_emit_progress")
     state = normalize_state(state)
 
-    if saved_callback is not None:
-        state["_emit_progress"] = saved_callback
-
     try:
         user_prompt = state["user_prompt"]
         current_project = state.get("current_project")
@@ -237,110 +159,126 @@ def chat_classifier_agent(state: dict) -> dict:
         # Use two-stage classifier
         intent = IntentClassifier.classify(user_prompt, current_project, llm_fast)
 
-        state["chat_history"].append({"role": "user", "content": user_prompt})
+        state = add_chat(state, "user", user_prompt)
 
         print(f"🎯 Final Intent: {intent}")
-        return {
-            **state,
-            "intent": intent,
-            "_emit_progress": saved_callback
-        }
+        return node_update(state, intent=intent)
 
     except Exception as e:
         print(f"❌ Classifier error: {e}")
-        return {
-            **state,
-            "intent": "CHAT",
-            "_emit_progress": saved_callback
-        }
+        return node_update(state, intent="CHAT")
 
 def project_manager_agent(state: dict) -> dict:
     """Manages project operations - Uses FAST LLM"""
     state = normalize_state(state)
-    saved_callback = state.get("_emit_progress")
     try:
         intent = state["intent"]
         user_prompt = state["user_prompt"]
 
         if intent == "PROJECT_LIST":
-            projects = list_all_projects()
+            projects = project_catalog.names()
             response = f"📂 **आपके projects:**\n" + "\n".join([f" • `{p}`" for p in projects]) if projects else "📂 अभी कोई project नहीं है"
             state = emit_chat_progress(state, response)
-            return {**state, "status": "DONE"}
+            return node_update(state, status="DONE")
 
         elif intent == "PROJECT_SWITCH":
-            # ✅ FAST LLM for name extraction
-            project_name_prompt = f'Extract project name from: "{user_prompt}". Return ONLY the name.'
-            response = llm_fast.invoke(project_name_prompt)
-            project_name = response.content.strip()
-
-            if project_exists(project_name):
+            # Fuzzy catalog lookup first; FAST LLM only when the text names no clear project
+            project_name = resolve_switch(user_prompt)
+            if project_name is None:
+                response = traced_invoke(llm_fast, render_prompt("project_switch", user_prompt=user_prompt), "project_switch")
+                project_name = response.content.strip()
+                # near misses ("calclator") still resolve
+                project_name = project_catalog.resolve(project_name) or project_name
+
+            if project_name in project_catalog:
                 response = f"✅ **अब आप `{project_name}` project पर काम कर रहे हैं**"
                 state = emit_chat_progress(state, response)
-                return {
-                    **state,
-                    "current_project": project_name,
-                    "_emit_progress": saved_callback,
-                    "status": "DONE"
-                }
+                return node_update(state, current_project=project_name, status="DONE")
             else:
-                available = list_all_projects()
-                response = f"❌ `{project_name}` नाम का कोई project नहीं मिला।\n\n**Available:** {', '.join(available) if available else 'None'}"
+                suggestions = [name for name, _ in project_catalog.search(project_name, limit=5)] or project_catalog.names()[:5]
+                response = f"❌ `{project_name}` नाम का कोई project नहीं मिला।\n\n**Available:** {', '.join(suggestions) if suggestions else 'None'}"
                 state = emit_chat_progress(state, response)
-                return {**state, "status": "DONE"}
+                return node_update(state, status="DONE")
 
         elif intent == "RUN_PROJECT":
             current_project = state.get("current_project")
             if not current_project:
                 state = emit_chat_progress(state, "❌ कोई project select नहीं है")
-                return {**state, "status": "DONE"}
+                return node_update(state, status="DONE")
 
             state = emit_chat_progress(state, f"▶️ **शुरू कर रहे हैं:** `{current_project}`")
-            return {**state, "_emit_progress": saved_callback,"status": "DONE", "status": "DONE"}
+            return node_update(state, status="DONE")
 
     except Exception as e:
         print(f"❌ Project manager error: {e}")
         state = emit_chat_progress(state, "❌ कुछ गड़बड़ हो गई")
-        return {**state,"_emit_progress": saved_callback,"status": "DONE"}
+        return node_update(state, status="DONE")
 
-    return state
+    return node_update(state)
 
 def planner_agent(state: dict) -> dict:
     """Plan the project - Uses HEAVY LLM for planning"""
-    saved_callback = state.get("_emit_progress")
     state = normalize_state(state)
+    speculative_job = None
 
     try:
         user_prompt = state.get("user_prompt", "")
 
         state = emit_chat_progress(state, "📋 **आपका idea समझ रहे हैं...**")
 
-        # ✅ FAST LLM for project name generation
-        try:
-            state = emit_chat_progress(state, f"🔍 आपके request का analysis कर रहे हैं...")
-            name_response = llm_fast.invoke(f'Extract short project name (2-3 words, lowercase, hyphens) from: "{user_prompt}". Return ONLY the name.')
-            project_name = name_response.content.strip().lower().replace(" ", "-")
-        except Exception:
-            import re
-            words = re.findall(r'\b\w+\b', user_prompt.lower())
-            project_name = "-".join(words[:2]) if words else "web-app"
-
-        state = emit_chat_progress(state, "🏗️ **Project का blueprint तैयार कर रहे हैं...**")
+        # ✅ Speculative scaffold: user named a slow stack explicitly → start it now, overlapped with planning
+        guessed_stack = guess_techstack(user_prompt)
+        if guessed_stack and scaffold_kind(guessed_stack) in SLOW_KINDS:
+            speculative_job = start_scaffold(guessed_stack, emit=scaffold_emitter(state), speculative=True)
 
-        # ✅ HEAVY LLM for structured planning
+        blueprint = None
+        task_plan = None
         resp = None
-        try:
-            resp = llm_heavy.with_structured_output(Plan).invoke(planner_prompt(user_prompt))
-            if resp and hasattr(resp, "files") and resp.files:
-                pass
-            else:
+
+        # ✅ COMBINED mode: name + plan + tasks in ONE heavy call
+        if PLANNING_MODE == "combined":
+            state = emit_chat_progress(state, "🏗️ **Project का blueprint तैयार कर रहे हैं...**")
+            try:
+                blueprint = traced_structured(llm_heavy, ProjectBlueprint, blueprint_prompt(user_prompt), "blueprint")
+            except Exception as e:
+                print(f"⚠️ Blueprint generation failed: {e}")
+                blueprint = None
+
+        if blueprint is not None:
+            # Per-stage fallbacks: bad name → heuristic, no files → fallback plan, no tasks → architect
+            project_name = slugify_project_name(blueprint.name) or heuristic_project_name(user_prompt)
+            if blueprint.files:
+                resp = blueprint.to_plan()
+            if blueprint.files and blueprint.implementation_steps:
+                task_plan = TaskPlan(implementation_steps=blueprint.implementation_steps)
+        else:
+            if PLANNING_MODE == "combined":
+                record_event("fallback", stage="blueprint")
+            # ✅ STAGED mode (or combined call failed): FAST LLM for project name generation
+            try:
+                state = emit_chat_progress(state, f"🔍 आपके request का analysis कर रहे हैं...")
+                name_response = traced_invoke(llm_fast, render_prompt("project_name", user_prompt=user_prompt), "project_name")
+                project_name = slugify_project_name(name_response.content) or heuristic_project_name(user_prompt)
+            except Exception:
+                project_name = heuristic_project_name(user_prompt)
+
+            if PLANNING_MODE != "combined":
+                state = emit_chat_progress(state, "🏗️ **Project का blueprint तैयार कर रहे हैं...**")
+
+            # ✅ HEAVY LLM for structured planning
+            try:
+                resp = traced_structured(llm_heavy, Plan, planner_prompt(user_prompt), "planner")
+                if resp and hasattr(resp, "files") and resp.files:
+                    pass
+                else:
+                    resp = None
+            except Exception as e:
+                print(f"⚠️ Plan generation failed: {e}")
                 resp = None
-        except Exception as e:
-            print(f"⚠️ Plan generation failed: {e}")
-            resp = None
 
         # FALLBACK plan
         if resp is None or not hasattr(resp, "files") or not resp.files:
+            record_event("fallback", stage="planner")
             state = emit_chat_progress(state, "⚙️ Intelligent planning system उपयोग कर रहे हैं...")
 
             prompt_lower = user_prompt.lower()
@@ -373,9 +311,13 @@ def planner_agent(state: dict) -> dict:
                 features=["Core functionality"],
                 files=files
             )
+            task_plan = None
 
         resp.name = project_name
 
+        # the only agent writes of a run land here (a reused name overwrites that project) - undo point first
+        snapshot_before(project_name, RUN_LABEL)
+
         # Show detailed plan
         plan_summary = f"""
 ✅ **Project plan तैयार है!**
@@ -397,26 +339,38 @@ def planner_agent(state: dict) -> dict:
 
         state = emit_chat_progress(state, plan_summary)
 
-        # Initialize project
+        # Initialize project in the background - architect joins it before coding starts
+        state = emit_chat_progress(state, f"🔧 **आपका प्रोजेक्ट बन रहा है:** `{project_name}`")
         try:
-            state = initialize_project(project_name, resp.techstack, state)
+            job = reconcile_scaffold(speculative_job, resp.techstack, emit=scaffold_emitter(state))
+            register_scaffold(project_name, job)
+            project_structure = job.kind
         except Exception as e:
             print(f"⚠️ Init error: {e}")
             project_path = get_project_path(project_name)
             project_path.mkdir(parents=True, exist_ok=True)
-            state["initialization_done"] = True
-            state["project_structure"] = "html"
+            project_structure = "html"
             state = emit_chat_progress(state, f"📁 Project directory बन गया: `{project_name}`")
 
-        return {
-            **state,
-            "plan": resp,
-            "current_project": project_name,
-            "_emit_progress": saved_callback
-        }
+        return node_update(
+            state,
+            plan=resp,
+            initialization_done=False,
+            project_structure=project_structure,
+            task_plan=task_plan,
+            coder_state=None,
+            coder_iterations=0,
+            run_attempts=0,
+            last_error=None,
+            debug_history=[],
+            current_project=project_name
+        )
 
     except Exception as e:
         print(f"❌ Critical planner error: {e}")
+        record_event("fallback", stage="planner_critical")
+        if speculative_job is not None:
+            speculative_job.cancel()
         fallback_name = "web-project"
         state = emit_chat_progress(state, f"⚙️ Basic project बना रहे हैं: `{fallback_name}`")
 
@@ -435,18 +389,19 @@ def planner_agent(state: dict) -> dict:
             ]
         )
 
-        return {
-            **state,
-            "plan": minimal_plan,
-            "current_project": fallback_name,
-            "initialization_done": True,
-            "project_structure": "html",
-            "_emit_progress": saved_callback
-        }
+        return node_update(
+            state,
+            plan=minimal_plan,
+            task_plan=None,
+            coder_state=None,
+            coder_iterations=0,
+            current_project=fallback_name,
+            initialization_done=True,
+            project_structure="html"
+        )
 
 def architect_agent(state: dict) -> dict:
     """Break down into tasks - Uses HEAVY LLM"""
-    saved_callback = state.get("_emit_progress")
     state = normalize_state(state)
 
     try:
@@ -458,25 +413,32 @@ def architect_agent(state: dict) -> dict:
 
         state = emit_chat_progress(state, "🏗️ **काम को छोटे-छोटे steps में तोड़ रहे हैं...**")
 
-        architect_context = f"""Project: {project_structure}
+        # Combined planning already produced the tasks - no second round trip
+        resp = state.get("task_plan")
+        if resp is not None and getattr(resp, "implementation_steps", None):
+            print("✅ Using tasks from combined planning, skipping architect LLM call")
+            record_event("architect_skipped")
+        else:
+            architect_context = f"""Project: {project_structure}
 Plan: {plan.model_dump_json()}"""
 
-        state = emit_chat_progress(state, "🔧 Files की dependencies समझ रहे हैं...")
+            state = emit_chat_progress(state, "🔧 Files की dependencies समझ रहे हैं...")
 
-        # ✅ HEAVY LLM for task breakdown
-        resp = None
-        try:
-            resp = llm_heavy.with_structured_output(TaskPlan).invoke(architect_prompt(plan=architect_context))
-            if resp and hasattr(resp, "implementation_steps") and resp.implementation_steps:
-                pass
-            else:
-                resp = None
-        except Exception as e:
-            print(f"⚠️ Architect failed: {e}")
+            # ✅ HEAVY LLM for task breakdown
             resp = None
+            try:
+                resp = traced_structured(llm_heavy, TaskPlan, architect_prompt(plan=architect_context), "architect")
+                if resp and hasattr(resp, "implementation_steps") and resp.implementation_steps:
+                    pass
+                else:
+                    resp = None
+            except Exception as e:
+                print(f"⚠️ Architect failed: {e}")
+                resp = None
 
         # FALLBACK
         if resp is None or not hasattr(resp, "implementation_steps") or not resp.implementation_steps:
+            record_event("fallback", stage="architect")
             state = emit_chat_progress(state, "⚙️ Task breakdown automatically generate कर रहे हैं...")
 
             tasks = []
@@ -507,14 +469,12 @@ Plan: {plan.model_dump_json()}"""
 
         state = emit_chat_progress(state, task_summary)
 
-        return {
-            **state,
-            "task_plan": resp,
-            "_emit_progress": saved_callback
-        }
+        # Scaffold has been running since planning - wait for it only now
+        return node_update(state, task_plan=resp, **join_scaffold(state))
 
     except Exception as e:
         print(f"❌ Architect error: {e}")
+        record_event("fallback", stage="architect_critical")
         plan = state.get("plan")
         if plan and hasattr(plan, "files"):
             emergency_tasks = [
@@ -524,29 +484,57 @@ Plan: {plan.model_dump_json()}"""
                 ) for f in plan.files
             ]
             resp = TaskPlan(implementation_steps=emergency_tasks)
-            return {
-                **state,
-                "task_plan": resp,
-                "_emit_progress": saved_callback
-            }
+            return node_update(state, task_plan=resp, **join_scaffold(state))
 
         state = emit_chat_progress(state, "❌ Planning में दिक्कत आई")
-        return {**state, "_emit_progress": saved_callback,"status": "DONE"}
+        return node_update(state, status="DONE", **join_scaffold(state))
+
+# generated files are staged and written together; this bounds what a crashed run can lose
+CODER_BATCH_FILES = 20
+
+def flush_generated_files(project_name: str) -> int:
+    """Write the coder's staged files in one batch (one sync, one broadcast)"""
+    files = pop_staged(project_name)
+    if files:
+        traced_tool(create_files_tool, {
+            "project_name": project_name,
+            "files": [{"filepath": path, "content": content} for path, content in files.items()]
+        })
+    return len(files)
+
+def completion_message(steps) -> str:
+    """Final reply of a generation run - verify_agent sends it once the checks are done"""
+    completion_msg = f"""
+🎉 **आपका project पूरा तैयार है!**
+
+✅ **बनाई गई files:** {len(steps)} files
+
+**Files:**
+"""
+    for file in [s.filepath for s in steps]:
+        completion_msg += f"\n • `{file}`"
+
+    completion_msg += f"""
+
+🚀 **अब क्या करें:**
+1. Projects tab में अपने project card पर click करें
+2. **Run** button दबाएं 
+3. **Preview** tab में अपना app देखें
+
+आपका project बिलकुल तैयार है! 💜
+"""
+    return completion_msg
 
 def coder_agent(state: dict) -> dict:
     """Write code file-by-file - Uses HEAVY LLM for code generation"""
-    saved_callback = state.get("_emit_progress")
     state = normalize_state(state)
     MAX_FILE_RETRIES = 2
 
     iteration_count = state.get("coder_iterations", 0) + 1
     if iteration_count > state.get("max_coder_iterations", 50):
+        flush_generated_files(state.get("current_project"))
         state = emit_chat_progress(state, "⚠️ सभी files complete हो गए हैं")
-        return {
-            **state,
-            "coder_iterations": iteration_count,
-            "status": "DONE"
-        }
+        return node_update(state, coder_iterations=iteration_count, status="DONE")
 
     try:
         coder_state: CoderState = state.get("coder_state")
@@ -555,7 +543,7 @@ def coder_agent(state: dict) -> dict:
 
         if not current_project:
             state = emit_chat_progress(state, "❌ कोई project select नहीं है")
-            return {**state, "coder_iterations": iteration_count, "status": "DONE"}
+            return node_update(state, coder_iterations=iteration_count, status="DONE")
 
         if coder_state is None:
             task_plan = state["task_plan"]
@@ -572,34 +560,9 @@ def coder_agent(state: dict) -> dict:
         steps = coder_state.task_plan.implementation_steps
 
         if coder_state.current_step_idx >= len(steps):
-            completion_msg = f"""
-🎉 **आपका project पूरा तैयार है!**
-
-✅ **बनाई गई files:** {len(steps)} files
-
-**Files:**
-"""
-            for file in [s.filepath for s in steps]:
-                completion_msg += f"\n • `{file}`"
-
-            completion_msg += f"""
-
-🚀 **अब क्या करें:**
-1. Projects tab में अपने project card पर click करें
-2. **Run** button दबाएं 
-3. **Preview** tab में अपना app देखें
-
-आपका project बिलकुल तैयार है! 💜
-"""
-
-            state = emit_chat_progress(state, completion_msg)
-            return {
-                **state,
-                "coder_state": coder_state,
-                "_emit_progress": saved_callback,
-                "coder_iterations": iteration_count,
-                "status": "DONE"
-            }
+            flush_generated_files(current_project)
+            state = emit_chat_progress(state, "✅ सभी coding steps पूरे हो गए!")
+            return node_update(state, coder_state=coder_state, coder_iterations=iteration_count, status="READY_TO_RUN")
 
         current_task = steps[coder_state.current_step_idx]
 
@@ -607,95 +570,85 @@ def coder_agent(state: dict) -> dict:
         progress_msg = f"⚙️ **[{coder_state.current_step_idx + 1}/{len(steps)}]** `{current_task.filepath}` file बना रहे हैं..."
         state = emit_chat_progress(state, progress_msg)
 
-        # ✅ HEAVY LLM for code generation
+        # Fast or heavy model per file (config/boilerplate → fast, retries → heavy)
+        file_ext = Path(current_task.filepath).suffix.lower()
         file_created = False
+        validation_error = None
+        code_content = None
+        staged_count = 0
         for retry in range(MAX_FILE_RETRIES):
+            if retry > 0:
+                record_event("retry", stage="coder")
             try:
-                # Prepare prompt for code generation
-                system_prompt = coder_system_prompt()
+                # Prepare prompt for code generation (static system prefix + this task)
                 retry_note = f" (फिर से कोशिश {retry + 1}/{MAX_FILE_RETRIES})" if retry > 0 else ""
+                fix_note = f"\nPrevious attempt was rejected: {validation_error}. Fix it.\n" if validation_error else ""
+                messages = coder_prompt(
+                    task=current_task.task_description, project=current_project,
+                    project_structure=project_structure, filepath=current_task.filepath,
+                    retry_note=retry_note, fix_note=fix_note
+                )
 
-                user_prompt = f"""Task: {current_task.task_description}{retry_note}
-Project: {current_project}
-Type: {project_structure}
-File: {current_task.filepath}
+                route = route_coder(
+                    current_task.filepath, current_task.task_description,
+                    step_count=len(steps), techstack=project_structure, retry=retry
+                )
+                print(f"🧭 {route}")
+                started = time.perf_counter()
+                response = traced_invoke(llm_for(route), messages, "coder")
+
+                # Clean code - take the fenced block matching this file type
+                code_content = extract_code(response.content, current_task.filepath)
+
+                # Validate BEFORE writing - broken output is retried right away
+                validation_error = validate_content(current_task.filepath, code_content)
+                record_outcome(route, validation_error is None, time.perf_counter() - started, ext=file_ext)
+                if validation_error:
+                    print(f"⚠️ Validation failed for {current_task.filepath}: {validation_error}, retry {retry + 1}")
+                    record_event("validation_failure", ext=file_ext or "none")
+                    continue
 
-Write COMPLETE, production-ready code for this file.
-Return ONLY the code content, no explanations.
-"""
+                # Stage the file - written with the rest of the batch
+                staged_count = stage_file(current_project, current_task.filepath, code_content)
+                file_created = True
 
-                # Call HEAVY LLM
-                response = llm_heavy.invoke([
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ])
-
-                code_content = response.content
-
-                # Clean code - check for triple backticks
-                if "```" in code_content:
-                    parts = code_content.split("```")
-                    for part in parts:
-                        if part.strip() and not part.strip().startswith(("python", "javascript", "jsx", "html", "css", "json")):
-                            code_content = part.strip()
-                            break
-
-                # Create file using tool
-                result = create_file_tool.invoke({
-                    "project_name": current_project,
-                    "filepath": current_task.filepath,
-                    "content": code_content
-                })
-
-                # Validate
-                project_path = get_project_path(current_project)
-                file_path = project_path / current_task.filepath
-
-                if file_path.exists() and file_path.stat().st_size > 10:
-                    file_created = True
-
-                    # Show what was created with snippet
-                    file_info = f"✅ **बन गई:** `{current_task.filepath}` ({len(code_content)} characters)"
-
-                    # Add code snippet
-                    lines = code_content.split("\n")
-                    if len(lines) > 5:
-                        snippet = "\n".join(lines[:3])
-                        file_info += f"\n\n```\n{snippet}\n... (कुल {len(lines)} lines)\n```"
-
-                    state = emit_chat_progress(state, file_info)
-                    print(f"✅ Created: {current_task.filepath}")
-                    break
-                else:
-                    print(f"⚠️ File validation failed, retry {retry + 1}")
+                # Show what was created with snippet
+                file_info = f"✅ **बन गई:** `{current_task.filepath}` ({len(code_content)} characters)"
+
+                # Add code snippet
+                lines = code_content.split("\n")
+                if len(lines) > 5:
+                    snippet = "\n".join(lines[:3])
+                    file_info += f"\n\n```\n{snippet}\n... (कुल {len(lines)} lines)\n```"
+
+                state = emit_chat_progress(state, file_info)
+                print(f"✅ Created: {current_task.filepath}")
+                break
 
             except Exception as e:
                 print(f"⚠️ Coder retry {retry + 1}: {e}")
                 if retry < MAX_FILE_RETRIES - 1:
                     continue
 
+        # Out of retries with only invalid output: keep it so verify/debugger can repair it
+        if not file_created and code_content and code_content.strip():
+            staged_count = stage_file(current_project, current_task.filepath, code_content)
+            state = emit_chat_progress(state, f"⚠️ `{current_task.filepath}` में syntax issue है ({validation_error}), बाद में fix करेंगे")
+            file_created = True
+
         if not file_created:
             state = emit_chat_progress(state, f"⚠️ `{current_task.filepath}` skip की (बाद में फिर कोशिश होगी)")
 
         coder_state.current_step_idx += 1
 
         if coder_state.current_step_idx >= len(steps):
+            flush_generated_files(current_project)
             state = emit_chat_progress(state, "✅ सभी coding steps पूरे हो गए!")
-            return {
-                **state,
-                "coder_state": coder_state,
-                "coder_iterations": iteration_count,
-                "_emit_progress": saved_callback,
-                "status": "DONE"
-            }
+            return node_update(state, coder_state=coder_state, coder_iterations=iteration_count, status="READY_TO_RUN")
 
-        return {
-            **state,
-            "coder_state": coder_state,
-            "coder_iterations": iteration_count,
-            "_emit_progress": saved_callback,
-            "status": "WORKING"
-        }
+        if staged_count >= CODER_BATCH_FILES:
+            flush_generated_files(current_project)
+        return node_update(state, coder_state=coder_state, coder_iterations=iteration_count, status="WORKING")
 
     except Exception as e:
         print(f"❌ Coder error: {e}")
@@ -703,77 +656,284 @@ Return ONLY the code content, no explanations.
         if coder_state:
             coder_state.current_step_idx += 1
 
-        return {
-            **state,
-            "coder_state": coder_state,
-            "coder_iterations": iteration_count,
-            "_emit_progress": saved_callback,
-            "status": "WORKING"
-        }
+        return node_update(state, coder_state=coder_state, coder_iterations=iteration_count, status="WORKING")
 
 def general_chat_agent(state: dict) -> dict:
-    """General conversation - Uses HEAVY LLM for quality responses"""
-    
-    # ✅ SAVE callback BEFORE normalize
-    saved_callback = state.get("_emit_progress")
-    
+    """General conversation - model picked by route_chat"""
     state = normalize_state(state)
-    
-    # ✅ RESTORE callback AFTER normalize
-    if saved_callback is not None:
-        state["_emit_progress"] = saved_callback
-        print("✅ Restored callback in general_chat_agent")
-    
+
     try:
         user_prompt = state.get("user_prompt", "")
         chat_history = state.get("chat_history", [])
-        
-        chat_prompt = f"""You are DevDost AI, a helpful coding assistant.
+        # chat_store puts the rolling summary of older turns first
+        summary = [m for m in chat_history[:1] if m.role == "system"]
+        recent = chat_history[-3:] if len(chat_history) > 3 else chat_history[len(summary):]
 
-Recent chat:
-{chat_history[-3:] if len(chat_history) > 3 else chat_history}
+        chat_prompt = render_prompt("chat", recent_chat=summary + recent, user_prompt=user_prompt)
 
-User: {user_prompt}
-
-Respond naturally and helpfully in Hindi/Hinglish in 2-3 sentences."""
-
-        # ✅ HEAVY LLM for better chat responses
-        response = llm_heavy.invoke(chat_prompt)
+        # Small talk → fast model, real questions → heavy
+        route = route_chat(user_prompt)
+        started = time.perf_counter()
+        response = traced_invoke(llm_for(route), chat_prompt, "chat")
+        record_outcome(route, True, time.perf_counter() - started)
         state = emit_chat_progress(state, response.content)
-
-        return {
-            **state,
-            "_emit_progress": saved_callback,  # ✅ ENSURE callback persists
-            "status": "DONE"
-        }
+        return node_update(state, status="DONE")
 
     except Exception as e:
         print(f"❌ Chat error: {e}")
         state = emit_chat_progress(state, "Sorry, कुछ गड़बड़ हो गई। फिर से try करें।")
-        return {
-            **state,
-            "_emit_progress": saved_callback,  # ✅ ENSURE callback persists
-            "status": "DONE"
-        }
+        return node_update(state, status="DONE")
 
 def file_ops_agent(state: dict) -> dict:
     """File operations - Uses FAST LLM"""
-    saved_callback = state.get("_emit_progress")
     state = normalize_state(state)
 
     try:
         current_project = state["current_project"]
         if not current_project:
             state = emit_chat_progress(state, "❌ कोई project select नहीं है")
-            return {**state,"_emit_progress": saved_callback,"status": "DONE"}
+            return node_update(state, status="DONE")
 
         state = emit_chat_progress(state, "✅ File operation UI में handle होगा")
-        return {**state, "_emit_progress": saved_callback,"status": "DONE"}
+        return node_update(state, status="DONE")
 
     except Exception as e:
         print(f"❌ File ops error: {e}")
         state = emit_chat_progress(state, "❌ File operation में दिक्कत आई")
-        return {**state, "_emit_progress": saved_callback,"status": "DONE"}
+        return node_update(state, status="DONE")
+
+# ===================== VERIFY + DEBUG LOOP =====================
+
+VERIFY_SKIP_DIRS = {"node_modules", ".git", "__pycache__", "dist", "build", ".next", "venv"}
+MAX_NODE_CHECK_FILES = 20
+BUILD_TIMEOUT = 240
+FIX_CACHE_SIZE = 200
+
+# error signature -> DebugInfo dict (+ "before_hash" for file fixes)
+FIX_CACHE: "OrderedDict[str, dict]" = OrderedDict()
+
+def _project_files(project_path: Path, extensions: tuple) -> list:
+    """Source files of a project, skipping dependency/build folders"""
+    found = []
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in VERIFY_SKIP_DIRS]
+        for name in files:
+            if name.endswith(extensions):
+                found.append(Path(root) / name)
+    return sorted(found)
+
+def _run_check(project_name: str, cmd: str, timeout: int) -> Tuple[Optional[bool], str]:
+    """Run a check through run_cmd_tool. Returns (passed, output); passed=None if inconclusive"""
+    output = traced_tool(run_cmd_tool, {"project_name": project_name, "cmd": cmd, "timeout": timeout})
+    match = re.search(r"Exit code: (-?\d+)", output)
+    if not match:
+        # Timeout / spawn error - can't blame the generated code for that
+        print(f"⚠️ Check inconclusive ({cmd}): {output[:200]}")
+        return None, output
+    return int(match.group(1)) == 0, output
+
+def run_project_checks(project_name: str, project_structure: str) -> Optional[str]:
+    """Quick local build/syntax check. Returns error text or None if everything passed"""
+    project_path = get_project_path(project_name)
+
+    if project_structure in ("react", "nextjs"):
+        package_json = project_path / "package.json"
+        try:
+            scripts = json.loads(package_json.read_text(encoding="utf-8")).get("scripts", {})
+        except Exception as e:
+            return f"package.json could not be parsed: {e}"
+
+        if "build" in scripts and (project_path / "node_modules").exists():
+            passed, output = _run_check(project_name, "npm run build", BUILD_TIMEOUT)
+            if passed is False:
+                return output[-4000:]
+        return None
+
+    errors = []
+
+    # In-process validators first (HTML structure, CSS, JSON, JS tokenizer)
+    for source_file in _project_files(project_path, (".html", ".htm", ".css", ".json", ".js", ".mjs", ".cjs", ".py")):
+        rel = source_file.relative_to(project_path).as_posix()
+        content = source_file.read_text(encoding="utf-8", errors="ignore")
+        error = validate_content(rel, content) if content.strip() else None
+        if error:
+            errors.append(f"{rel}: {error}")
+
+    if shutil.which("node") and not errors:
+        js_files = _project_files(project_path, (".js", ".cjs"))[:MAX_NODE_CHECK_FILES]
+        for js_file in js_files:
+            source = js_file.read_text(encoding="utf-8", errors="ignore")
+            # node --check parses .js as CommonJS; ESM files would be false positives
+            if re.search(r"^\s*(import|export)\s", source, re.MULTILINE):
+                continue
+            rel = js_file.relative_to(project_path).as_posix()
+            passed, output = _run_check(project_name, f'node --check "{rel}"', 15)
+            if passed is False:
+                errors.append(output.strip())
+
+    return "\n".join(errors) if errors else None
+
+def error_signature(project_structure: str, error: str) -> str:
+    """Stable key for an error: paths, line numbers and other noise stripped"""
+    lines = [
+        line.strip() for line in error.splitlines()
+        if re.search(r"error|cannot|can't|not found|unexpected|missing|never closed|closes", line, re.IGNORECASE)
+    ]
+    text = "\n".join(lines[:3]) or error[:300]
+    text = re.sub(r"(?:[A-Za-z]:)?[\\/][^\s:'\"()]+[\\/]([^\s:'\"()\\/]+)", r"\1", text)
+    text = re.sub(r"\d+", "N", text)
+    return hashlib.sha1(f"{project_structure}|{text}".encode("utf-8")).hexdigest()[:16]
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+def relevant_files_for_error(project_name: str, error: str, task_plan) -> list:
+    """Files mentioned in the error first, otherwise the generated files"""
+    project_path = get_project_path(project_name)
+    candidates = []
+
+    for match in re.findall(r"[\w./\\-]+\.(?:jsx?|tsx?|mjs|cjs|css|html?|json|py)\b", error):
+        match = match.replace("\\", "/")
+        for root in (str(project_path.as_posix()) + "/", "./"):
+            if match.startswith(root):
+                match = match[len(root):]
+        if (project_path / match).is_file() and match not in candidates:
+            candidates.append(match)
+
+    if not candidates and task_plan is not None:
+        candidates = [step.filepath for step in task_plan.implementation_steps]
+
+    return candidates[:5]
+
+def remember_fix(signature: str, fix: dict):
+    FIX_CACHE[signature] = fix
+    FIX_CACHE.move_to_end(signature)
+    while len(FIX_CACHE) > FIX_CACHE_SIZE:
+        FIX_CACHE.popitem(last=False)
+
+def cached_fix_for(signature: str, project_name: str) -> Optional[dict]:
+    """A cached fix is reusable if it installs a package or patches the exact same file content"""
+    fix = FIX_CACHE.get(signature)
+    if not fix:
+        return None
+
+    if fix.get("fix_type") == "install_package":
+        return fix
+
+    filepath = fix.get("filepath")
+    if not filepath:
+        return None
+
+    current = traced_tool(read_file_tool, {"project_name": project_name, "filepath": filepath})
+    if _content_hash(current) == fix.get("before_hash"):
+        return fix
+    return None
+
+def apply_fix(project_name: str, fix: dict) -> bool:
+    """Apply a DebugInfo-shaped fix to the project"""
+    fix_type = fix.get("fix_type")
+    content = fix.get("fix_content") or ""
+
+    if fix_type == "install_package":
+        packages = [p for p in content.split() if re.fullmatch(r"(@[\w.-]+/)?[\w.-]+(@[\w.^~<>=-]+)?", p)]
+        if not packages:
+            return False
+        passed, _ = _run_check(project_name, "npm install " + " ".join(packages), 180)
+        return passed is True
+
+    if fix_type in ("file_update", "create_file") and fix.get("filepath") and content.strip():
+        traced_tool(create_file_tool, {
+            "project_name": project_name,
+            "filepath": fix["filepath"],
+            "content": content
+        })
+        return True
+
+    return False
+
+def verify_agent(state: dict) -> dict:
+    """Quick build/syntax check after code generation"""
+    state = normalize_state(state)
+
+    current_project = state.get("current_project")
+    if not current_project:
+        return node_update(state, status="DONE")
+
+    emit_progress(state, "🔍 **Project check कर रहे हैं (build/syntax)...**")
+
+    try:
+        error = run_project_checks(current_project, state.get("project_structure", "html"))
+    except Exception as e:
+        print(f"⚠️ Verify error: {e}")
+        error = None
+
+    # check results are progress only; the completion message stays the run's final reply
+    coder_state = state.get("coder_state")
+    steps = coder_state.task_plan.implementation_steps if coder_state else []
+
+    if error is None:
+        emit_progress(state, "✅ **Check pass हो गया, project चलने के लिए तैयार है!**")
+        state = emit_chat_progress(state, completion_message(steps))
+        return node_update(state, last_error=None, status="DONE")
+
+    if state["run_attempts"] >= state["max_retries"]:
+        warning = f"⚠️ {state['run_attempts']} बार fix करने के बाद भी error बचा है:\n```\n{error[:200]}\n```"
+        state = emit_chat_progress(state, completion_message(steps) + "\n" + warning)
+        return node_update(state, last_error=error, status="DONE")
+
+    state = emit_chat_progress(state, f"🐞 Error मिला, fix कर रहे हैं:\n```\n{error[:200]}\n```")
+    return node_update(state, last_error=error, status="ERROR")
+
+def debugger_agent(state: dict) -> dict:
+    """Fix the last verify error - cached fix first, HEAVY LLM otherwise"""
+    state = normalize_state(state)
+
+    current_project = state["current_project"]
+    project_structure = state.get("project_structure", "html")
+    error = state.get("last_error") or ""
+    run_attempts = state["run_attempts"] + 1
+    debug_history = list(state["debug_history"])
+
+    signature = error_signature(project_structure, error)
+
+    try:
+        fix = cached_fix_for(signature, current_project)
+        if fix is not None:
+            print(f"♻️ Fix cache hit: {signature}")
+            record_event("cache_hit", cache="fix")
+            state = emit_chat_progress(state, "♻️ यह error पहले देखा है, पुराना fix लगा रहे हैं...")
+        else:
+            record_event("cache_miss", cache="fix")
+            files = relevant_files_for_error(current_project, error, state.get("task_plan"))
+            contents = {
+                f: traced_tool(read_file_tool, {"project_name": current_project, "filepath": f})
+                for f in files
+            }
+            project_files = "\n\n".join(f"--- {f} ---\n{c[:4000]}" for f, c in contents.items())
+
+            state = emit_chat_progress(state, "🧠 Error का analysis कर रहे हैं...")
+            info = traced_structured(
+                llm_heavy, DebugInfo, debug_prompt(error[:4000], project_files, debug_history[-5:]), "debugger"
+            )
+            fix = info.model_dump()
+            if fix.get("filepath") in contents:
+                fix["before_hash"] = _content_hash(contents[fix["filepath"]])
+
+        applied = apply_fix(current_project, fix)
+        debug_history.append(f"[{fix.get('fix_type')}] {fix.get('filepath') or fix.get('fix_content')}: {fix.get('diagnosis', '')}")
+
+        if applied:
+            if fix.get("fix_type") == "install_package" or fix.get("before_hash"):
+                remember_fix(signature, fix)
+            state = emit_chat_progress(state, f"🔧 **Fix लगाया:** {fix.get('diagnosis', '')}")
+        else:
+            state = emit_chat_progress(state, "⚠️ Fix apply नहीं हो पाया, फिर से check कर रहे हैं")
+
+    except Exception as e:
+        print(f"❌ Debugger error: {e}")
+        debug_history.append(f"[failed] {e}")
+
+    return node_update(state, run_attempts=run_attempts, debug_history=debug_history, status="RETRY_RUN")
 
 # ===================== ROUTING =====================
 
@@ -803,7 +963,10 @@ def route_after_architect(state: dict) -> str:
 
 def route_after_coder(state: dict) -> str:
     status = state.get("status")
-    if status in ["DONE", "READY_TO_RUN", "ERROR"]:
+    if status == "READY_TO_RUN":
+        return "verify"
+
+    if status in ["DONE", "ERROR"]:
         return "END"
 
     iteration_count = state.get("coder_iterations", 0)
@@ -822,69 +985,118 @@ def route_after_coder(state: dict) -> str:
 
     return "coder"
 
-# ==================== BUILD GRAPH ====================
-
-graph = StateGraph(State)
-
-# Add nodes
-graph.add_node("classifier", chat_classifier_agent)
-graph.add_node("project_manager", project_manager_agent)
-graph.add_node("file_ops", file_ops_agent)
-graph.add_node("planner", planner_agent)
-graph.add_node("architect", architect_agent)
-graph.add_node("coder", coder_agent)
-graph.add_node("general_chat", general_chat_agent)
-
-# Set entry
-graph.set_entry_point("classifier")
-
-# Routing
-graph.add_conditional_edges(
-    "classifier",
-    route_after_classification,
-    {
-        "planner": "planner",
-        "file_ops": "file_ops",
-        "project_manager": "project_manager",
-        "general_chat": "general_chat"
-    }
-)
-
-# Project creation flow
-graph.add_edge("planner", "architect")
-graph.add_conditional_edges(
-    "architect",
-    route_after_architect,
-    {
-        "END": END,
-        "coder": "coder"
-    }
-)
+def route_after_verify(state: dict) -> str:
+    if state.get("status") == "ERROR":
+        return "debugger"
+    return "END"
 
-# Coder loop
-graph.add_conditional_edges(
-    "coder",
-    route_after_coder,
-    {
-        "END": END,
-        "coder": "coder"
-    }
-)
+# ==================== BUILD GRAPH ====================
 
-# End nodes
-graph.add_edge("project_manager", END)
-graph.add_edge("file_ops", END)
-graph.add_edge("general_chat", END)
-
-# Compile agent
-try:
-    agent = graph.compile()
-    print("✅ Agent compiled successfully!")
-except Exception as e:
-    print(f"❌ Agent compilation failed: {e}")
-    import traceback
-    traceback.print_exc()
-    agent = None
+def build_agent():
+    """Wire and compile the LangGraph (imports langgraph only now)"""
+    from langgraph.constants import END
+    from langgraph.graph import StateGraph
+
+    graph = StateGraph(State)
+
+    # Add nodes
+    graph.add_node("classifier", traced_node("classifier")(chat_classifier_agent))
+    graph.add_node("project_manager", traced_node("project_manager")(project_manager_agent))
+    graph.add_node("file_ops", traced_node("file_ops")(file_ops_agent))
+    graph.add_node("planner", traced_node("planner")(planner_agent))
+    graph.add_node("architect", traced_node("architect")(architect_agent))
+    graph.add_node("coder", traced_node("coder")(coder_agent))
+    graph.add_node("verify", traced_node("verify")(verify_agent))
+    graph.add_node("debugger", traced_node("debugger")(debugger_agent))
+    graph.add_node("general_chat", traced_node("general_chat")(general_chat_agent))
+
+    # Set entry
+    graph.set_entry_point("classifier")
+
+    # Routing
+    graph.add_conditional_edges(
+        "classifier",
+        route_after_classification,
+        {
+            "planner": "planner",
+            "file_ops": "file_ops",
+            "project_manager": "project_manager",
+            "general_chat": "general_chat"
+        }
+    )
+
+    # Project creation flow
+    graph.add_edge("planner", "architect")
+    graph.add_conditional_edges(
+        "architect",
+        route_after_architect,
+        {
+            "END": END,
+            "coder": "coder"
+        }
+    )
+
+    # Coder loop
+    graph.add_conditional_edges(
+        "coder",
+        route_after_coder,
+        {
+            "END": END,
+            "coder": "coder",
+            "verify": "verify"
+        }
+    )
+
+    # Verify -> debug -> verify loop (bounded by max_retries)
+    graph.add_conditional_edges(
+        "verify",
+        route_after_verify,
+        {
+            "END": END,
+            "debugger": "debugger"
+        }
+    )
+    graph.add_edge("debugger", "verify")
+
+    # End nodes
+    graph.add_edge("project_manager", END)
+    graph.add_edge("file_ops", END)
+    graph.add_edge("general_chat", END)
+
+    return graph.compile()
+
+_agent = None
+_agent_lock = threading.Lock()
+
+def get_agent():
+    """Compiled agent, built once on first use"""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                try:
+                    _agent = build_agent()
+                    print("✅ Agent compiled successfully!")
+                except Exception as e:
+                    print(f"❌ Agent compilation failed: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    return None
+    return _agent
+
+def warm_up():
+    """Compile the agent and build model clients ahead of the first request (run in a background thread)"""
+    get_agent()
+    warm_prompts()
+    for llm in (llm_heavy, llm_fast):
+        if isinstance(llm, LazyLLM):
+            llm.load()
+
+def __getattr__(name):
+    # `from graph import agent` / `graph.agent` keep working, compiled lazily
+    if name == "agent":
+        return get_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ==================== CLI ====================
 
@@ -901,6 +1113,9 @@ def interactive_session():
     print(" • List: 'show all projects'")
     print(" • Exit: 'quit'\n")
 
+    # imports/compiles while the user types the first message
+    threading.Thread(target=warm_up, daemon=True).start()
+
     state = {
         "chat_history": [],
         "current_project": None
@@ -919,7 +1134,16 @@ def interactive_session():
 
             state["user_prompt"] = user_input
 
-            result = agent.invoke(state, config={"recursion_limit": 100})
+            fast = try_fast_path(user_input, state.get("current_project"))
+            if fast is not None:
+                state["current_project"] = fast.current_project
+                state["chat_history"] = state["chat_history"] + [ChatRecord("user", user_input), ChatRecord("assistant", fast.message)]
+                print(f"\n🤖 DevDost: {fast.message}")
+                continue
+
+            with span("agent.run", kind="run", source="cli"):
+                result = get_agent().invoke(state, config={"recursion_limit": 100})
+            flush_generated_files(result.get("current_project"))  # a coder loop cut short leaves files staged
             state.update(result)
 
             # Show last AI message
@@ -9,6 +9,9 @@ Two-stage hybrid approach: Pattern Matching + LLM Fallback
 import re
 from typing import Dict, List, Tuple, Optional
 
+from telemetry import traced_invoke, record_event
+from prompts import render_prompt
+
 class IntentClassifier:
     """
     Production-ready intent classifier with multi-stage detection
@@ -200,51 +203,12 @@ class IntentClassifier:
         Enhanced prompt with examples and strict output format
         """
         
-        examples = """
-Examples for clarity:
-
-1. "hello" → CHAT
-2. "calculator banao" → NEW_PROJECT
-3. "button ka color change karo" → MODIFY_PROJECT
-4. "files dikha" → FILE_OPS
-5. "todo-app kholo" → PROJECT_SWITCH
-6. "kitne projects hain" → PROJECT_LIST
-7. "run karo" → RUN_PROJECT
-8. "aap kaun ho" → CHAT
-9. "red button add karo" → MODIFY_PROJECT
-10. "naya game banao" → NEW_PROJECT
-"""
-
-        classifier_prompt = f"""You are an expert intent classifier for a coding assistant.
-
-CONTEXT:
-- Current project: {current_project or "No project selected"}
-- User input: "{user_prompt}"
-
-INTENT DEFINITIONS:
-- NEW_PROJECT: User wants to create/build a new project, app, or website
-- MODIFY_PROJECT: User wants to change/add/fix something in current project
-- FILE_OPS: User wants file/folder operations (list, show, create files)
-- PROJECT_SWITCH: User wants to switch/open a different project
-- PROJECT_LIST: User wants to see list of available projects
-- RUN_PROJECT: User wants to run/execute/test the project
-- CHAT: General conversation, questions about you, greetings, help requests
-
-{examples}
-
-RULES:
-1. If no project is selected and user asks to modify/change → NEW_PROJECT (not MODIFY_PROJECT)
-2. "kya kya bana sakte ho" = CHAT (asking about capabilities)
-3. "aap kaun ho", "owner", "kisne banaya" = CHAT
-4. "kitne projects", "saare projects" = PROJECT_LIST
-5. Focus on PRIMARY intent, ignore filler words
-
-RESPOND WITH ONLY ONE WORD FROM: NEW_PROJECT, MODIFY_PROJECT, FILE_OPS, PROJECT_SWITCH, PROJECT_LIST, RUN_PROJECT, CHAT
-
-Intent:"""
-
         try:
-            response = llm.invoke(classifier_prompt)
+            # static rules + few-shot examples are the precompiled system prefix
+            classifier_prompt = render_prompt(
+                "classifier", current_project=current_project or "No project selected", user_prompt=user_prompt
+            )
+            response = traced_invoke(llm, classifier_prompt, "classifier")
             intent = response.content.strip().upper()
             
             valid_intents = ["NEW_PROJECT", "MODIFY_PROJECT", "FILE_OPS", "PROJECT_SWITCH", "PROJECT_LIST", "RUN_PROJECT", "CHAT"]
@@ -273,6 +237,7 @@ Intent:"""
         # If high confidence (>0.7), return immediately
         if confidence >= 0.7:
             print(f"✅ Pattern match: {intent} (confidence: {confidence:.2f})")
+            record_event("classifier_pattern_hit")
             return intent
         
         # Stage 2: LLM classification for ambiguous cases
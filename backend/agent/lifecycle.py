@@ -0,0 +1,191 @@
+"""
+Project lifecycle: hot trees, cold archives
+Generated projects used to keep their full tree (node_modules included) under
+PROJECTS_ROOT forever. Projects nobody has written, run or opened for
+DEVDOST_ARCHIVE_DAYS (default 30, 0 = never) are packed into a zip - the format
+download_project already serves - without their regenerable dirs, and the tree
+is removed:
+
+    PROJECTS_ROOT/.archive/[<bucket>/]<name>.zip     (bucket in the sharded layout)
+
+Restore is transparent: paths.get_project_path unpacks an archived project on
+first access (/get_files, /projects/<name>/switch, a run, an agent edit). Restore
+latency is bounded by only archiving projects up to MAX_ARCHIVE_SOURCE_BYTES,
+and measured in devdost_restore_duration_seconds. Dependencies come back with the
+next run (npm install when node_modules is missing).
+
+Sweeps run in the watcher process (one per deployment) and skip projects a
+client has open or that are running; both are checked again, with the tree's
+mtimes, right before the tree is removed. Under eventlet the restore's unzip runs
+on a tpool thread so the worker keeps serving. Manual: python lifecycle.py archive [days]
+"""
+
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+import zipfile
+from typing import Callable, List, Optional
+
+from paths import storage
+from project_store import get_project_store, update_store
+from telemetry import metrics, record_event
+
+ARCHIVE_AFTER_DAYS = float(os.getenv("DEVDOST_ARCHIVE_DAYS", "30"))
+SWEEP_INTERVAL_SECONDS = 3600
+# dirs rebuilt by npm install / pip / a build - never archived
+REGENERABLE_DIRS = {"node_modules", ".next", "__pycache__", "venv", ".venv", ".cache", ".parcel-cache", ".turbo"}
+# bigger projects stay hot: restoring them could not be kept fast
+MAX_ARCHIVE_SOURCE_BYTES = 128 * 1024 * 1024
+RESTORE_WARN_SECONDS = 2.0
+
+metrics.describe("devdost_archive_bytes", "histogram", "Size of project archives written")
+metrics.describe("devdost_restore_duration_seconds", "histogram", "Time to restore an archived project")
+
+_restore_lock = threading.Lock()
+
+def _offload(fn, *args):
+    """Run blocking disk work on a tpool thread when this worker is eventlet-patched"""
+    if "eventlet" in sys.modules:
+        from eventlet import patcher, tpool
+        if patcher.is_monkey_patched("thread"):
+            return tpool.execute(fn, *args)
+    return fn(*args)
+
+def _newest_mtime(project_path) -> int:
+    """Latest mtime (ns) of the archived part of a tree - dirs included, so creates/deletes count"""
+    newest = os.stat(project_path).st_mtime_ns
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = [d for d in dirs if d not in REGENERABLE_DIRS]
+        for name in dirs + files:
+            try:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime_ns)
+            except OSError:
+                return -1  # vanished mid-walk: the tree is changing
+    return newest
+
+def archive_project(project_name: str, is_active: Optional[Callable[[str], bool]] = None) -> Optional[int]:
+    """
+    Pack one project into its archive and remove the tree. Returns the archive size, None if skipped.
+    `is_active` is asked again just before removal; the project is kept if it says yes
+    or if the tree changed while it was being packed.
+    """
+    project_path = storage.path_for(project_name)
+    if not project_path.is_dir():
+        return None
+    archive = storage.archive_path(project_name)
+    archive.parent.mkdir(parents=True, exist_ok=True)
+    temp = archive.with_name(f".{archive.name}.{uuid.uuid4().hex}.tmp")
+
+    source_bytes = 0
+    try:
+        packed_mtime = _newest_mtime(project_path)
+        with zipfile.ZipFile(temp, "w", zipfile.ZIP_DEFLATED) as zf:
+            for root, dirs, files in os.walk(project_path):
+                dirs[:] = [d for d in dirs if d not in REGENERABLE_DIRS]
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    source_bytes += os.path.getsize(file_path)
+                    if source_bytes > MAX_ARCHIVE_SOURCE_BYTES:
+                        raise OverflowError(f"over {MAX_ARCHIVE_SOURCE_BYTES // (1024 * 1024)}MB")
+                    zf.write(file_path, os.path.relpath(file_path, project_path))
+        with open(temp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(temp, archive)
+    except Exception as e:
+        temp.unlink(missing_ok=True)
+        print(f"⚠️ Not archiving {project_name}: {e}")
+        return None
+
+    if (is_active is not None and is_active(project_name)) or _newest_mtime(project_path) != packed_mtime:
+        # the tree stays live and wins; the archive would be stale
+        archive.unlink(missing_ok=True)
+        print(f"⚠️ Not archiving {project_name}: opened or changed while archiving")
+        return None
+
+    # out of view in one rename, then deleted at leisure
+    trash = storage.archive_root / f".trash-{uuid.uuid4().hex}"
+    os.rename(project_path, trash)
+    shutil.rmtree(trash, ignore_errors=True)
+
+    size = archive.stat().st_size
+    update_store("mark_archived", project_name, time.time())
+    metrics.observe("devdost_archive_bytes", size)
+    record_event("project_archived")
+    print(f"🧊 Archived {project_name}: {source_bytes / 1024:.0f}KB → {size / 1024:.0f}KB")
+    return size
+
+def _extract(archive, staging):
+    with zipfile.ZipFile(archive) as zf:
+        zf.extractall(staging)
+
+def restore_project(project_name: str) -> bool:
+    """Unpack an archived project into place. Safe to race with other processes"""
+    target = storage.path_for(project_name)
+    archive = storage.archive_path(project_name)
+    with _restore_lock:
+        if target.exists():
+            return True
+        if not archive.is_file():
+            return False
+        started = time.perf_counter()
+        staging = storage.archive_root / f".restore-{uuid.uuid4().hex}"
+        try:
+            _offload(_extract, archive, staging)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(staging, target)
+        except OSError:
+            # another worker restored it first (rename onto an existing dir fails)
+            shutil.rmtree(staging, ignore_errors=True)
+            return target.exists()
+        archive.unlink(missing_ok=True)
+
+    seconds = time.perf_counter() - started
+    update_store("mark_archived", project_name, None)
+    metrics.observe("devdost_restore_duration_seconds", seconds)
+    record_event("project_restored")
+    if seconds > RESTORE_WARN_SECONDS:
+        print(f"⚠️ Restoring {project_name} took {seconds:.1f}s")
+    else:
+        print(f"♻️ Restored {project_name} in {seconds * 1000:.0f}ms")
+    return True
+
+def discard_archive(project_name: str) -> bool:
+    """Delete a project's archive (project deletion - no restore needed)"""
+    archive = storage.archive_path(project_name)
+    if not archive.is_file():
+        return False
+    archive.unlink(missing_ok=True)
+    return True
+
+def active_projects(registry) -> set:
+    """Projects a client has open or that are running - never archived"""
+    return set(registry.watched_projects()) | {entry["project"] for entry in registry.list_processes()}
+
+def archive_cold_projects(registry, days: Optional[float] = None, limit: Optional[int] = None) -> List[str]:
+    """Archive projects idle for `days` that no client of `registry` has open or running. Returns the archived names"""
+    days = ARCHIVE_AFTER_DAYS if days is None else days
+    if days <= 0:
+        return []
+    active = active_projects(registry)
+    archived = []
+    for name in get_project_store().idle_projects(time.time() - days * 86400):
+        if limit is not None and len(archived) >= limit:
+            break
+        if name in active:
+            continue
+        # a client may open it while it is being packed - re-read the registry before removal
+        if archive_project(name, is_active=lambda n: n in active_projects(registry)) is not None:
+            archived.append(name)
+    return archived
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["archive"]:
+        from session_store import open_session_registry
+        days = float(sys.argv[2]) if len(sys.argv) > 2 else None
+        names = archive_cold_projects(open_session_registry(), days)
+        print(f"🧊 Archived {len(names)} project(s)")
+    else:
+        print("Usage: python lifecycle.py archive [days]")
@@ -0,0 +1,315 @@
+"""
+Shared LLM gateway
+Every model call from every session goes through one asyncio loop per process:
+- pooled keep-alive HTTP connections (one httpx client pair shared by all ChatGroq clients)
+- per-model concurrency semaphores + token-bucket request rate limits
+- jittered exponential backoff on 429 / 5xx / timeouts (honours Retry-After;
+  the SDK's own retries are switched off so there is a single retry policy)
+- in-flight dedup: identical (model, prompt, schema) calls share one request
+
+Sync graph nodes go through LazyLLM.invoke, which blocks on gateway.invoke() while
+the call runs on the gateway loop; LazyLLM.ainvoke awaits gateway.acall(), which
+hands the call to that loop from whatever loop the caller is on.
+
+The loop always runs on a real OS thread, also under eventlet.monkey_patch()
+(serve.py workers): a greenthread loop would share the hub with the callers
+waiting on it. There, a caller waits through eventlet.tpool, so only a pool
+thread blocks and the worker's greenthreads keep running
+(EVENTLET_THREADPOOL_SIZE bounds concurrent waits, default 20).
+
+Config:
+    DEVDOST_LLM_GATEWAY=0     bypass (direct client.invoke with SDK retries)
+    DEVDOST_LLM_LIMITS='{"llama-3.1-8b-instant": {"rpm": 60, "concurrency": 8}}'
+"""
+
+import asyncio
+import copy
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+from telemetry import metrics, model_name_of
+
+ENABLED = os.getenv("DEVDOST_LLM_GATEWAY", "1") != "0"
+
+# rpm = sustained requests/minute, burst = bucket size
+DEFAULT_LIMITS = {"concurrency": 4, "rpm": 30, "burst": 5}
+MODEL_LIMITS = {
+    "openai/gpt-oss-120b": {"concurrency": 4, "rpm": 30, "burst": 5},
+    "llama-3.1-8b-instant": {"concurrency": 8, "rpm": 30, "burst": 10},
+}
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout",
+                    "ReadTimeout", "ReadError", "RemoteProtocolError", "TimeoutException"}
+
+POOL = {"max_connections": 64, "max_keepalive_connections": 16, "keepalive_expiry": 60.0}
+REQUEST_TIMEOUT = 120.0
+
+metrics.describe("devdost_llm_gateway_wait_seconds", "histogram", "Time LLM calls waited for a rate-limit token or slot")
+metrics.describe("devdost_llm_retries_total", "counter", "LLM calls retried by the gateway")
+metrics.describe("devdost_llm_dedup_total", "counter", "LLM calls served by an identical in-flight request")
+
+def _eventlet_patched() -> bool:
+    if "eventlet" not in sys.modules:
+        return False  # monkey_patch() imports it; never pull it in just to ask
+    from eventlet import patcher
+    return patcher.is_monkey_patched("thread")
+
+def _original(module: str):
+    """A stdlib module as it was before eventlet.monkey_patch() (itself when not patched)"""
+    if not _eventlet_patched():
+        return __import__(module)
+    from eventlet import patcher
+    return patcher.original(module)
+
+def _real_selector():
+    """A selector over the real select module. monkey_patch() swaps in eventlet's select,
+    which has no epoll and only works from greenthreads of the main hub"""
+    import importlib
+    saved = {name: sys.modules.pop(name, None) for name in ("select", "selectors")}
+    sys.modules["select"] = _original("select")
+    try:
+        return importlib.import_module("selectors").DefaultSelector()
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+def limits_for(model: str) -> dict:
+    limits = dict(DEFAULT_LIMITS)
+    limits.update(MODEL_LIMITS.get(model, {}))
+    try:
+        limits.update(json.loads(os.getenv("DEVDOST_LLM_LIMITS", "{}")).get(model, {}))
+    except (ValueError, AttributeError):
+        print("⚠️ DEVDOST_LLM_LIMITS is not a JSON object, ignoring it")
+    return limits
+
+def classify_error(exc: Exception) -> Tuple[bool, Optional[float]]:
+    """(retryable, Retry-After seconds if the provider sent one)"""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+    retryable = status in RETRYABLE_STATUS or type(exc).__name__ in RETRYABLE_ERRORS
+    hint = None
+    headers = getattr(response, "headers", None)
+    if retryable and headers is not None:
+        try:
+            hint = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            hint = None
+    return retryable, hint
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+class TokenBucket:
+    """Request rate limit; only touched from the gateway loop, so no lock"""
+
+    def __init__(self, rpm: float, burst: int):
+        self.rate = max(rpm, 0.001) / 60.0
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float):
+        """Provider asked us to back off - nobody on this model sends until then"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ModelLane:
+    """Limits for one model"""
+
+    def __init__(self, model: str):
+        limits = limits_for(model)
+        self.semaphore = asyncio.Semaphore(limits["concurrency"])
+        self.bucket = TokenBucket(limits["rpm"], limits["burst"])
+
+def _message_key(item):
+    # BaseMessage / dict / tuple -> something json can hash stably
+    if isinstance(item, dict):
+        return [item.get("role"), item.get("content")]
+    return [getattr(item, "type", type(item).__name__), getattr(item, "content", str(item))]
+
+def request_key(model: str, payload, schema=None, options: Optional[dict] = None,
+                call: Optional[dict] = None) -> str:
+    body = payload if isinstance(payload, str) else [_message_key(m) for m in payload]
+    key = [model, getattr(schema, "__name__", schema), sorted((options or {}).items()), body]
+    if call:
+        key.append(sorted(call.items()))
+    return json.dumps(key, default=str, ensure_ascii=False)
+
+def call_kwargs(args: tuple, kwargs: dict) -> dict:
+    """The extras of Runnable.invoke(input, config=None, **kwargs) as one dict"""
+    if len(args) > 1:
+        raise TypeError(f"invoke() takes at most one positional argument after the input ({len(args)} given)")
+    return dict(kwargs, config=args[0]) if args else dict(kwargs)
+
+class LLMGateway:
+    def __init__(self):
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._lanes = {}
+        self._inflight = {}
+        self._structured = {}
+        self._http = None
+        self._http_async = None
+
+    # ---------- shared HTTP pool ----------
+
+    def client_kwargs(self) -> dict:
+        """Extra ChatGroq kwargs: pooled httpx clients, retries left to the gateway"""
+        if not ENABLED:
+            return {}
+        import httpx
+
+        with self._loop_lock:
+            if self._http is None:
+                limits = httpx.Limits(**POOL)
+                self._http = httpx.Client(limits=limits, timeout=REQUEST_TIMEOUT)
+                self._http_async = httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT)
+        return {"http_client": self._http, "http_async_client": self._http_async, "max_retries": 0}
+
+    # ---------- async API ----------
+
+    def _lane(self, model: str) -> ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = self._lanes[model] = ModelLane(model)
+        return lane
+
+    def _runnable(self, llm, schema, options: dict):
+        client = llm.load() if hasattr(llm, "load") else llm
+        if schema is None:
+            return client
+        key = (id(client), schema, tuple(sorted(options.items())))
+        runnable = self._structured.get(key)
+        if runnable is None:
+            runnable = self._structured[key] = client.with_structured_output(schema, **options)
+        return runnable
+
+    async def _call(self, llm, payload, schema, options: dict, call: dict):
+        model = model_name_of(llm)
+        lane = self._lane(model)
+        runnable = self._runnable(llm, schema, options)
+        for attempt in range(MAX_ATTEMPTS):
+            started = time.perf_counter()
+            await lane.bucket.acquire()
+            async with lane.semaphore:
+                metrics.observe("devdost_llm_gateway_wait_seconds", time.perf_counter() - started, model=model)
+                try:
+                    return await runnable.ainvoke(payload, **call)
+                except Exception as e:
+                    retryable, hint = classify_error(e)
+                    if not retryable or attempt == MAX_ATTEMPTS - 1:
+                        raise
+                    error = e
+            if hint:
+                lane.bucket.pause(hint)
+            delay = max(hint or 0.0, backoff_delay(attempt))
+            metrics.inc("devdost_llm_retries_total", model=model)
+            print(f"⚠️ {model} call failed ({type(error).__name__}), retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def ainvoke(self, llm, payload, schema=None, call=None, **options):
+        """One model call with limits, retries and dedup (must run on the gateway loop;
+        `call` holds the Runnable.ainvoke extras such as config)"""
+        call = call or {}
+        key = request_key(model_name_of(llm), payload, schema, options, call)
+        task = self._inflight.get(key)
+        if task is not None:
+            metrics.inc("devdost_llm_dedup_total", model=model_name_of(llm))
+            # followers get their own copy - callers may mutate parsed results
+            return copy.deepcopy(await asyncio.shield(task))
+        task = asyncio.ensure_future(self._call(llm, payload, schema, options, call))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    # ---------- sync facade ----------
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    if _eventlet_patched():
+                        # the patched selectors would park the loop on an eventlet hub
+                        loop = asyncio.SelectorEventLoop(_real_selector())
+                    else:
+                        loop = asyncio.new_event_loop()
+                    thread = _original("threading").Thread(target=loop.run_forever, name="llm-gateway", daemon=True)
+                    thread.start()
+                    self._loop = loop
+        return self._loop
+
+    async def acall(self, llm, payload, schema=None, call=None, **options):
+        """ainvoke() for code on any loop: the lanes, the in-flight table and the pooled
+        async client belong to the gateway loop, so the call is handed over to it"""
+        loop = self._ensure_loop()
+        request = self.ainvoke(llm, payload, schema, call, **options)
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await request
+        except RuntimeError:
+            pass
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(request, loop))
+
+    def invoke(self, llm, payload, schema=None, call=None, **options):
+        """Blocking call for sync code (graph nodes); the request runs on the gateway loop"""
+        loop = self._ensure_loop()
+        done = _original("threading").Event()  # set from the loop thread: must be a real lock
+        outcome = {}
+
+        def start():
+            task = loop.create_task(self.ainvoke(llm, payload, schema, call, **options))
+
+            def finish(t):
+                outcome["task"] = t
+                done.set()
+            task.add_done_callback(finish)
+
+        loop.call_soon_threadsafe(start)
+        if _eventlet_patched():
+            from eventlet import tpool
+            tpool.execute(done.wait)  # a pool thread blocks; this greenthread yields to the hub
+        else:
+            done.wait()
+        return outcome["task"].result()
+
+gateway = LLMGateway()
+
+class GatewayStructured:
+    """What LazyLLM.with_structured_output returns: .invoke goes through the gateway"""
+
+    def __init__(self, llm, schema, options: dict):
+        self.llm = llm
+        self.schema = schema
+        self.options = options
+
+    def invoke(self, payload, *args, **kwargs):
+        return gateway.invoke(self.llm, payload, self.schema, call_kwargs(args, kwargs), **self.options)
+
+    async def ainvoke(self, payload, *args, **kwargs):
+        return await gateway.acall(self.llm, payload, self.schema, call_kwargs(args, kwargs), **self.options)
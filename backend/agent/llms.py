@@ -0,0 +1,76 @@
+"""
+Model clients, built on first use
+Importing langchain_groq + constructing ChatGroq costs ~1s, which every worker
+and the CLI used to pay at import time even when no LLM call happens.
+Calls are routed through llm_gateway (shared connection pool, rate limits, retries).
+"""
+
+import threading
+
+LLM_CONFIG = {
+    "heavy": {"model": "openai/gpt-oss-120b", "temperature": 0.3, "max_retries": 2},
+    "fast": {"model": "llama-3.1-8b-instant", "temperature": 0.3, "max_retries": 2},
+}
+
+_setup_done = False
+
+def _setup():
+    global _setup_done
+    if _setup_done:
+        return
+    from dotenv import load_dotenv
+    from langchain_core.globals import set_debug, set_verbose
+
+    _ = load_dotenv()
+    set_debug(False)
+    set_verbose(False)
+    _setup_done = True
+
+class LazyLLM:
+    """Stands in for a ChatGroq client; the real one is created on first attribute access"""
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._client = None
+        self._lock = threading.Lock()
+        # known without building the client (banners, telemetry labels)
+        self.model_name = kwargs["model"]
+
+    def load(self):
+        """The real client (built on first call)"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    _setup()
+                    from langchain_groq.chat_models import ChatGroq
+                    from llm_gateway import gateway
+                    self._client = ChatGroq(**{**self._kwargs, **gateway.client_kwargs()})
+        return self._client
+
+    def invoke(self, payload, *args, **kwargs):
+        from llm_gateway import ENABLED, call_kwargs, gateway
+        if not ENABLED:
+            return self.load().invoke(payload, *args, **kwargs)
+        return gateway.invoke(self, payload, call=call_kwargs(args, kwargs))
+
+    async def ainvoke(self, payload, *args, **kwargs):
+        from llm_gateway import ENABLED, call_kwargs, gateway
+        if not ENABLED:
+            return await self.load().ainvoke(payload, *args, **kwargs)
+        return await gateway.acall(self, payload, call=call_kwargs(args, kwargs))
+
+    def with_structured_output(self, schema, **kwargs):
+        from llm_gateway import ENABLED, GatewayStructured
+        if not ENABLED:
+            return self.load().with_structured_output(schema, **kwargs)
+        return GatewayStructured(self, schema, kwargs)
+
+    def __getattr__(self, name):
+        # only reached for attributes not defined here (bind_tools, model_kwargs...)
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+# ✅ Use your exact LLM setup
+llm_heavy = LazyLLM(**LLM_CONFIG["heavy"])
+llm_fast = LazyLLM(**LLM_CONFIG["fast"])
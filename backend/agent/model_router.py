@@ -0,0 +1,154 @@
+"""
+Model routing: fast vs heavy per call
+The coder and chat nodes used llm_heavy for everything, a .gitignore or "hi"
+included. route_coder / route_chat pick a tier from cheap task features:
+- file type (config, styles, docs → fast; source files → by size/complexity)
+- expected size (task description length)
+- plan complexity (number of files, framework)
+- history: a tier/extension pair whose validation keeps failing on fast is escalated;
+  every PROBE_EVERY-th escalated call still goes fast so the rate can recover
+Retries always go to heavy.
+
+Override table (ROUTE_OVERRIDES or DEVDOST_MODEL_ROUTES='{"coder:.css": "heavy", "chat": "fast"}'):
+keys are a route name ("coder:.json"), a purpose ("coder") or "*".
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from telemetry import metrics
+
+FAST, HEAVY = "fast", "heavy"
+
+# files that are boilerplate regardless of the task text
+FAST_FILENAMES = {
+    ".gitignore", ".env", ".env.example", ".npmrc", ".nvmrc", ".prettierrc", ".editorconfig",
+    "license", "readme.md", "robots.txt", "requirements.txt", "procfile",
+}
+FAST_EXTENSIONS = {".md", ".txt", ".json", ".css", ".scss", ".svg", ".yml", ".yaml", ".toml", ".ini", ".cfg", ".env"}
+SOURCE_EXTENSIONS = {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".py", ".html", ".htm", ".vue"}
+
+LARGE_TASK_CHARS = 700      # task text this long → the file will be big, use heavy
+SMALL_TASK_CHARS = 220      # short source tasks (entry points, tiny helpers) can go fast
+COMPLEX_PLAN_STEPS = 8
+FRAMEWORK_STACKS = {"react", "next", "nextjs", "next.js", "vue", "angular"}
+
+HISTORY_SIZE = 20
+ESCALATE_MIN_SAMPLES = 5
+ESCALATE_FAILURE_RATE = 0.3
+PROBE_EVERY = 10            # escalated calls per extension between fast probes
+
+CHAT_FAST_MAX_CHARS = 60
+CHAT_HEAVY_HINTS = ("code", "error", "bug", "kaise", "how", "why", "explain", "samjha", "difference", "```")
+
+ROUTE_OVERRIDES: Dict[str, str] = {}
+
+metrics.describe("devdost_route_calls_total", "counter", "Routed LLM calls by route, tier and outcome")
+metrics.describe("devdost_route_duration_seconds", "histogram", "Latency of routed LLM calls")
+
+class Route:
+    """Routing decision for one call"""
+
+    __slots__ = ("name", "tier", "reason")
+
+    def __init__(self, name: str, tier: str, reason: str):
+        self.name = name
+        self.tier = tier
+        self.reason = reason
+
+    def __repr__(self):
+        return f"Route({self.name} → {self.tier}: {self.reason})"
+
+_history: Dict[tuple, deque] = {}
+_escalated: Dict[str, int] = {}
+_history_lock = threading.Lock()
+
+def _overrides() -> Dict[str, str]:
+    table = dict(ROUTE_OVERRIDES)
+    try:
+        table.update(json.loads(os.getenv("DEVDOST_MODEL_ROUTES", "{}")))
+    except (ValueError, TypeError):
+        print("⚠️ DEVDOST_MODEL_ROUTES is not a JSON object, ignoring it")
+    return table
+
+def _override_for(name: str) -> Optional[str]:
+    table = _overrides()
+    for key in (name, name.split(":", 1)[0], "*"):
+        tier = table.get(key)
+        if tier in (FAST, HEAVY):
+            return tier
+    return None
+
+def _decide(name: str, tier: str, reason: str) -> Route:
+    override = _override_for(name)
+    if override is not None:
+        return Route(name, override, "override")
+    return Route(name, tier, reason)
+
+def _file_kind(filepath: str):
+    """(basename, extension) lower-cased"""
+    base = filepath.replace("\\", "/").rsplit("/", 1)[-1].lower()
+    ext = "." + base.rsplit(".", 1)[-1] if "." in base.lstrip(".") else ""
+    return base, ext
+
+def failure_rate(tier: str, ext: str) -> Optional[float]:
+    with _history_lock:
+        outcomes = _history.get((tier, ext))
+        if not outcomes or len(outcomes) < ESCALATE_MIN_SAMPLES:
+            return None
+        return 1 - sum(outcomes) / len(outcomes)
+
+def route_coder(filepath: str, task_description: str = "", step_count: int = 1,
+                techstack: str = "", retry: int = 0) -> Route:
+    """Tier for generating one file"""
+    base, ext = _file_kind(filepath)
+    name = f"coder:{ext or base}"
+
+    if retry > 0:
+        return _decide(name, HEAVY, "retry")
+
+    size = len(task_description or "")
+    if size >= LARGE_TASK_CHARS:
+        return _decide(name, HEAVY, "large task")
+
+    if base in FAST_FILENAMES or ext in FAST_EXTENSIONS:
+        tier, reason = FAST, "boilerplate/config file"
+    elif ext in SOURCE_EXTENSIONS:
+        complex_plan = step_count > COMPLEX_PLAN_STEPS or (techstack or "").lower() in FRAMEWORK_STACKS
+        if size <= SMALL_TASK_CHARS and not complex_plan:
+            tier, reason = FAST, "small source file, simple plan"
+        else:
+            tier, reason = HEAVY, "source file"
+    else:
+        tier, reason = HEAVY, "unknown file type"
+
+    if tier == FAST:
+        rate = failure_rate(FAST, ext)
+        if rate is not None and rate >= ESCALATE_FAILURE_RATE:
+            # escalated calls never feed the fast history - a probe now and then does
+            with _history_lock:
+                count = _escalated[ext] = _escalated.get(ext, 0) + 1
+            if count % PROBE_EVERY:
+                tier, reason = HEAVY, f"fast tier failing {rate:.0%} on {ext or base}"
+            else:
+                reason = f"probe: fast tier failing {rate:.0%} on {ext or base}"
+    return _decide(name, tier, reason)
+
+def route_chat(user_prompt: str) -> Route:
+    """Tier for a general chat reply: short small talk goes fast"""
+    text = (user_prompt or "").strip().lower()
+    if len(text) <= CHAT_FAST_MAX_CHARS and not any(h in text for h in CHAT_HEAVY_HINTS):
+        return _decide("chat:smalltalk", FAST, "short message")
+    return _decide("chat:question", HEAVY, "question or long message")
+
+def record_outcome(route: Route, ok: bool, seconds: float, ext: Optional[str] = None):
+    """Feed back latency and quality (e.g. validation passed) for a routed call"""
+    metrics.inc("devdost_route_calls_total", route=route.name, tier=route.tier, outcome="ok" if ok else "failed")
+    metrics.observe("devdost_route_duration_seconds", seconds, route=route.name, tier=route.tier)
+    if ext is not None:
+        with _history_lock:
+            outcomes = _history.setdefault((route.tier, ext), deque(maxlen=HISTORY_SIZE))
+            outcomes.append(1 if ok else 0)
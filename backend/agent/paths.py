@@ -0,0 +1,49 @@
+import os
+import pathlib
+from typing import List
+
+from storage import ProjectStorage
+
+# Base directory for all projects (created on first write, not at import)
+PROJECTS_ROOT = pathlib.Path.cwd() / "generated_projects"
+
+# Resolves project names to directories (flat or hash-sharded, see storage.py)
+storage = ProjectStorage(PROJECTS_ROOT, os.getenv("DEVDOST_STORAGE_LAYOUT", "flat"))
+
+
+# ==================== PROJECT MANAGEMENT ====================
+def get_project_path(project_name: str) -> pathlib.Path:
+    """Get the path for a specific project (an archived project is restored first)"""
+    path = storage.path_for(project_name)
+    if not path.exists() and storage.is_archived(project_name):
+        from lifecycle import restore_project  # lifecycle imports this module
+        restore_project(project_name)
+    return path
+def create_project(project_name: str) -> str:
+    """Create a new project directory"""
+    project_path = get_project_path(project_name)
+    project_path.mkdir(parents=True, exist_ok=True)
+    return str(project_path)
+def project_exists(project_name: str) -> bool:
+    """Check if a project exists (on disk or archived - never restores)"""
+    return storage.exists(project_name)
+def list_all_projects() -> List[str]:
+    """List all available projects (hidden dirs like .scaffold are internal)"""
+    return storage.list_projects()
+def set_current_project(project_name: str):
+    """Set the current working project (for session context)"""
+    # This would be stored in session state in the graph
+    pass
+def safe_path_for_project(project_name: str, path: str) -> pathlib.Path:
+    """Get a safe path within a specific project"""
+    project_root = get_project_path(project_name)
+    p = (project_root / path).resolve()
+
+    if project_root not in p.parents and project_root != p.parent and project_root != p:
+        raise ValueError(f"Attempt to access outside project {project_name}")
+
+    return p
+def init_project_root():
+    """Initialize the projects root directory"""
+    PROJECTS_ROOT.mkdir(parents=True, exist_ok=True)
+    return str(PROJECTS_ROOT)
@@ -0,0 +1,180 @@
+"""
+In-memory project catalog with fuzzy lookup
+PROJECT_SWITCH used to need the LLM to return the exact directory name; a near
+miss ("calclator", "weather") failed and cost another round trip. The catalog
+keeps every project name in a trigram index and reranks the best candidates by
+edit distance, so a lookup is sub-millisecond even with tens of thousands of
+projects.
+
+Kept current by:
+- the watcher (project dirs created / deleted / moved) when it runs in this process
+- an mtime check of the dirs holding projects (PROJECTS_ROOT and its shards) on
+  every read, which catches changes made by other workers or a separate watcher
+  process (only the difference is re-indexed)
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+import paths
+
+RERANK_CANDIDATES = 20
+EDIT_RERANK = 5
+# max posting-list entries counted per search; common grams ("app", "  t") add cost, not signal
+SCAN_BUDGET = 2000
+MIN_MATCH_SCORE = 0.45
+MIN_MATCH_MARGIN = 0.1
+
+def normalize_name(text: str) -> str:
+    return re.sub(r"[\s\-_]+", " ", text.lower()).strip()
+
+def trigrams(text: str) -> Set[str]:
+    text = f"  {normalize_name(text)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance (two-row DP; names are short)"""
+    # shared prefix/suffix never costs anything
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    a, b = a[start:], b[start:]
+    while a and b and a[-1] == b[-1]:
+        a, b = a[:-1], b[:-1]
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+class ProjectCatalog:
+    """Project names + trigram index; thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._names: Set[str] = set()
+        self._by_normalized: Dict[str, str] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._stamp = None
+
+    # ---------- updates ----------
+
+    def _add(self, name: str):
+        if name in self._names or name.startswith("."):
+            return
+        self._names.add(name)
+        self._by_normalized[normalize_name(name)] = name
+        for gram in trigrams(name):
+            self._postings.setdefault(gram, set()).add(name)
+
+    def _remove(self, name: str):
+        if name not in self._names:
+            return
+        self._names.discard(name)
+        self._by_normalized.pop(normalize_name(name), None)
+        for gram in trigrams(name):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(name)
+                if not posting:
+                    del self._postings[gram]
+
+    def add(self, name: str):
+        with self._lock:
+            self._add(name)
+
+    def remove(self, name: str):
+        with self._lock:
+            self._remove(name)
+
+    def rename(self, old: str, new: str):
+        with self._lock:
+            self._remove(old)
+            self._add(new)
+
+    def refresh(self, force: bool = False):
+        """Reconcile with disk if a project dir was added/removed since the last look"""
+        stamp = paths.storage.stamp()
+        with self._lock:
+            if not force and stamp is not None and stamp == self._stamp:
+                return
+            on_disk = set(paths.list_all_projects())
+            for name in self._names - on_disk:
+                self._remove(name)
+            for name in on_disk - self._names:
+                self._add(name)
+            self._stamp = stamp
+
+    # ---------- reads ----------
+
+    def __contains__(self, name: str) -> bool:
+        self.refresh()
+        return name in self._names
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._names)
+
+    def names(self) -> List[str]:
+        self.refresh()
+        with self._lock:
+            return sorted(self._names)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """(name, score 0..1) best first: trigram overlap, reranked by edit distance"""
+        self.refresh()
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        with self._lock:
+            exact = self._by_normalized.get(normalized)
+            if exact is not None:
+                return [(exact, 1.0)]
+
+            query_grams = trigrams(query)
+            # rarest grams first, stop once the scan budget is spent - keeps huge catalogs sub-millisecond
+            postings = sorted((self._postings[g] for g in query_grams if g in self._postings), key=len)
+            shared = Counter()
+            scanned = 0
+            for posting in postings:
+                if scanned and scanned + len(posting) > SCAN_BUDGET:
+                    break
+                shared.update(posting)
+                scanned += len(posting)
+            candidates = shared.most_common(RERANK_CANDIDATES)
+
+        gram_scored = []
+        for name, _ in candidates:
+            grams = trigrams(name)
+            overlap = len(query_grams & grams)
+            # "weather" → "weather-dashboard": low jaccard, full containment
+            gram_scored.append((name, 0.5 * overlap / len(query_grams | grams) + 0.5 * overlap / len(query_grams)))
+        gram_scored.sort(key=lambda item: item[1], reverse=True)
+
+        # edit distance is the expensive part - only for the names that can still win
+        scored = []
+        for name, gram_score in gram_scored[:max(limit, EDIT_RERANK)]:
+            candidate = normalize_name(name)
+            edit_score = 1 - edit_distance(normalized, candidate) / max(len(normalized), len(candidate))
+            scored.append((name, round(0.7 * gram_score + 0.3 * edit_score, 4)))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit]
+
+    def resolve(self, query: str) -> Optional[str]:
+        """The one project `query` clearly refers to, or None"""
+        matches = self.search(query, limit=2)
+        if not matches:
+            return None
+        best, score = matches[0]
+        runner_up = matches[1][1] if len(matches) > 1 else 0.0
+        if score >= MIN_MATCH_SCORE and score - runner_up >= MIN_MATCH_MARGIN:
+            return best
+        return None
+
+catalog = ProjectCatalog()
@@ -0,0 +1,445 @@
+"""
+Persistent project metadata (SQLite, WAL) - one row per project, one per file
+Listing or describing projects used to walk the disk on every request
+(iterdir for the list, rglob into node_modules for file counts). The store keeps
+techstack, created_at, file_count, size, last_run and a tree hash, updated
+incrementally by file writes (tools, REST/socket edits) and watcher events.
+
+The tree hash is an order-independent sum of per-file digests, so one file
+change adjusts it without re-reading the project.
+
+Writes are cheap by design: WAL with synchronous=NORMAL (commits are not
+fsynced - a crash can lose the last few, never corrupt; reconcile() repairs),
+a write whose (size, digest) is already stored takes no write lock, and
+high-frequency writers (keystroke saves, watcher events) go through
+record_file_soon, which records each file's latest state once per
+RECORD_DELAY_SECONDS in one transaction per project.
+
+Paths are resolved without restoring archived projects (see lifecycle.py): their
+rows stay, with archived_at set, so they are still listed and described.
+
+Location: DEVDOST_PROJECT_STORE=/path/to/projects.db (default ./.devdost/projects.db)
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import paths
+
+DEFAULT_DB_PATH = Path.cwd() / ".devdost" / "projects.db"
+
+# never indexed (same list the file API skips)
+IGNORED_DIRS = {"node_modules", ".git", "__pycache__", "dist", "build", "venv", ".next"}
+# every atomic-write temp (safe_write_file, blob pool, snapshots, file batches) starts with this
+TEMP_PREFIX = ".tmp_"
+# files larger than this are digested by size + mtime instead of content
+MAX_HASH_BYTES = 1024 * 1024
+TECHSTACK_MARKERS = {"package.json", "requirements.txt", "index.html", "main.py", "app.py"}
+SORT_COLUMNS = {"name", "created_at", "updated_at", "file_count", "size_bytes", "last_run", "accessed_at"}
+# columns added after the first release: name -> type
+ADDED_COLUMNS = {"accessed_at": "REAL", "archived_at": "REAL"}
+
+DIGEST_MOD = 1 << 60  # fits an SQLite INTEGER
+RECORD_DELAY_SECONDS = 1.0
+
+def detect_project_type(project_path) -> str:
+    """Detect project type"""
+    project_path = Path(project_path)
+
+    if (project_path / "package.json").exists():
+        try:
+            with open(project_path / "package.json", "r") as f:
+                package_data = json.load(f)
+                dependencies = package_data.get("dependencies", {})
+
+                if "next" in dependencies:
+                    return "nextjs"
+                elif "react" in dependencies:
+                    return "react"
+                else:
+                    return "nodejs"
+        except:
+            return "nodejs"
+
+    if (project_path / "requirements.txt").exists():
+        return "python"
+
+    if (project_path / "index.html").exists():
+        return "html"
+
+    if (project_path / "main.py").exists() or (project_path / "app.py").exists():
+        return "python"
+
+    return "unknown"
+
+def file_digest(rel_path: str, data: bytes) -> int:
+    content = hashlib.sha1(data).hexdigest()
+    return int(hashlib.sha1(f"{rel_path}\0{content}".encode()).hexdigest()[:15], 16)
+
+def is_temp_file(name: str) -> bool:
+    return name.startswith(TEMP_PREFIX)
+
+def is_indexed(rel_path: str) -> bool:
+    parts = rel_path.replace("\\", "/").split("/")
+    return not any(p in IGNORED_DIRS for p in parts[:-1]) and not is_temp_file(parts[-1])
+
+class ProjectStore:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS projects (
+                name TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                techstack TEXT,
+                created_at REAL,
+                updated_at REAL,
+                file_count INTEGER NOT NULL DEFAULT 0,
+                size_bytes INTEGER NOT NULL DEFAULT 0,
+                last_run REAL,
+                tree_hash INTEGER NOT NULL DEFAULT 0
+            )""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS files (
+                project TEXT NOT NULL,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                digest INTEGER NOT NULL,
+                PRIMARY KEY (project, path)
+            )""")
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+            for column, kind in ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE projects ADD COLUMN {column} {kind}")
+            for column in SORT_COLUMNS - {"name"}:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_projects_{column} ON projects ({column})")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; eventlet green threads share the OS thread's connection
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            conn.execute("PRAGMA synchronous=NORMAL")  # per connection; safe with WAL (see module doc)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def _ensure_project(self, conn, name: str):
+        project_path = paths.storage.path_for(name)
+        try:
+            created = project_path.stat().st_ctime
+        except FileNotFoundError:
+            created = time.time()
+        conn.execute(
+            "INSERT OR IGNORE INTO projects (name, path, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (name, str(project_path), created, time.time())
+        )
+
+    def _apply(self, conn, project: str, rel_path: str, new: Optional[Tuple[int, int]]):
+        """Replace one file's (size, digest) and adjust the project's aggregates"""
+        old = conn.execute("SELECT size, digest FROM files WHERE project = ? AND path = ?", (project, rel_path)).fetchone()
+        old_size, old_digest = (old["size"], old["digest"]) if old else (0, 0)
+        new_size, new_digest = new if new else (0, 0)
+        if new is None:
+            conn.execute("DELETE FROM files WHERE project = ? AND path = ?", (project, rel_path))
+        else:
+            conn.execute("INSERT OR REPLACE INTO files (project, path, size, digest) VALUES (?, ?, ?, ?)",
+                         (project, rel_path, new_size, new_digest))
+        count_delta = (new is not None) - (old is not None)
+        conn.execute(
+            "UPDATE projects SET file_count = file_count + ?, size_bytes = size_bytes + ?, "
+            "tree_hash = ((tree_hash - ? + ?) % ? + ?) % ?, updated_at = ? WHERE name = ?",
+            (count_delta, new_size - old_size, old_digest, new_digest, DIGEST_MOD, DIGEST_MOD, DIGEST_MOD,
+             time.time(), project)
+        )
+
+    def _unchanged(self, project: str, entries: List[Tuple[str, Tuple[int, int]]]) -> set:
+        """Paths whose (size, digest) is already stored - read-only, no write lock"""
+        conn = self._conn()
+        same = set()
+        for rel_path, (size, digest) in entries:
+            row = conn.execute("SELECT size, digest FROM files WHERE project = ? AND path = ?",
+                               (project, rel_path)).fetchone()
+            if row is not None and (row["size"], row["digest"]) == (size, digest):
+                same.add(rel_path)
+        return same
+
+    def _refresh_techstack(self, conn, project: str, rel_path: str):
+        if rel_path.replace("\\", "/") in TECHSTACK_MARKERS:
+            conn.execute("UPDATE projects SET techstack = ? WHERE name = ?",
+                         (detect_project_type(paths.storage.path_for(project)), project))
+
+    # ---------- incremental updates ----------
+
+    def _file_entry(self, project: str, rel_path: str, data=None) -> Optional[Tuple[int, int]]:
+        """(size, digest) of a file from `data`, or from disk when data is None (None if it is gone)"""
+        if data is None:
+            file_path = paths.storage.path_for(project) / rel_path
+            try:
+                stat = file_path.stat()
+                if stat.st_size > MAX_HASH_BYTES:
+                    return stat.st_size, file_digest(rel_path, f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+                data = file_path.read_bytes()
+            except (FileNotFoundError, IsADirectoryError):
+                return None
+        data = data.encode("utf-8") if isinstance(data, str) else data
+        return len(data), file_digest(rel_path, data)
+
+    def record_file(self, project: str, rel_path: str, data=None):
+        """A file was written; `data` (str/bytes) saves re-reading it"""
+        rel_path = rel_path.replace("\\", "/")
+        if not is_indexed(rel_path):
+            return
+        new = self._file_entry(project, rel_path, data)
+        if new is None or self._unchanged(project, [(rel_path, new)]):
+            return  # gone, or already recorded (e.g. by the handler that wrote it and then the watcher)
+
+        conn = self._transaction()
+        try:
+            self._ensure_project(conn, project)
+            self._apply(conn, project, rel_path, new)
+            self._refresh_techstack(conn, project, rel_path)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def record_files(self, project: str, files):
+        """A batch of (rel_path, str/bytes data) was written - one transaction (data None = read the file)"""
+        entries = []
+        for rel_path, data in files:
+            rel_path = rel_path.replace("\\", "/")
+            if is_indexed(rel_path):
+                new = self._file_entry(project, rel_path, data)
+                if new is not None:
+                    entries.append((rel_path, new))
+        same = self._unchanged(project, entries)
+        entries = [entry for entry in entries if entry[0] not in same]
+        if not entries:
+            return
+        conn = self._transaction()
+        try:
+            self._ensure_project(conn, project)
+            for rel_path, new in entries:
+                self._apply(conn, project, rel_path, new)
+                self._refresh_techstack(conn, project, rel_path)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def remove_file(self, project: str, rel_path: str):
+        """A file (or a whole directory) was deleted"""
+        rel_path = rel_path.replace("\\", "/").rstrip("/")
+        if not is_indexed(rel_path):
+            return  # temp files / ignored dirs have no rows
+        conn = self._transaction()
+        try:
+            rows = conn.execute(
+                "SELECT path FROM files WHERE project = ? AND (path = ? OR path LIKE ? ESCAPE '\\')",
+                (project, rel_path, rel_path.replace("%", "\\%").replace("_", "\\_") + "/%")
+            ).fetchall()
+            for row in rows:
+                self._apply(conn, project, row["path"], None)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def move_file(self, project: str, old_path: str, new_path: str):
+        self.remove_file(project, old_path)
+        target = paths.storage.path_for(project) / new_path
+        if target.is_dir():
+            self.scan_project(project)
+        else:
+            self.record_file(project, new_path)
+
+    def record_run(self, project: str):
+        self._conn().execute("UPDATE projects SET last_run = ? WHERE name = ?", (time.time(), project))
+
+    def touch(self, project: str):
+        """Project was opened (files listed, switched to) - keeps it out of the cold set"""
+        self._conn().execute("UPDATE projects SET accessed_at = ? WHERE name = ?", (time.time(), project))
+
+    def mark_archived(self, project: str, archived_at: Optional[float]):
+        """archived_at = None once the project is restored"""
+        self._conn().execute("UPDATE projects SET archived_at = ? WHERE name = ?", (archived_at, project))
+
+    def set_techstack(self, project: str, techstack: str):
+        conn = self._transaction()
+        try:
+            self._ensure_project(conn, project)
+            conn.execute("UPDATE projects SET techstack = ? WHERE name = ?", (techstack, project))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_project(self, project: str):
+        conn = self._transaction()
+        try:
+            conn.execute("DELETE FROM files WHERE project = ?", (project,))
+            conn.execute("DELETE FROM projects WHERE name = ?", (project,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---------- full scans (new/unknown projects, startup reconcile) ----------
+
+    def scan_project(self, project: str):
+        """Re-index one project from disk (skips IGNORED_DIRS)"""
+        project_path = paths.storage.path_for(project)
+        if not project_path.is_dir():
+            if not paths.storage.is_archived(project):  # archived: keep the last known metadata
+                self.delete_project(project)
+            return
+        entries = {}
+        for root, dirs, files in os.walk(project_path):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            for file in files:
+                if is_temp_file(file):
+                    continue
+                file_path = Path(root) / file
+                rel_path = file_path.relative_to(project_path).as_posix()
+                try:
+                    stat = file_path.stat()
+                    data = (file_path.read_bytes() if stat.st_size <= MAX_HASH_BYTES
+                            else f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+                except OSError:
+                    continue
+                entries[rel_path] = (stat.st_size, file_digest(rel_path, data))
+
+        conn = self._transaction()
+        try:
+            self._ensure_project(conn, project)
+            conn.execute("DELETE FROM files WHERE project = ?", (project,))
+            conn.executemany("INSERT INTO files (project, path, size, digest) VALUES (?, ?, ?, ?)",
+                             [(project, p, size, digest) for p, (size, digest) in entries.items()])
+            conn.execute(
+                "UPDATE projects SET file_count = ?, size_bytes = ?, tree_hash = ?, techstack = ?, updated_at = ? "
+                "WHERE name = ?",
+                (len(entries), sum(s for s, _ in entries.values()), sum(d for _, d in entries.values()) % DIGEST_MOD,
+                 detect_project_type(project_path), time.time(), project)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def reconcile(self) -> dict:
+        """Index projects missing from the store, drop rows for projects gone from disk"""
+        on_disk = set(paths.list_all_projects())
+        known = {row["name"] for row in self._conn().execute("SELECT name FROM projects")}
+        for name in known - on_disk:
+            self.delete_project(name)
+        for name in on_disk - known:
+            self.scan_project(name)
+        return {"added": len(on_disk - known), "removed": len(known - on_disk), "total": len(on_disk)}
+
+    # ---------- reads ----------
+
+    @staticmethod
+    def _row(row) -> dict:
+        info = dict(row)
+        info["tree_hash"] = f"{info['tree_hash']:015x}"
+        return info
+
+    def get(self, project: str, scan_missing: bool = True) -> Optional[dict]:
+        row = self._conn().execute("SELECT * FROM projects WHERE name = ?", (project,)).fetchone()
+        if row is None and scan_missing and paths.project_exists(project):
+            self.scan_project(project)
+            row = self._conn().execute("SELECT * FROM projects WHERE name = ?", (project,)).fetchone()
+        return self._row(row) if row else None
+
+    def idle_projects(self, idle_since: float) -> List[str]:
+        """Unarchived projects not written, run or opened since `idle_since`"""
+        rows = self._conn().execute(
+            "SELECT name FROM projects WHERE archived_at IS NULL AND "
+            "MAX(COALESCE(updated_at, 0), COALESCE(last_run, 0), COALESCE(accessed_at, 0)) < ?",
+            (idle_since,)
+        )
+        return [row["name"] for row in rows]
+
+    def changed_projects(self, since: float) -> List[str]:
+        """Unarchived projects with files written since `since`"""
+        rows = self._conn().execute(
+            "SELECT name FROM projects WHERE archived_at IS NULL AND updated_at >= ?", (since,)
+        )
+        return [row["name"] for row in rows]
+
+    def list_projects(self, offset: int = 0, limit: int = 50, sort: str = "name",
+                      descending: bool = False) -> Tuple[List[dict], int]:
+        """(page of project rows, total count)"""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of {sorted(SORT_COLUMNS)}")
+        order = "DESC" if descending else "ASC"
+        conn = self._conn()
+        total = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM projects ORDER BY {sort} IS NULL, {sort} {order}, name LIMIT ? OFFSET ?",
+            (max(limit, 0), max(offset, 0))
+        ).fetchall()
+        return [self._row(r) for r in rows], total
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_project_store() -> ProjectStore:
+    """Process-wide store (opened on first use)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProjectStore(os.getenv("DEVDOST_PROJECT_STORE") or DEFAULT_DB_PATH)
+    return _store
+
+def update_store(method: str, *args):
+    """Best-effort store update - metadata must never fail a user's write"""
+    try:
+        getattr(get_project_store(), method)(*args)
+    except Exception as e:
+        print(f"⚠️ Project store update failed ({method}): {e}")
+
+# ---------- coalesced recording (high-frequency writers) ----------
+
+_pending: Dict[str, set] = {}
+_pending_lock = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
+
+def record_file_soon(project: str, rel_path: str):
+    """record_file, coalesced: a file written many times within RECORD_DELAY_SECONDS is
+    recorded once, from disk (so a delete in between is simply skipped)"""
+    global _flush_timer
+    with _pending_lock:
+        _pending.setdefault(project, set()).add(rel_path.replace("\\", "/"))
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(RECORD_DELAY_SECONDS, flush_pending_records)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+def flush_pending_records():
+    """Record everything record_file_soon queued - one transaction per project"""
+    global _flush_timer
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _flush_timer = None
+    for project, rel_paths in pending.items():
+        update_store("record_files", project, [(rel_path, None) for rel_path in sorted(rel_paths)])
+
+atexit.register(flush_pending_records)
@@ -0,0 +1,264 @@
+"""
+Project scaffolding (create-react-app, create-next-app, npm init, ...)
+Scaffolds run in the background inside a hidden staging directory, so they can
+start speculatively before the final project name / tech stack is known and
+be adopted (moved into place) or cancelled once planning finishes.
+"""
+
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from telemetry import record_event, span
+from paths import PROJECTS_ROOT, get_project_path
+from dedup import copy_file, pool, write_file
+
+STAGING_ROOT = PROJECTS_ROOT / ".scaffold"
+
+# Kinds whose scaffold is slow enough to be worth starting speculatively
+SLOW_KINDS = {"react", "nextjs", "nodejs"}
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="scaffold")
+_jobs: Dict[str, "ScaffoldJob"] = {}
+_jobs_lock = threading.Lock()
+
+EXPRESS_INDEX = """const express = require('express');
+const app = express();
+app.use(express.json());
+
+app.get('/', (req, res) => {
+  res.json({ message: "Server running ✅" });
+});
+
+const PORT = process.env.PORT || 3000;
+app.listen(PORT, () => console.log("Server started on port", PORT));
+"""
+
+class ScaffoldCancelled(Exception):
+    pass
+
+def scaffold_kind(techstack: str) -> str:
+    """Map a plan techstack to the scaffold / project_structure kind"""
+    techstack_lower = (techstack or "").lower()
+    if "react" in techstack_lower and "next" not in techstack_lower:
+        return "react"
+    if "next" in techstack_lower:
+        return "nextjs"
+    if "node" in techstack_lower or "express" in techstack_lower:
+        return "nodejs"
+    return "html"
+
+def guess_techstack(user_prompt: str) -> Optional[str]:
+    """Cheap guess from the raw prompt - only when the user names the stack explicitly"""
+    prompt_lower = user_prompt.lower()
+    if re.search(r"\bnext\.?js\b", prompt_lower):
+        return "Next.js"
+    if re.search(r"\breact\b", prompt_lower):
+        return "React"
+    if re.search(r"\bexpress\b", prompt_lower):
+        return "Node.js/Express"
+    if re.search(r"\bnode\.?js\b|\bnode\b", prompt_lower):
+        return "Node.js"
+    return None
+
+class ScaffoldJob:
+    """A scaffold running in the background in its own staging directory"""
+
+    def __init__(self, techstack: str, emit: Optional[Callable[[str], None]] = None, speculative: bool = False):
+        self.techstack = techstack
+        self.kind = scaffold_kind(techstack)
+        self.speculative = speculative
+        self.dir_name = f"scaffold-{uuid.uuid4().hex[:10]}"
+        self.staging_path = STAGING_ROOT / self.dir_name
+        self._emit = emit
+        self._cancelled = threading.Event()
+        self._process: Optional[subprocess.Popen] = None
+        self.future = _executor.submit(self._run)
+
+    def emit(self, message: str):
+        if self._emit is not None and not self._cancelled.is_set():
+            try:
+                self._emit(message)
+            except Exception as e:
+                print(f"⚠️ Scaffold emit error: {e}")
+
+    def _exec(self, cmd: list, cwd, timeout: int) -> int:
+        if self._cancelled.is_set():
+            raise ScaffoldCancelled()
+
+        self._process = subprocess.Popen(
+            cmd,
+            cwd=str(cwd),
+            text=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=(os.name == "posix")
+        )
+        try:
+            self._process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._kill()
+            raise
+        finally:
+            returncode = self._process.returncode
+            self._process = None
+
+        if self._cancelled.is_set():
+            raise ScaffoldCancelled()
+        return returncode
+
+    def _kill(self):
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGTERM)
+            else:
+                process.terminate()
+        except Exception as e:
+            print(f"⚠️ Scaffold kill error: {e}")
+
+    def _run(self) -> str:
+        """Build the scaffold in staging. Returns the resulting project_structure"""
+        with span(f"scaffold.{self.kind}", kind="tool", speculative=self.speculative):
+            return self._build()
+
+    def _build(self) -> str:
+        STAGING_ROOT.mkdir(parents=True, exist_ok=True)
+        techstack_lower = self.techstack.lower()
+
+        if self.kind == "react":
+            self.emit("⚛️ React app का structure बना रहे हैं (2-3 मिनट लगेंगे)...")
+            if self._exec(["npx", "--yes", "create-react-app", self.dir_name], STAGING_ROOT, 400) != 0:
+                raise Exception("React init failed")
+            self.emit("✅ **React app तैयार है!**")
+            return "react"
+
+        if self.kind == "nextjs":
+            self.emit("⚡ Next.js app का structure बना रहे हैं (2-3 मिनट लगेंगे)...")
+            cmd = ["npx", "--yes", "create-next-app@latest", self.dir_name, "--typescript", "--tailwind", "--app", "--no-git"]
+            if self._exec(cmd, STAGING_ROOT, 400) != 0:
+                raise Exception("Next.js init failed")
+            self.emit("✅ **Next.js app तैयार है!**")
+            return "nextjs"
+
+        if self.kind == "nodejs":
+            self.emit("📦 Node.js project शुरू कर रहे हैं...")
+            self.staging_path.mkdir(parents=True, exist_ok=True)
+            if self._exec(["npm", "init", "-y"], self.staging_path, 30) != 0:
+                raise Exception("npm init failed")
+
+            src_path = self.staging_path / "src"
+            src_path.mkdir(exist_ok=True)
+            if "express" in techstack_lower:
+                self.emit("🔥 Express install हो रहा है...")
+                self._exec(["npm", "install", "express"], self.staging_path, 60)
+                write_file(src_path / "index.js", EXPRESS_INDEX)
+                self.emit("✅ **Node.js Express server तैयार है!**")
+            else:
+                write_file(src_path / "index.js", "console.log('Node.js project initialized ✅');")
+                self.emit("✅ **Node.js project तैयार है!**")
+            return "nodejs"
+
+        self.emit("📄 HTML/CSS/JS project बना रहे हैं...")
+        self.staging_path.mkdir(parents=True, exist_ok=True)
+        self.emit("✅ **Project folder तैयार है!**")
+        return "html"
+
+    def cancel(self):
+        """Abandon this scaffold (wrong stack guessed) and clean up in the background"""
+        self._cancelled.set()
+        if self.future.cancel():
+            return
+        self._kill()
+
+        def _cleanup(_):
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+        self.future.add_done_callback(_cleanup)
+
+    def adopt(self, project_name: str) -> str:
+        """Wait for the scaffold and move it into place. Returns project_structure"""
+        project_path = get_project_path(project_name)
+        try:
+            structure = self.future.result()
+        except Exception as e:
+            print(f"⚠️ Scaffold error: {e}")
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+            self.emit("⚠️ कुछ दिक्कत आई, basic setup उपयोग कर रहे हैं")
+            project_path.mkdir(parents=True, exist_ok=True)
+            return "html"
+
+        if self.kind in ("react", "nextjs") and project_path.exists():
+            shutil.rmtree(project_path)
+
+        if project_path.exists():
+            shutil.copytree(self.staging_path, project_path, dirs_exist_ok=True, copy_function=copy_file)
+            shutil.rmtree(self.staging_path, ignore_errors=True)
+        else:
+            project_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(self.staging_path), str(project_path))
+
+        _rename_package(project_path, project_name)
+        try:
+            pool.dedupe_tree(project_path)  # generator boilerplate (public/, src/) is the same in every project
+        except Exception as e:
+            print(f"⚠️ Scaffold dedup failed: {e}")
+        return structure
+
+def _rename_package(project_path, project_name: str):
+    """Staging dir name leaks into package.json - point it at the real project"""
+    package_json = project_path / "package.json"
+    if not package_json.exists():
+        return
+    try:
+        data = json.loads(package_json.read_text(encoding="utf-8"))
+        if str(data.get("name", "")).startswith("scaffold-"):
+            data["name"] = project_name
+            write_file(package_json, json.dumps(data, indent=2) + "\n")
+    except Exception as e:
+        print(f"⚠️ package.json rename failed: {e}")
+
+# ===================== JOB REGISTRY =====================
+# Futures can't live in graph state, so jobs are tracked per project here
+
+def start_scaffold(techstack: str, emit: Optional[Callable[[str], None]] = None, speculative: bool = False) -> ScaffoldJob:
+    job = ScaffoldJob(techstack, emit=emit, speculative=speculative)
+    print(f"🏗️ Scaffold started ({'speculative' if speculative else 'final'}): {job.kind}")
+    return job
+
+def register_scaffold(project_name: str, job: ScaffoldJob):
+    with _jobs_lock:
+        previous = _jobs.pop(project_name, None)
+        _jobs[project_name] = job
+    if previous is not None and previous is not job:
+        previous.cancel()
+
+def reconcile_scaffold(job: Optional[ScaffoldJob], techstack: str, emit: Optional[Callable[[str], None]] = None) -> ScaffoldJob:
+    """Keep a speculative scaffold if the final stack matches, otherwise replace it"""
+    if job is not None and job.kind == scaffold_kind(techstack):
+        print(f"✅ Speculative scaffold matches final stack: {job.kind}")
+        record_event("speculative_scaffold", result="hit")
+        job.speculative = False
+        return job
+
+    if job is not None:
+        print(f"♻️ Speculative scaffold ({job.kind}) discarded for {scaffold_kind(techstack)}")
+        record_event("speculative_scaffold", result="miss")
+        job.cancel()
+    return start_scaffold(techstack, emit=emit)
+
+def finish_scaffold(project_name: str) -> Optional[str]:
+    """Block until the project's scaffold is in place. Returns project_structure, None if no job"""
+    with _jobs_lock:
+        job = _jobs.pop(project_name, None)
+    if job is None:
+        return None
+    return job.adopt(project_name)
@@ -0,0 +1,170 @@
+"""
+Production entry point: N Socket.IO workers + one dedicated watcher process
+- workers share one port via SO_REUSEPORT (the frontend is websocket-only, so no
+  sticky sessions are needed) and relay emits to each other through a message queue
+- the watcher runs alone and pushes file events through the same queue
+- the supervisor (this process) restarts crashed children and stops them all on exit
+
+Usage (from backend/agent):
+    python serve.py --workers 4 --port 5000 --message-queue redis://localhost:6379/0
+    python serve.py --workers 2 --local-redis        # spawns redis-server for local testing
+    python app.py                                    # single process, as before
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESTART_BACKOFF = (1, 2, 5, 10, 30)
+LOCAL_REDIS_PORT = 6390
+
+def run_worker(args):
+    """One eventlet server process; serves both REST and Socket.IO"""
+    if os.getenv("DEVDOST_MONKEY_PATCH", "1") != "0":
+        import eventlet
+        eventlet.monkey_patch()  # LLM calls, subprocesses and sleeps yield instead of blocking the worker
+
+    import eventlet
+    import eventlet.wsgi
+
+    # atexit cleanup (stop this worker's dev servers) only runs on a normal exit
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    import app as backend
+
+    listener = eventlet.listen((args.host, args.port), reuse_port=args.reuse_port)
+    eventlet.spawn(backend.warm_agent)
+    print(f"🚀 Worker {os.getpid()} on {args.host}:{args.port} (queue: {backend.MESSAGE_QUEUE})", flush=True)
+    eventlet.wsgi.server(listener, backend.app, log_output=False)
+
+def run_watcher(args):
+    """The only process watching PROJECTS_ROOT; emits through the message queue"""
+    from flask_socketio import SocketIO
+    from watcher import watch_projects
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    emitter = SocketIO(message_queue=args.message_queue)
+    watch_projects(emitter)
+
+class Supervisor:
+    """Starts workers + watcher and keeps them alive"""
+
+    def __init__(self, args):
+        self.args = args
+        self.children = {}  # name -> {"cmd", "env", "process", "restarts", "next_start"}
+        self.stopping = False
+
+    def _spawn(self, name: str):
+        child = self.children[name]
+        child["process"] = subprocess.Popen(child["cmd"], env=child["env"], cwd=os.getcwd())
+        print(f"▶️ {name} started (pid {child['process'].pid})", flush=True)
+
+    def add(self, name: str, cmd: list, env: dict):
+        self.children[name] = {"cmd": cmd, "env": env, "process": None, "restarts": 0, "next_start": 0}
+        self._spawn(name)
+
+    def watch(self):
+        while not self.stopping:
+            now = time.time()
+            for name, child in self.children.items():
+                process = child["process"]
+                if process is not None and process.poll() is None:
+                    continue
+                if process is not None:
+                    delay = RESTART_BACKOFF[min(child["restarts"], len(RESTART_BACKOFF) - 1)]
+                    print(f"⚠️ {name} exited with {process.returncode}, restarting in {delay}s", flush=True)
+                    child["process"] = None
+                    child["restarts"] += 1
+                    child["next_start"] = now + delay
+                elif now >= child["next_start"]:
+                    self._spawn(name)
+            time.sleep(0.5)
+
+    def stop(self, *_):
+        if self.stopping:
+            return
+        self.stopping = True
+        print("\n🧹 Stopping workers...", flush=True)
+        processes = [c["process"] for c in self.children.values() if c["process"] is not None]
+        for process in processes:
+            process.terminate()
+        deadline = time.time() + 10
+        for process in processes:
+            try:
+                process.wait(timeout=max(deadline - time.time(), 0.1))
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+def redis_server_binary() -> str:
+    redis_server = shutil.which("redis-server")
+    if not redis_server:
+        raise SystemExit("❌ --local-redis needs redis-server on PATH")
+    return redis_server
+
+def run_supervisor(args):
+    if args.workers > 1 and not args.message_queue and not args.local_redis:
+        raise SystemExit("❌ More than one worker needs --message-queue (or --local-redis)")
+
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    if args.workers > 1 and not reuse_port:
+        print("⚠️ SO_REUSEPORT unavailable: workers get consecutive ports, put a load balancer in front")
+
+    supervisor = Supervisor(args)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    signal.signal(signal.SIGINT, supervisor.stop)
+
+    if args.local_redis:
+        supervisor.add("redis", [redis_server_binary(), "--port", str(LOCAL_REDIS_PORT), "--save", "", "--appendonly", "no"],
+                       dict(os.environ))
+        args.message_queue = f"redis://127.0.0.1:{LOCAL_REDIS_PORT}/0"
+        time.sleep(0.5)
+
+    env = dict(os.environ)
+    if args.message_queue:
+        env["DEVDOST_MESSAGE_QUEUE"] = args.message_queue
+
+    script = os.path.join(HERE, "serve.py")
+    for i in range(args.workers):
+        port = args.port if reuse_port else args.port + i
+        supervisor.add(f"worker-{i}", [sys.executable, script, "--role", "worker", "--host", args.host, "--port", str(port)]
+                       + ([] if reuse_port else ["--no-reuse-port"]), env)
+
+    if not args.no_watcher:
+        supervisor.add("watcher", [sys.executable, script, "--role", "watcher"]
+                       + (["--message-queue", args.message_queue] if args.message_queue else []), env)
+
+    print(f"✅ {args.workers} worker(s) on {args.host}:{args.port}, queue: {args.message_queue or 'none'}", flush=True)
+    supervisor.watch()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DevDost backend process manager")
+    parser.add_argument("--role", choices=("supervisor", "worker", "watcher"), default="supervisor")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--message-queue", default=os.getenv("DEVDOST_MESSAGE_QUEUE"),
+                        help="Socket.IO message queue URL, e.g. redis://localhost:6379/0")
+    parser.add_argument("--local-redis", action="store_true", help="spawn redis-server as the queue (testing)")
+    parser.add_argument("--no-watcher", action="store_true")
+    parser.add_argument("--no-reuse-port", dest="reuse_port", action="store_false")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # modules live next to this file (app, graph, tools...)
+    sys.path.insert(0, HERE)
+    args = parse_args(argv)
+    if args.role == "worker":
+        run_worker(args)
+    elif args.role == "watcher":
+        run_watcher(args)
+    else:
+        run_supervisor(args)
+
+if __name__ == "__main__":
+    main()
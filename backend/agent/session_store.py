@@ -0,0 +1,349 @@
+"""
+Session + running-process registry shared by every backend worker
+- session_id -> current project
+- project -> running dev server (pid, port, kind, owning worker)
+- client (socket sid) -> project it is viewing; the watcher only watches these
+- chat key -> bounded chat history (chat_store.py), so any worker can continue a chat
+
+Backends: SQLite (default, local multi-process) and any Redis-style KV client.
+Select with DEVDOST_SESSION_STORE:
+    sqlite:///path/to/sessions.db   (default: ./.devdost/sessions.db)
+    redis://host:6379/0             (needs the `redis` package)
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import psutil
+
+DEFAULT_DB_PATH = Path.cwd() / ".devdost" / "sessions.db"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+def process_alive(entry: dict) -> bool:
+    """pid still running AND it is the same process we started (guards against pid reuse)"""
+    owner_host = str(entry.get("owner", "")).rsplit(":", 1)[0]
+    if owner_host and owner_host != socket.gethostname():
+        return True  # another machine's process - only its owner can check it
+    try:
+        process = psutil.Process(entry["pid"])
+        created = entry.get("create_time")
+        return process.is_running() and (created is None or abs(process.create_time() - created) < 1)
+    except (psutil.NoSuchProcess, psutil.AccessDenied, KeyError):
+        return False
+
+def worker_alive(owner: str) -> bool:
+    """A WORKER_ID's process is still up (other hosts are assumed alive)"""
+    host, _, pid = str(owner).rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    return psutil.pid_exists(int(pid))
+
+def process_entry(project: str, pid: int, port: Optional[int], kind: str) -> dict:
+    try:
+        create_time = psutil.Process(pid).create_time()
+    except psutil.Error:
+        create_time = None
+    return {
+        "project": project,
+        "pid": pid,
+        "port": port,
+        "kind": kind,
+        "owner": WORKER_ID,
+        "create_time": create_time,
+        "started_at": time.time(),
+    }
+
+class SessionRegistry(ABC):
+    """Interface every backend implements"""
+
+    @abstractmethod
+    def get_current_project(self, session_id: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set_current_project(self, session_id: str, project: str):
+        ...
+
+    @abstractmethod
+    def forget_project(self, project: str):
+        """Drop every session pointing at a deleted project"""
+
+    @abstractmethod
+    def _put_process(self, entry: dict):
+        ...
+
+    @abstractmethod
+    def _get_process(self, project: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def remove_process(self, project: str):
+        ...
+
+    @abstractmethod
+    def _all_processes(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def watch(self, client_id: str, project: str):
+        """`client_id` now views `project` (replaces what it viewed before)"""
+
+    @abstractmethod
+    def unwatch(self, client_id: str):
+        ...
+
+    @abstractmethod
+    def _all_watches(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def get_chat(self, key: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def put_chat(self, key: str, data: dict):
+        ...
+
+    @abstractmethod
+    def delete_chat(self, key: str):
+        ...
+
+    @abstractmethod
+    def prune_chats(self, keep: int):
+        """Drop all but the `keep` most recently updated chats"""
+
+    # ---- shared logic ----
+
+    def register_process(self, project: str, pid: int, port: Optional[int] = None, kind: str = "unknown") -> dict:
+        entry = process_entry(project, pid, port, kind)
+        self._put_process(entry)
+        return entry
+
+    def get_process(self, project: str) -> Optional[dict]:
+        """Running entry for a project; stale entries (process gone) are pruned"""
+        entry = self._get_process(project)
+        if entry is None:
+            return None
+        if not process_alive(entry):
+            self.remove_process(project)
+            return None
+        return entry
+
+    def is_running(self, project: str) -> bool:
+        return self.get_process(project) is not None
+
+    def list_processes(self, owner: Optional[str] = None) -> List[dict]:
+        entries = [e for e in self._all_processes() if process_alive(e)]
+        if owner is not None:
+            entries = [e for e in entries if e.get("owner") == owner]
+        return entries
+
+    def watched_projects(self) -> Dict[str, int]:
+        """project -> number of clients viewing it (clients of crashed workers are dropped)"""
+        counts: Dict[str, int] = {}
+        for entry in self._all_watches():
+            if not worker_alive(entry.get("owner", "")):
+                self.unwatch(entry["client_id"])
+                continue
+            counts[entry["project"]] = counts.get(entry["project"], 0) + 1
+        return counts
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """SQLite in WAL mode - safe for several worker processes on one machine"""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                current_project TEXT,
+                updated_at REAL
+            )""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS processes (
+                project TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            )""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS watches (
+                client_id TEXT PRIMARY KEY,
+                project TEXT NOT NULL,
+                owner TEXT NOT NULL,
+                updated_at REAL
+            )""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS chats (
+                chat_key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL
+            )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS chats_updated ON chats (updated_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per thread; eventlet green threads share the OS thread's connection
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def get_current_project(self, session_id: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT current_project FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_current_project(self, session_id: str, project: str):
+        self._conn().execute(
+            "INSERT INTO sessions (session_id, current_project, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET current_project = excluded.current_project, "
+            "updated_at = excluded.updated_at",
+            (session_id, project, time.time())
+        )
+
+    def forget_project(self, project: str):
+        self._conn().execute("DELETE FROM sessions WHERE current_project = ?", (project,))
+        self._conn().execute("DELETE FROM watches WHERE project = ?", (project,))
+
+    def _put_process(self, entry: dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO processes (project, data) VALUES (?, ?)",
+            (entry["project"], json.dumps(entry))
+        )
+
+    def _get_process(self, project: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT data FROM processes WHERE project = ?", (project,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def remove_process(self, project: str):
+        self._conn().execute("DELETE FROM processes WHERE project = ?", (project,))
+
+    def _all_processes(self) -> List[dict]:
+        return [json.loads(row[0]) for row in self._conn().execute("SELECT data FROM processes")]
+
+    def watch(self, client_id: str, project: str):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO watches (client_id, project, owner, updated_at) VALUES (?, ?, ?, ?)",
+            (client_id, project, WORKER_ID, time.time())
+        )
+
+    def unwatch(self, client_id: str):
+        self._conn().execute("DELETE FROM watches WHERE client_id = ?", (client_id,))
+
+    def _all_watches(self) -> List[dict]:
+        rows = self._conn().execute("SELECT client_id, project, owner FROM watches")
+        return [{"client_id": c, "project": p, "owner": o} for c, p, o in rows]
+
+    def get_chat(self, key: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT data FROM chats WHERE chat_key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_chat(self, key: str, data: dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO chats (chat_key, data, updated_at) VALUES (?, ?, ?)",
+            (key, json.dumps(data), data.get("updated_at", time.time()))
+        )
+
+    def delete_chat(self, key: str):
+        self._conn().execute("DELETE FROM chats WHERE chat_key = ?", (key,))
+
+    def prune_chats(self, keep: int):
+        self._conn().execute(
+            "DELETE FROM chats WHERE chat_key NOT IN "
+            "(SELECT chat_key FROM chats ORDER BY updated_at DESC LIMIT ?)",
+            (keep,)
+        )
+
+class KVSessionRegistry(SessionRegistry):
+    """
+    Adapter for an external KV store. `client` needs Redis-style hash commands:
+    hget, hset, hdel, hgetall (redis.Redis(decode_responses=True) fits as-is)
+    """
+
+    def __init__(self, client, prefix: str = "devdost"):
+        self.client = client
+        self.sessions_key = f"{prefix}:sessions"
+        self.processes_key = f"{prefix}:processes"
+        self.watches_key = f"{prefix}:watches"
+        self.chats_key = f"{prefix}:chats"
+
+    def get_current_project(self, session_id: str) -> Optional[str]:
+        return self.client.hget(self.sessions_key, session_id)
+
+    def set_current_project(self, session_id: str, project: str):
+        self.client.hset(self.sessions_key, session_id, project)
+
+    def forget_project(self, project: str):
+        stale = [sid for sid, value in self.client.hgetall(self.sessions_key).items() if value == project]
+        if stale:
+            self.client.hdel(self.sessions_key, *stale)
+        watchers = [cid for cid, raw in self.client.hgetall(self.watches_key).items()
+                    if json.loads(raw).get("project") == project]
+        if watchers:
+            self.client.hdel(self.watches_key, *watchers)
+
+    def _put_process(self, entry: dict):
+        self.client.hset(self.processes_key, entry["project"], json.dumps(entry))
+
+    def _get_process(self, project: str) -> Optional[dict]:
+        raw = self.client.hget(self.processes_key, project)
+        return json.loads(raw) if raw else None
+
+    def remove_process(self, project: str):
+        self.client.hdel(self.processes_key, project)
+
+    def _all_processes(self) -> List[dict]:
+        return [json.loads(raw) for raw in self.client.hgetall(self.processes_key).values()]
+
+    def watch(self, client_id: str, project: str):
+        self.client.hset(self.watches_key, client_id, json.dumps({"project": project, "owner": WORKER_ID}))
+
+    def unwatch(self, client_id: str):
+        self.client.hdel(self.watches_key, client_id)
+
+    def _all_watches(self) -> List[dict]:
+        return [dict(json.loads(raw), client_id=cid) for cid, raw in self.client.hgetall(self.watches_key).items()]
+
+    def get_chat(self, key: str) -> Optional[dict]:
+        raw = self.client.hget(self.chats_key, key)
+        return json.loads(raw) if raw else None
+
+    def put_chat(self, key: str, data: dict):
+        self.client.hset(self.chats_key, key, json.dumps(data))
+
+    def delete_chat(self, key: str):
+        self.client.hdel(self.chats_key, key)
+
+    def prune_chats(self, keep: int):
+        chats = self.client.hgetall(self.chats_key)
+        if len(chats) <= keep:
+            return
+        by_age = sorted(chats, key=lambda k: json.loads(chats[k]).get("updated_at", 0), reverse=True)
+        self.client.hdel(self.chats_key, *by_age[keep:])
+
+def open_session_registry(url: Optional[str] = None) -> SessionRegistry:
+    """Build the registry named by `url` / DEVDOST_SESSION_STORE"""
+    url = url or os.getenv("DEVDOST_SESSION_STORE", "")
+
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("DEVDOST_SESSION_STORE is a redis:// URL but the `redis` package is not installed")
+        return KVSessionRegistry(redis.Redis.from_url(url, decode_responses=True))
+
+    if url.startswith("sqlite:///"):
+        return SQLiteSessionRegistry(url[len("sqlite:///"):])
+
+    if url:
+        raise ValueError(f"Unsupported DEVDOST_SESSION_STORE: {url}")
+
+    return SQLiteSessionRegistry()
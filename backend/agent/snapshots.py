@@ -0,0 +1,249 @@
+"""
+Content-addressed project snapshots
+Regeneration overwrote files in place and deletes were rmtree - the only way
+back was asking the LLM again. The snapshot store keeps:
+
+    <root>/manifests/<project>/<id>.json          {path: {sha, size, mtime_ns}} per snapshot
+
+File contents live in the dedup blob pool (dedup.py, PROJECTS_ROOT/.blobs):
+stored once, shared with project files where the mode allows, and collected by
+the pool's GC, which keeps every sha a manifest still refers to (live_blobs).
+
+- a snapshot is taken before an agent run writes a project (planner_agent, once the
+  target name is known - that also covers a new project reusing an existing name)
+  and before an on-disk project, file or folder is deleted - at most once per agent
+  run (trace) and project, however many files the run deletes
+- taking one only reads files whose size/mtime changed since the last manifest
+- an unchanged tree with the same label does not create a new manifest
+- restore rewrites only the files that differ and deletes the extra ones
+- identical files (across runs or projects) are one blob
+
+Manifests: DEVDOST_SNAPSHOT_DIR (default ./.devdost/snapshots); the newest
+DEVDOST_SNAPSHOT_KEEP (default 20) snapshots per project are kept, plus the newest
+"before-run" one (undo_last_run) if it is older than those.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dedup import pool
+from paths import storage
+from project_store import IGNORED_DIRS, TEMP_PREFIX, is_temp_file, update_store
+from telemetry import current_span, metrics, record_event
+
+DEFAULT_ROOT = Path.cwd() / ".devdost" / "snapshots"
+KEEP_SNAPSHOTS = int(os.getenv("DEVDOST_SNAPSHOT_KEEP", "20"))
+RUN_LABEL = "before-run"
+
+metrics.describe("devdost_snapshot_files_hashed", "histogram", "Files read and hashed per snapshot (changed files only)")
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, path)
+
+class SnapshotStore:
+    """Manifests over the blob pool; thread-safe per process, safe across processes (atomic renames)"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+        self.manifest_root = self.root / "manifests"
+        self._lock = threading.Lock()
+
+    # ---------- manifests ----------
+
+    def _manifest_dir(self, project: str) -> Path:
+        return self.manifest_root / project
+
+    def _manifest_ids(self, project: str) -> List[str]:
+        try:
+            return sorted(p.stem for p in self._manifest_dir(project).glob("*.json"))
+        except FileNotFoundError:
+            return []
+
+    def load(self, project: str, snapshot_id: str) -> dict:
+        path = self._manifest_dir(project) / f"{snapshot_id}.json"
+        if not path.is_file():
+            raise KeyError(f"No snapshot {snapshot_id} for {project}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def latest(self, project: str, label: Optional[str] = None) -> Optional[dict]:
+        for snapshot_id in reversed(self._manifest_ids(project)):
+            manifest = self.load(project, snapshot_id)
+            if label is None or manifest.get("label") == label:
+                return manifest
+        return None
+
+    def list(self, project: str) -> List[dict]:
+        """Newest first, without the file maps"""
+        result = []
+        for snapshot_id in reversed(self._manifest_ids(project)):
+            manifest = self.load(project, snapshot_id)
+            result.append({k: manifest[k] for k in ("id", "label", "created_at")} | {"file_count": len(manifest["files"])})
+        return result
+
+    # ---------- taking snapshots ----------
+
+    def _scan(self, project: str, previous: Optional[dict]) -> Dict[str, dict]:
+        """Current tree; files whose size/mtime match `previous` are not re-read"""
+        project_path = storage.path_for(project)
+        known = previous["files"] if previous else {}
+        files, hashed = {}, 0
+        for root, dirs, names in os.walk(project_path):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            for name in names:
+                if is_temp_file(name):
+                    continue
+                file_path = Path(root) / name
+                rel_path = file_path.relative_to(project_path).as_posix()
+                try:
+                    stat = file_path.stat()
+                    entry = known.get(rel_path)
+                    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns \
+                            and pool.blob_path(entry["sha"]).exists():
+                        files[rel_path] = entry
+                        continue
+                    sha = pool.add_file(file_path)
+                    hashed += 1
+                except OSError:
+                    continue  # vanished mid-scan
+                files[rel_path] = {"sha": sha, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        metrics.observe("devdost_snapshot_files_hashed", hashed)
+        return files
+
+    def take(self, project: str, label: str = "") -> Optional[dict]:
+        """Snapshot the project's tree; returns the manifest (the previous one if neither tree nor label changed)"""
+        if not storage.path_for(project).is_dir():
+            return None
+        with self._lock:
+            previous = self.latest(project)
+            files = self._scan(project, previous)
+            if previous and previous.get("label") == label and \
+                    {p: e["sha"] for p, e in files.items()} == {p: e["sha"] for p, e in previous["files"].items()}:
+                return previous
+            created = time.time()
+            snapshot_id = f"{int(created * 1000):013d}-{uuid.uuid4().hex[:6]}"
+            manifest = {"id": snapshot_id, "project": project, "label": label, "created_at": created, "files": files}
+            _atomic_write(self._manifest_dir(project) / f"{snapshot_id}.json", json.dumps(manifest).encode("utf-8"))
+            self._prune(project)
+        record_event("snapshot_taken")
+        return manifest
+
+    def _prune(self, project: str):
+        stale = self._manifest_ids(project)[:-KEEP_SNAPSHOTS or None]
+        if not stale:
+            return
+        # undo_last_run needs the newest before-run however many other snapshots followed it
+        run = self.latest(project, label=RUN_LABEL)
+        for snapshot_id in stale:
+            if run is None or snapshot_id != run["id"]:
+                (self._manifest_dir(project) / f"{snapshot_id}.json").unlink(missing_ok=True)
+
+    # ---------- diff / restore ----------
+
+    @staticmethod
+    def _diff(old: Dict[str, dict], new: Dict[str, dict]) -> dict:
+        return {
+            "added": sorted(p for p in new if p not in old),
+            "removed": sorted(p for p in old if p not in new),
+            "modified": sorted(p for p in new if p in old and new[p]["sha"] != old[p]["sha"]),
+        }
+
+    def diff(self, project: str, from_id: str, to_id: Optional[str] = None) -> dict:
+        """Changes from one snapshot to another (to_id None = the project as it is now)"""
+        old = self.load(project, from_id)["files"]
+        if to_id is None:
+            with self._lock:
+                new = self._scan(project, self.latest(project))
+        else:
+            new = self.load(project, to_id)["files"]
+        return self._diff(old, new)
+
+    def restore(self, project: str, snapshot_id: str) -> dict:
+        """Make the project match a snapshot, touching only the files that differ.
+        The current state is snapshotted first, so a restore can be undone too."""
+        target = self.load(project, snapshot_id)["files"]
+        current = self.take(project, label="before-restore")
+        current_files = current["files"] if current else {}
+        changes = self._diff(current_files, target)
+
+        project_path = storage.path_for(project)
+        project_path.mkdir(parents=True, exist_ok=True)
+        for rel_path in changes["added"] + changes["modified"]:
+            file_path = project_path / rel_path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            temp = file_path.with_name(f"{TEMP_PREFIX}{uuid.uuid4().hex}")
+            pool.materialize(target[rel_path]["sha"], temp)
+            os.replace(temp, file_path)
+            update_store("record_file", project, rel_path)
+        for rel_path in changes["removed"]:
+            (project_path / rel_path).unlink(missing_ok=True)
+            update_store("remove_file", project, rel_path)
+
+        record_event("snapshot_restored")
+        print(f"⏪ Restored {project} to {snapshot_id}: "
+              f"+{len(changes['added'])} ~{len(changes['modified'])} -{len(changes['removed'])}")
+        return changes
+
+    # ---------- housekeeping ----------
+
+    def live_blobs(self) -> set:
+        """Every sha a manifest refers to - the pool's GC keeps these.
+        Raises on an unreadable manifest: better no GC than deleting its blobs"""
+        live = set()
+        for manifest_path in self.manifest_root.glob("*/*.json"):
+            live.update(e["sha"] for e in json.loads(manifest_path.read_text(encoding="utf-8"))["files"].values())
+        return live
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_snapshot_store() -> SnapshotStore:
+    """Process-wide snapshot store (opened on first use)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SnapshotStore(os.getenv("DEVDOST_SNAPSHOT_DIR") or DEFAULT_ROOT)
+    return _store
+
+_taken_in_trace: "OrderedDict[tuple, bool]" = OrderedDict()
+_taken_lock = threading.Lock()
+MAX_TRACKED_TRACES = 1024
+
+def snapshot_before(project: Optional[str], label: str):
+    """
+    Best-effort snapshot - a failure must never block the run/delete it protects.
+    Inside a traced agent run only the first call per project snapshots: that one
+    already holds the state from before the run's changes.
+    """
+    if not project:
+        return None
+    active = current_span()
+    key = (active.trace_id, project) if active is not None else None
+    if key is not None:
+        with _taken_lock:
+            if key in _taken_in_trace:
+                return None
+            _taken_in_trace[key] = True
+            while len(_taken_in_trace) > MAX_TRACKED_TRACES:
+                _taken_in_trace.popitem(last=False)
+    try:
+        return get_snapshot_store().take(project, label=label)
+    except Exception as e:
+        print(f"⚠️ Snapshot of {project} failed: {e}")
+        return None
+
+def undo_last_run(project: str) -> Optional[dict]:
+    """Restore the snapshot taken before the latest agent run"""
+    store = get_snapshot_store()
+    manifest = store.latest(project, label=RUN_LABEL)
+    return store.restore(project, manifest["id"]) if manifest else None
@@ -1,13 +1,14 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Callable
 from pydantic import BaseModel, Field, ConfigDict
 from typing import TypedDict, Annotated
 import operator
+from chat_records import ChatRecord, append_chat, chat_to_dicts
 
 class State(TypedDict):
     """Main state for LangGraph agent"""
     messages: Annotated[list, operator.add]
     user_prompt: str
-    chat_history: list
+    chat_history: Annotated[list, append_chat]
     current_project: Optional[str]
     plan: Optional[dict]
     task_plan: Optional[dict]
@@ -21,6 +22,9 @@ class State(TypedDict):
     debug_history: list
     file_retry_count: dict
     max_retries: int
+    coder_iterations: int
+    max_coder_iterations: int
+    _emit_progress: Optional[Callable]
 
 class File(BaseModel):
     """File specification"""
@@ -45,6 +49,24 @@ class TaskPlan(BaseModel):
     implementation_steps: list[ImplementationTask] = Field(description="Ordered list of tasks")
     model_config = ConfigDict(extra="allow")
     
+class ProjectBlueprint(BaseModel):
+    """Plan + implementation tasks returned by a single planning call"""
+    name: str = Field(description="Project name (lowercase, hyphens)")
+    description: str = Field(description="One-line project description")
+    techstack: str = Field(description="Tech stack")
+    features: list[str] = Field(description="List of features", default_factory=list)
+    files: list[File] = Field(description="Files to be created", default_factory=list)
+    implementation_steps: list[ImplementationTask] = Field(description="Ordered list of tasks, one per file", default_factory=list)
+
+    def to_plan(self) -> Plan:
+        return Plan(
+            name=self.name,
+            description=self.description,
+            techstack=self.techstack,
+            features=self.features,
+            files=self.files
+        )
+
 class CoderState(BaseModel):
     """State for coder agent"""
     task_plan: TaskPlan = Field(description="Task plan to implement")
@@ -58,11 +80,16 @@ class ChatMessage(BaseModel):
     content: str = Field(description="Message content")
 
 class ProjectInfo(BaseModel):
-    """Project metadata"""
+    """Project metadata (one row of project_store)"""
     name: str = Field(description="Project name")
     path: str = Field(description="Project path")
+    techstack: Optional[str] = Field(None, description="Detected project type")
     file_count: int = Field(0, description="Number of files")
-    created_at: Optional[str] = Field(None, description="Creation timestamp")
+    size_bytes: int = Field(0, description="Total size of indexed files")
+    created_at: Optional[float] = Field(None, description="Creation timestamp")
+    updated_at: Optional[float] = Field(None, description="Last indexed change")
+    last_run: Optional[float] = Field(None, description="Last time the project was started")
+    tree_hash: Optional[str] = Field(None, description="Order-independent hash of all indexed files")
 
 class DebugInfo(BaseModel):
     """Debug information"""
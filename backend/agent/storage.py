@@ -0,0 +1,166 @@
+"""
+Project storage layout + path resolver
+With every project directly under PROJECTS_ROOT, one directory ends up holding
+tens of thousands of entries: listing it, creating a project in it and every
+lookup slow down with the project count. The sharded layout spreads projects
+over 256 hash buckets:
+
+    flat:     PROJECTS_ROOT/<name>
+    sharded:  PROJECTS_ROOT/.shards/<sha1(name)[:2]>/<name>
+
+Select with DEVDOST_STORAGE_LAYOUT=flat|sharded (default flat). In sharded mode
+projects still at the flat location keep resolving there until `migrate()`
+moves them (python storage.py migrate). The shard dir is hidden, so it is never
+mistaken for a project. paths.get_project_path delegates here; `locate` is the
+reverse mapping (absolute path → project, path inside it) used by the watcher.
+
+Cold projects can live as archives instead (PROJECTS_ROOT/.archive/[<bucket>/]<name>.zip,
+see lifecycle.py); they still count as existing projects and are listed.
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+FLAT, SHARDED = "flat", "sharded"
+SHARD_DIR = ".shards"
+ARCHIVE_DIR = ".archive"
+ARCHIVE_SUFFIX = ".zip"
+SHARD_WIDTH = 2  # hex chars → 256 buckets
+
+def shard_of(project_name: str) -> str:
+    return hashlib.sha1(project_name.encode("utf-8")).hexdigest()[:SHARD_WIDTH]
+
+class ProjectStorage:
+    """Maps project names to directories for one PROJECTS_ROOT"""
+
+    def __init__(self, root: Path, layout: str = FLAT):
+        if layout not in (FLAT, SHARDED):
+            print(f"⚠️ Unknown storage layout '{layout}', using {FLAT}")
+            layout = FLAT
+        self.root = Path(root)
+        self.layout = layout
+
+    @property
+    def shard_root(self) -> Path:
+        return self.root / SHARD_DIR
+
+    def flat_path(self, project_name: str) -> Path:
+        return self.root / project_name
+
+    def sharded_path(self, project_name: str) -> Path:
+        return self.shard_root / shard_of(project_name) / project_name
+
+    @property
+    def archive_root(self) -> Path:
+        return self.root / ARCHIVE_DIR
+
+    def archive_path(self, project_name: str) -> Path:
+        """Where `project_name`'s archive lives (it may not exist)"""
+        flat = self.archive_root / f"{project_name}{ARCHIVE_SUFFIX}"
+        if self.layout == FLAT:
+            return flat
+        path = self.archive_root / shard_of(project_name) / f"{project_name}{ARCHIVE_SUFFIX}"
+        return flat if not path.exists() and flat.exists() else path
+
+    def is_archived(self, project_name: str) -> bool:
+        return self.archive_path(project_name).is_file()
+
+    def exists(self, project_name: str) -> bool:
+        """On disk or archived (never restores)"""
+        return self.path_for(project_name).exists() or self.is_archived(project_name)
+
+    def path_for(self, project_name: str) -> Path:
+        """Directory of `project_name` (it may not exist yet)"""
+        if self.layout == FLAT:
+            return self.flat_path(project_name)
+        path = self.sharded_path(project_name)
+        if not path.exists():
+            legacy = self.flat_path(project_name)
+            if legacy.is_dir():
+                return legacy  # not migrated yet
+        return path
+
+    def _shard_dirs(self) -> List[Path]:
+        try:
+            return [Path(entry.path) for entry in os.scandir(self.shard_root) if entry.is_dir()]
+        except FileNotFoundError:
+            return []
+
+    def _archive_dirs(self) -> List[Path]:
+        try:
+            buckets = [Path(e.path) for e in os.scandir(self.archive_root) if e.is_dir() and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
+        return [self.archive_root] + buckets
+
+    def list_archived(self) -> List[str]:
+        names = []
+        for parent in self._archive_dirs():
+            with os.scandir(parent) as entries:
+                names.extend(e.name[:-len(ARCHIVE_SUFFIX)] for e in entries
+                             if e.is_file() and e.name.endswith(ARCHIVE_SUFFIX) and not e.name.startswith("."))
+        return names
+
+    def list_projects(self) -> List[str]:
+        """Every project in either layout, archived ones included (hidden dirs like .scaffold are internal)"""
+        names = []
+        for parent in [self.root] + self._shard_dirs():
+            try:
+                with os.scandir(parent) as entries:
+                    names.extend(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+            except FileNotFoundError:
+                continue
+        names.extend(self.list_archived())
+        return list(dict.fromkeys(names))
+
+    def stamp(self) -> Optional[tuple]:
+        """Changes whenever a project dir or archive is added or removed (mtimes of the dirs holding them)"""
+        stamps = []
+        for parent in [self.root] + self._shard_dirs() + self._archive_dirs():
+            try:
+                stamps.append(parent.stat().st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return tuple(stamps) or None
+
+    def locate(self, path) -> Tuple[Optional[str], Optional[str]]:
+        """(project, "/"-joined path inside it) for a path under root; (None, None) outside projects.
+        The project dir itself gives (project, "")."""
+        if not path:
+            return None, None
+        rel = os.path.relpath(os.path.abspath(path), self.root)
+        parts = rel.split(os.sep)
+        if parts[0] == SHARD_DIR:
+            parts = parts[2:]  # drop ".shards/<bucket>"
+        if not parts or parts[0] in (".", "..") or parts[0].startswith("."):
+            return None, None
+        return parts[0], "/".join(parts[1:])
+
+    def migrate(self) -> int:
+        """Move flat projects into their shards (same filesystem → cheap renames). Returns how many moved"""
+        if self.layout != SHARDED:
+            return 0
+        moved = 0
+        try:
+            entries = [e for e in os.scandir(self.root) if e.is_dir() and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            target = self.sharded_path(entry.name)
+            if target.exists():
+                print(f"⚠️ {entry.name} exists in both layouts, left in place")
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(entry.path, target)
+            moved += 1
+        return moved
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["migrate"]:
+        from paths import storage
+        print(f"📦 Moved {storage.migrate()} project(s) into {storage.shard_root}")
+    else:
+        print("Usage: python storage.py migrate")
@@ -0,0 +1,276 @@
+"""
+Structured tracing + metrics for the agent pipeline
+- Spans around graph nodes, LLM calls and tool calls (duration, model, tokens, retries, cache hits)
+- Finished spans are appended to JSONL trace files
+- Aggregates are exposed in Prometheus text format (served at /metrics by app.py)
+"""
+
+import contextvars
+import json
+import os
+import pathlib
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+TRACING_ENABLED = os.getenv("DEVDOST_TRACING", "1") != "0"
+TRACE_DIR = pathlib.Path(os.getenv("DEVDOST_TRACE_DIR", str(pathlib.Path.cwd() / "traces")))
+
+DURATION_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("devdost_span", default=None)
+
+class Span:
+    """One timed operation. Attributes are free-form and end up in the JSONL record"""
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start", "duration", "attrs", "status", "error")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, **attrs):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = None
+        self.attrs = dict(attrs)
+        self.status = "ok"
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def incr(self, key: str, amount: int = 1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": datetime.fromtimestamp(self.start).isoformat(),
+            "duration_ms": round((self.duration or 0) * 1000, 2),
+            "status": self.status,
+            "error": self.error,
+            **self.attrs,
+        }
+
+# ===================== METRICS =====================
+
+class MetricsRegistry:
+    """Minimal counter/histogram store with Prometheus text exposition"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, tuple], float] = defaultdict(float)
+        self.histograms: Dict[Tuple[str, tuple], list] = {}
+        self.help: Dict[str, Tuple[str, str]] = {}
+
+    def describe(self, name: str, metric_type: str, text: str):
+        self.help[name] = (metric_type, text)
+
+    def inc(self, metric: str, amount: float = 1, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] += amount
+
+    def observe(self, metric: str, value: float, **labels):
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                # [bucket counts..., sum, count]
+                hist = self.histograms[key] = [0] * len(DURATION_BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    @staticmethod
+    def _labels(labels: tuple, extra: Optional[tuple] = None) -> str:
+        items = list(labels) + list(extra or ())
+        if not items:
+            return ""
+        escaped = []
+        for key, value in items:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped.append(f'{key}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((k, list(v)) for k, v in self.histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                metric_type, text = self.help.get(name, ("counter", name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name}{self._labels(labels)} {value}")
+
+        for (name, labels), hist in histograms:
+            if name not in seen:
+                seen.add(name)
+                _, text = self.help.get(name, ("histogram", name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} histogram")
+            for i, bound in enumerate(DURATION_BUCKETS):
+                lines.append(f"{name}_bucket{self._labels(labels, (('le', bound),))} {hist[i]}")
+            lines.append(f"{name}_bucket{self._labels(labels, (('le', '+Inf'),))} {hist[-1]}")
+            lines.append(f"{name}_sum{self._labels(labels)} {hist[-2]}")
+            lines.append(f"{name}_count{self._labels(labels)} {hist[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe("devdost_span_duration_seconds", "histogram", "Duration of graph nodes, LLM calls and tool calls")
+metrics.describe("devdost_llm_calls_total", "counter", "LLM calls by model and status")
+metrics.describe("devdost_llm_tokens_total", "counter", "LLM tokens by model and direction")
+metrics.describe("devdost_events_total", "counter", "Pipeline events: fallbacks, retries, cache hits")
+
+# ===================== JSONL EXPORT =====================
+
+class JsonlExporter:
+    """Append finished spans to a daily JSONL file"""
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        record = json.dumps(span.to_dict(), default=str, ensure_ascii=False)
+        path = self.directory / f"traces-{datetime.now():%Y%m%d}.jsonl"
+        try:
+            with self._lock:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(record + "\n")
+        except OSError as e:
+            print(f"⚠️ Trace export failed: {e}")
+
+exporter = JsonlExporter(TRACE_DIR)
+
+# Extra in-process consumers of finished spans (benchmarks, tests)
+_span_listeners = []
+
+def add_span_listener(fn):
+    _span_listeners.append(fn)
+
+def remove_span_listener(fn):
+    if fn in _span_listeners:
+        _span_listeners.remove(fn)
+
+# ===================== SPANS =====================
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attrs):
+    """Time a block. Nested spans share the trace id of the enclosing span"""
+    current = Span(name, kind, parent=_current_span.get(), **attrs)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.status = "error"
+        current.error = f"{type(e).__name__}: {e}"[:500]
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        metrics.observe("devdost_span_duration_seconds", current.duration, kind=kind, name=name)
+        if TRACING_ENABLED:
+            exporter.export(current)
+        for listener in _span_listeners:
+            try:
+                listener(current)
+            except Exception as e:
+                print(f"⚠️ Span listener error: {e}")
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def record_event(event: str, **labels):
+    """Count a pipeline event (fallback fired, cache hit, retry...) and tag the current span"""
+    metrics.inc("devdost_events_total", event=event, **labels)
+    active = _current_span.get()
+    if active is not None:
+        active.incr(event)
+
+def traced_node(name: str):
+    """Decorator for LangGraph nodes"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(state, *args, **kwargs):
+            with span(f"node.{name}", kind="node", project=state.get("current_project")) as sp:
+                result = fn(state, *args, **kwargs)
+                if isinstance(result, dict):
+                    sp.set(status_out=result.get("status"))
+                return result
+        return wrapper
+    return decorator
+
+# ===================== LLM / TOOL CALLS =====================
+
+def model_name_of(llm) -> str:
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+def token_usage(message) -> Tuple[int, int]:
+    """(prompt_tokens, completion_tokens) from a LangChain AIMessage"""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage:
+        return usage.get("input_tokens", 0) or 0, usage.get("output_tokens", 0) or 0
+    token_info = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return token_info.get("prompt_tokens", 0) or 0, token_info.get("completion_tokens", 0) or 0
+
+def _record_llm(sp: Span, model: str, message):
+    prompt_tokens, completion_tokens = token_usage(message)
+    sp.set(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    metrics.inc("devdost_llm_tokens_total", prompt_tokens, model=model, type="prompt")
+    metrics.inc("devdost_llm_tokens_total", completion_tokens, model=model, type="completion")
+
+def traced_invoke(llm, payload, purpose: str):
+    """llm.invoke with a span and token accounting"""
+    model = model_name_of(llm)
+    status = "error"
+    try:
+        with span(f"llm.{purpose}", kind="llm", model=model) as sp:
+            message = llm.invoke(payload)
+            _record_llm(sp, model, message)
+            status = "ok"
+            return message
+    finally:
+        metrics.inc("devdost_llm_calls_total", model=model, purpose=purpose, status=status)
+
+def traced_structured(llm, schema, payload, purpose: str):
+    """llm.with_structured_output(schema).invoke with a span; keeps the raw message for token usage"""
+    model = model_name_of(llm)
+    status = "error"
+    try:
+        with span(f"llm.{purpose}", kind="llm", model=model, schema=getattr(schema, "__name__", str(schema))) as sp:
+            result = llm.with_structured_output(schema, include_raw=True).invoke(payload)
+            if isinstance(result, dict) and "raw" in result:
+                _record_llm(sp, model, result.get("raw"))
+                if result.get("parsing_error") is not None:
+                    raise result["parsing_error"]
+                result = result.get("parsed")
+            status = "ok"
+            return result
+    finally:
+        metrics.inc("devdost_llm_calls_total", model=model, purpose=purpose, status=status)
+
+def traced_tool(tool, args: dict):
+    """tool.invoke with a span"""
+    name = getattr(tool, "name", type(tool).__name__)
+    with span(f"tool.{name}", kind="tool", filepath=args.get("filepath"), cmd=args.get("cmd")):
+        return tool.invoke(args)
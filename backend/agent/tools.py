@@ -1,42 +1,19 @@
 import pathlib
 import subprocess
 import shutil
-from typing import Tuple, List
+from typing import Dict, Tuple, List
 from langchain_core.tools import tool
 
-# Base directory for all projects
-PROJECTS_ROOT = pathlib.Path.cwd() / "generated_projects"
-PROJECTS_ROOT.mkdir(parents=True, exist_ok=True)
-
-
-# ==================== PROJECT MANAGEMENT ====================
-def get_project_path(project_name: str) -> pathlib.Path:
-    """Get the path for a specific project"""
-    return PROJECTS_ROOT / project_name
-def create_project(project_name: str) -> str:
-    """Create a new project directory"""
-    project_path = get_project_path(project_name)
-    project_path.mkdir(parents=True, exist_ok=True)
-    return str(project_path)
-def project_exists(project_name: str) -> bool:
-    """Check if a project exists"""
-    return get_project_path(project_name).exists()
-def list_all_projects() -> List[str]:
-    """List all available projects"""
-    return [p.name for p in PROJECTS_ROOT.iterdir() if p.is_dir()]
-def set_current_project(project_name: str):
-    """Set the current working project (for session context)"""
-    # This would be stored in session state in the graph
-    pass
-def safe_path_for_project(project_name: str, path: str) -> pathlib.Path:
-    """Get a safe path within a specific project"""
-    project_root = get_project_path(project_name)
-    p = (project_root / path).resolve()
-    
-    if project_root not in p.parents and project_root != p.parent and project_root != p:
-        raise ValueError(f"Attempt to access outside project {project_name}")
-    
-    return p
+# Path helpers live in paths.py (no langchain import) - re-exported for existing callers
+from paths import (
+    PROJECTS_ROOT, get_project_path, create_project, project_exists,
+    list_all_projects, set_current_project, safe_path_for_project, init_project_root
+)
+from project_store import get_project_store, update_store
+from lifecycle import discard_archive
+from file_batch import write_files
+from dedup import copy_file, write_file
+from snapshots import snapshot_before
 
 
 # ==================== FILE OPERATIONS (Project-Aware) ====================
@@ -53,11 +30,22 @@ def create_file_tool(project_name: str, filepath: str, content: str = "") -> str
     p = safe_path_for_project(project_name, filepath)
     p.parent.mkdir(parents=True, exist_ok=True)
     
-    with open(p, "w", encoding="utf-8") as f:
-        f.write(content)
+    write_file(p, content)
+    update_store("record_file", project_name, filepath, content)
     
     return f"âœ… Created: {project_name}/{filepath}"
 @tool
+def create_files_tool(project_name: str, files: List[Dict[str, str]]) -> str:
+    """Creates several files in the specified project in one atomic batch.
+    
+    Args:
+        project_name: Name of the project
+        files: List of {"filepath": path relative to project root, "content": file content}
+    """
+    written = write_files(project_name, {f["filepath"]: f.get("content", "") for f in files})
+    
+    return f"âœ… Created {len(written)} files in {project_name}"
+@tool
 def read_file_tool(project_name: str, filepath: str) -> str:
     """Reads content from a file in the specified project.
     
@@ -85,11 +73,14 @@ def delete_file_tool(project_name: str, filepath: str) -> str:
     if not p.exists():
         return f"âŒ File not found: {filepath}"
     
+    snapshot_before(project_name, "before-delete")
     if p.is_file():
         p.unlink()
+        update_store("remove_file", project_name, filepath)
         return f"ðŸ—‘ï¸ Deleted: {project_name}/{filepath}"
     elif p.is_dir():
         shutil.rmtree(p)
+        update_store("remove_file", project_name, filepath)
         return f"ðŸ—‘ï¸ Deleted directory: {project_name}/{filepath}"
 @tool
 def rename_file_tool(project_name: str, old_path: str, new_path: str) -> str:
@@ -108,6 +99,7 @@ def rename_file_tool(project_name: str, old_path: str, new_path: str) -> str:
     
     new_p.parent.mkdir(parents=True, exist_ok=True)
     old_p.rename(new_p)
+    update_store("move_file", project_name, old_path, new_path)
     
     return f"âœï¸ Renamed: {old_path} â†’ {new_path}"
 @tool
@@ -150,6 +142,7 @@ def move_file_tool(project_name: str, source: str, destination: str) -> str:
     
     dst_p.parent.mkdir(parents=True, exist_ok=True)
     shutil.move(str(src_p), str(dst_p))
+    update_store("move_file", project_name, source, destination)
     
     return f"ðŸ“¦ Moved: {source} â†’ {destination}"
 @tool
@@ -170,9 +163,13 @@ def copy_file_tool(project_name: str, source: str, destination: str) -> str:
     dst_p.parent.mkdir(parents=True, exist_ok=True)
     
     if src_p.is_file():
-        shutil.copy2(str(src_p), str(dst_p))
+        copy_file(str(src_p), str(dst_p))
+    else:
+        shutil.copytree(str(src_p), str(dst_p), copy_function=copy_file)
+    if dst_p.is_file():
+        update_store("record_file", project_name, destination)
     else:
-        shutil.copytree(str(src_p), str(dst_p))
+        update_store("scan_project", project_name)
     
     return f"ðŸ“‹ Copied: {source} â†’ {destination}"
 
@@ -186,12 +183,15 @@ def delete_project_tool(project_name: str) -> str:
     Args:
         project_name: Name of the project to delete
     """
-    project_path = get_project_path(project_name)
-    
-    if not project_path.exists():
+    if not project_exists(project_name):
         return f"âŒ Project not found: {project_name}"
     
-    shutil.rmtree(project_path)
+    discard_archive(project_name)  # archived: deleting the archive is enough
+    project_path = get_project_path(project_name)
+    if project_path.exists():
+        snapshot_before(project_name, "before-delete")
+        shutil.rmtree(project_path)
+    update_store("delete_project", project_name)
     return f"ðŸ—‘ï¸ Deleted project: {project_name}"
 @tool
 def list_projects_tool() -> str:
@@ -213,15 +213,15 @@ def get_project_info_tool(project_name: str) -> str:
         return f"âŒ Project not found: {project_name}"
     
     project_path = get_project_path(project_name)
-    files = list(project_path.rglob("*"))
-    file_count = len([f for f in files if f.is_file()])
-    dir_count = len([f for f in files if f.is_dir()])
+    # metadata from the project store - no walk into node_modules
+    meta = get_project_store().get(project_name) or {}
     
     info = f"""
 ðŸ“¦ Project: {project_name}
 ðŸ“‚ Path: {project_path}
-ðŸ“„ Files: {file_count}
-ðŸ“ Directories: {dir_count}
+ðŸ§° Stack: {meta.get("techstack") or "unknown"}
+ðŸ“„ Files: {meta.get("file_count", 0)}
+ðŸ’¾ Size: {meta.get("size_bytes", 0) / 1024:.1f}KB
 """
     return info.strip()
 
@@ -285,8 +285,3 @@ def list_files(directory: str = ".") -> str:
     """Legacy list_files - uses default project"""
     return list_project_files_tool.run({"project_name": "default", "directory": directory})
 
-
-def init_project_root():
-    """Initialize the projects root directory"""
-    PROJECTS_ROOT.mkdir(parents=True, exist_ok=True)
-    return str(PROJECTS_ROOT)
\ No newline at end of file
@@ -0,0 +1,344 @@
+"""
+In-process syntax validation for generated files
+Cheap per-extension checks that run before a file is written, so broken
+LLM output is retried immediately instead of failing at `npm start`.
+"""
+
+import ast
+import json
+import re
+from html.parser import HTMLParser
+from typing import Callable, Dict, Optional
+
+# extension -> validator(content, filepath) -> error message or None
+VALIDATORS: Dict[str, Callable[[str, str], Optional[str]]] = {}
+
+FENCE_LANGUAGES = {
+    ".js": ("javascript", "js", "jsx"),
+    ".jsx": ("jsx", "javascript", "js"),
+    ".mjs": ("javascript", "js"),
+    ".cjs": ("javascript", "js"),
+    ".ts": ("typescript", "ts", "tsx"),
+    ".tsx": ("tsx", "typescript", "ts"),
+    ".css": ("css",),
+    ".html": ("html",),
+    ".htm": ("html",),
+    ".json": ("json",),
+    ".py": ("python", "py"),
+}
+
+def register_validator(*extensions: str):
+    """Register a validator for one or more file extensions"""
+    def decorator(fn):
+        for ext in extensions:
+            VALIDATORS[ext.lower()] = fn
+        return fn
+    return decorator
+
+def _extension(filepath: str) -> str:
+    name = filepath.replace("\\", "/").rsplit("/", 1)[-1].lower()
+    return "." + name.rsplit(".", 1)[-1] if "." in name else ""
+
+def validate_content(filepath: str, content: str) -> Optional[str]:
+    """Validate generated content for a file. Returns error message or None"""
+    if not content.strip():
+        return "empty output"
+
+    validator = VALIDATORS.get(_extension(filepath))
+    if validator is None:
+        return None
+
+    try:
+        return validator(content, filepath)
+    except Exception as e:
+        # A crashing validator must never block generation
+        print(f"⚠️ Validator crashed for {filepath}: {e}")
+        return None
+
+def extract_code(response: str, filepath: str) -> str:
+    """Pull the file content out of an LLM reply, preferring the fence matching the file type"""
+    blocks = re.findall(r"```([\w+#.-]*)[^\n]*\n(.*?)```", response, re.DOTALL)
+    if not blocks:
+        # Unclosed fence (truncated reply) - drop the opening line
+        stripped = response.strip()
+        if stripped.startswith("```"):
+            return stripped.split("\n", 1)[1] if "\n" in stripped else ""
+        return response.strip()
+
+    wanted = FENCE_LANGUAGES.get(_extension(filepath), ())
+    matching = [code for lang, code in blocks if lang.lower() in wanted]
+    candidates = matching or [code for _, code in blocks]
+    return max(candidates, key=len).strip("\n")
+
+# ===================== JSON / PYTHON =====================
+
+_JSONC_FILES = ("tsconfig", "jsconfig", ".eslintrc", "devcontainer")
+
+@register_validator(".json")
+def validate_json(content: str, filepath: str) -> Optional[str]:
+    name = filepath.replace("\\", "/").rsplit("/", 1)[-1].lower()
+    if name.startswith(_JSONC_FILES):
+        # JSON with comments / trailing commas is allowed for these
+        content = re.sub(r"/\*.*?\*/|(?<![:\"'])//[^\n]*", "", content, flags=re.DOTALL)
+        content = re.sub(r",(\s*[}\]])", r"\1", content)
+    try:
+        json.loads(content)
+    except json.JSONDecodeError as e:
+        return f"invalid JSON: {e.msg} (line {e.lineno}, column {e.colno})"
+    return None
+
+@register_validator(".py")
+def validate_python(content: str, filepath: str) -> Optional[str]:
+    try:
+        ast.parse(content, filename=filepath)
+    except SyntaxError as e:
+        return f"Python syntax error: {e.msg} (line {e.lineno})"
+    return None
+
+# ===================== HTML =====================
+
+class TagBalanceChecker(HTMLParser):
+    """Report mismatched structural tags - browsers auto-close the rest"""
+    STRICT_TAGS = {
+        "html", "head", "body", "script", "style", "div", "section", "main", "header",
+        "footer", "nav", "form", "table", "ul", "ol", "button", "template", "article", "aside"
+    }
+    OPTIONAL_END_TAGS = {"html", "head", "body"}
+
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.errors = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.STRICT_TAGS:
+            self.stack.append((tag, self.getpos()[0]))
+
+    def handle_endtag(self, tag):
+        if tag not in self.STRICT_TAGS:
+            return
+        if self.stack and self.stack[-1][0] == tag:
+            self.stack.pop()
+        elif any(t == tag for t, _ in self.stack):
+            open_tag, line = self.stack.pop()
+            self.errors.append(f"line {self.getpos()[0]}: </{tag}> closes <{open_tag}> opened on line {line}")
+            while self.stack and self.stack[-1][0] != tag:
+                self.stack.pop()
+            if self.stack:
+                self.stack.pop()
+        else:
+            self.errors.append(f"line {self.getpos()[0]}: unexpected </{tag}>")
+
+    def check(self, content: str) -> list:
+        self.feed(content)
+        self.close()
+        for tag, line in self.stack:
+            if tag not in self.OPTIONAL_END_TAGS:
+                self.errors.append(f"line {line}: <{tag}> is never closed")
+        return self.errors
+
+@register_validator(".html", ".htm")
+def validate_html(content: str, filepath: str) -> Optional[str]:
+    errors = TagBalanceChecker().check(content)
+    return "HTML structure error: " + "; ".join(errors[:3]) if errors else None
+
+# ===================== JS / CSS TOKENIZER =====================
+
+_PAIRS = {")": "(", "]": "[", "}": "{"}
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "in", "of", "new", "delete", "void", "throw", "yield", "await", "else"}
+# one JSX tag: <Name attrs>, </Name>, <Name />, <> or </> (attribute strings and {...} skipped whole)
+_JSX_TAG = re.compile(
+    r"<(/?)(?:[A-Za-z][\w.:-]*)?"
+    r"((?:[^<>{}\"']|\"[^\"]*\"|'[^']*'|\{(?:[^{}]|\{[^{}]*\})*\})*?)(/?)>"
+)
+
+def scan_source(content: str, js: bool = True, jsx: bool = False) -> Optional[str]:
+    """
+    Tokenize just enough of JS/CSS to find unterminated strings, comments,
+    template literals and unbalanced brackets. Returns error message or None
+    """
+    stack = []          # (bracket, line)
+    templates = []      # brace depth at which each open `${` returns to template text
+    elements = [0]      # open JSX elements, per nesting level of `{...}` child expressions
+    children = []       # brace depth at which each child `{` returns to JSX text
+    i, line, n = 0, 1, len(content)
+    last_sig = ""       # last significant char/word, for regex-vs-division
+    in_children = False # just left JSX text: a `<` here is a tag, a `{` a child expression
+
+    def unterminated(what, start_line):
+        return f"unterminated {what} starting on line {start_line}"
+
+    def skip_text(i, line):
+        """JSX text is not code - its quotes and brackets ("Don't worry :)") are never checked"""
+        while i < n and content[i] not in "<{":
+            if content[i] == "\n":
+                line += 1
+            i += 1
+        return i, line
+
+    while i < n:
+        ch = content[i]
+
+        if ch == "\n":
+            line += 1
+            i += 1
+            continue
+        if ch.isspace():
+            i += 1
+            continue
+
+        # Comments
+        if ch == "/" and content.startswith("/*", i):
+            end = content.find("*/", i + 2)
+            if end == -1:
+                return unterminated("comment", line)
+            line += content.count("\n", i, end)
+            i = end + 2
+            continue
+        if js and ch == "/" and content.startswith("//", i):
+            end = content.find("\n", i)
+            i = n if end == -1 else end
+            continue
+
+        # JSX tags; the text between them is skipped
+        if jsx and ch == "<" and (in_children or not last_sig or last_sig in _REGEX_PRECEDERS
+                                  or last_sig in _REGEX_KEYWORDS):
+            tag = _JSX_TAG.match(content, i)
+            if tag:
+                line += content.count("\n", i, tag.end())
+                i = tag.end()
+                if tag.group(1):
+                    elements[-1] = max(elements[-1] - 1, 0)
+                elif not tag.group(3):
+                    elements[-1] += 1
+                in_children = elements[-1] > 0
+                if in_children:
+                    i, line = skip_text(i, line)
+                last_sig = "str"
+                continue
+        if in_children and ch == "{":
+            stack.append((ch, line))
+            children.append(len(stack))
+            elements.append(0)
+            in_children = False
+            last_sig = ch
+            i += 1
+            continue
+        in_children = False
+
+        # Strings
+        if ch in "'\"":
+            j, start_line = i + 1, line
+            while j < n and content[j] != ch and content[j] != "\n":
+                j += 2 if content[j] == "\\" else 1
+            if j >= n or content[j] == "\n":
+                if jsx:
+                    # apostrophe in JSX text, not a string
+                    i += 1
+                    continue
+                return unterminated("string", start_line)
+            i = j + 1
+            last_sig = "str"
+            continue
+
+        # Template literals (and resuming after `${ ... }`)
+        if js and (ch == "`" or (ch == "}" and templates and templates[-1] == len(stack))):
+            if ch == "}":
+                templates.pop()
+            start_line = line
+            j = i + 1
+            while j < n:
+                c = content[j]
+                if c == "\\":
+                    j += 2
+                    continue
+                if c == "\n":
+                    line += 1
+                if c == "`":
+                    break
+                if c == "$" and content.startswith("${", j):
+                    break
+                j += 1
+            if j >= n:
+                return unterminated("template literal", start_line)
+            if content[j] == "$":
+                templates.append(len(stack))
+                i = j + 2
+            else:
+                i = j + 1
+            last_sig = "str"
+            continue
+
+        # Regex literals
+        # (`</tag>` in JSX is a closing tag, not a regex)
+        if js and ch == "/" and not (jsx and last_sig == "<") and (
+            not last_sig or last_sig in _REGEX_PRECEDERS or last_sig in _REGEX_KEYWORDS
+        ):
+            j, in_class = i + 1, False
+            while j < n and content[j] != "\n":
+                c = content[j]
+                if c == "\\":
+                    j += 2
+                    continue
+                if c == "[":
+                    in_class = True
+                elif c == "]":
+                    in_class = False
+                elif c == "/" and not in_class:
+                    break
+                j += 1
+            if j < n and content[j] == "/":
+                i = j + 1
+                while i < n and content[i].isalpha():
+                    i += 1
+                last_sig = "regex"
+                continue
+
+        # Brackets
+        if ch in "([{":
+            stack.append((ch, line))
+        elif ch in ")]}":
+            if not stack:
+                return f"unexpected '{ch}' on line {line}"
+            opener, open_line = stack.pop()
+            if opener != _PAIRS[ch]:
+                return f"'{ch}' on line {line} does not match '{opener}' opened on line {open_line}"
+            if children and children[-1] == len(stack) + 1:
+                # end of a child expression: back to the enclosing element's text
+                children.pop()
+                elements.pop()
+                i, line = skip_text(i + 1, line)
+                in_children = True
+                last_sig = "str"
+                continue
+
+        if ch.isalnum() or ch in "_$":
+            j = i
+            while j < n and (content[j].isalnum() or content[j] in "_$"):
+                j += 1
+            last_sig = content[i:j]
+            i = j
+            continue
+
+        last_sig = ch
+        i += 1
+
+    if templates:
+        return "unterminated template expression '${'"
+    if stack:
+        opener, open_line = stack[-1]
+        return f"'{opener}' opened on line {open_line} is never closed"
+    return None
+
+@register_validator(".js", ".mjs", ".cjs", ".jsx", ".ts", ".tsx")
+def validate_js(content: str, filepath: str) -> Optional[str]:
+    # CRA uses JSX in plain .js files too
+    jsx = _extension(filepath) in (".jsx", ".tsx") or bool(re.search(r"</[A-Za-z]|/>", content))
+    error = scan_source(content, js=True, jsx=jsx)
+    return f"JS syntax error: {error}" if error else None
+
+@register_validator(".css", ".scss")
+def validate_css(content: str, filepath: str) -> Optional[str]:
+    error = scan_source(content, js=False)
+    return f"CSS syntax error: {error}" if error else None
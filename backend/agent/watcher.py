@@ -0,0 +1,305 @@
+"""
+Two-way file sync: watches the projects clients have open and pushes
+file_created / file_updated to Socket.IO clients. `emitter` is the app's SocketIO
+in single-process mode, or a write-only SocketIO(message_queue=...) in the
+dedicated watcher process.
+
+Watches are on demand (WatchManager): a project is watched while at least one
+client views it (session registry "watches", shared by every worker) and dropped
+when the last one leaves, so inotify watches and event handling scale with the
+active projects, not with everything under PROJECTS_ROOT. Heavy dirs
+(node_modules, build output, .git...) are never watched: the project root gets a
+non-recursive watch and each other top-level dir a recursive one.
+Project dirs created / deleted / moved also update the in-process project catalog,
+and every file event updates the persistent project store. Paths are mapped back
+to (project, file) by the storage resolver, so flat and sharded layouts both work.
+"""
+
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from file_batch import BATCH_PREFIX, recover_batches
+from lifecycle import SWEEP_INTERVAL_SECONDS, active_projects, archive_cold_projects
+from snapshots import get_snapshot_store
+from dedup import dedupe_changed, pool
+from paths import PROJECTS_ROOT, storage
+from project_index import catalog
+from project_store import IGNORED_DIRS, get_project_store, is_temp_file, record_file_soon, update_store
+from session_store import open_session_registry
+
+HEAVY_DIRS = IGNORED_DIRS | {".venv", ".cache", "coverage", ".parcel-cache", ".turbo"}
+WATCH_SYNC_SECONDS = 1.0
+
+def in_heavy_dir(rel_path: str) -> bool:
+    return any(part in HEAVY_DIRS for part in rel_path.split("/")[:-1])
+
+class FileChangeHandler(FileSystemEventHandler):
+    def __init__(self, emitter):
+        self.emitter = emitter
+        self.last_modified = {}
+        self.manager: Optional["WatchManager"] = None
+
+    def on_any_event(self, event):
+        # nested heavy dirs (e.g. src/node_modules) sit inside a recursive watch - drop their events early
+        _, rel = storage.locate(event.src_path)
+        if rel and in_heavy_dir(rel):
+            return
+
+        if event.is_directory:
+            self._track_project_dir(event)
+            if self.manager is not None:
+                self.manager.on_dir_event(event)
+            return
+
+        self._track_file(event)
+
+        # ignore our atomic temp files
+        if is_temp_file(Path(event.src_path).name):
+            return
+
+        now = time.time()
+        if event.src_path in self.last_modified:
+            if now - self.last_modified[event.src_path] < 0.5:
+                return
+
+        self.last_modified[event.src_path] = now
+
+        if event.event_type in ("modified", "created"):
+            try:
+                time.sleep(0.1)
+
+                # internal dirs (e.g. .scaffold staging) are not projects
+                project_name, file_rel_path = storage.locate(event.src_path)
+                if not project_name or not file_rel_path:
+                    return
+
+                # best-effort text read
+                try:
+                    with open(event.src_path, "r", encoding="utf-8") as f:
+                        content = f.read()
+                except UnicodeDecodeError:
+                    return  # skip binary
+
+                payload = {
+                    "id": str(uuid.uuid4()),
+                    "project": project_name,
+                    "name": file_rel_path,   # << correct variable
+                    "content": content
+                }
+
+                if event.event_type == "created":
+                    self.emitter.emit("file_created", payload)
+                else:
+                    self.emitter.emit("file_updated", payload)
+
+            except Exception as e:
+                print(f"❌ Watcher error: {e}")
+
+    def _track_file(self, event):
+        """Keep the project store's file metadata current (also covers atomic temp-file renames)"""
+        def split(path):
+            project, rel = storage.locate(path)
+            return (project, rel) if project and rel else (None, None)
+
+        try:
+            project, rel = split(event.src_path)
+            if event.event_type in ("modified", "created") and project:
+                record_file_soon(project, rel)
+            elif event.event_type == "deleted" and project:
+                update_store("remove_file", project, rel)
+            elif event.event_type == "moved" and Path(event.src_path).name.startswith(BATCH_PREFIX):
+                return  # a FileBatch commit - it recorded its files in one transaction
+            elif event.event_type == "moved":
+                dest_project, dest_rel = split(getattr(event, "dest_path", None))
+                if project:
+                    update_store("remove_file", project, rel)  # a no-op for the .tmp_ of an atomic save
+                if dest_project:
+                    record_file_soon(dest_project, dest_rel)
+        except Exception as e:
+            print(f"⚠️ Watcher store update failed: {e}")
+
+    def _track_project_dir(self, event):
+        """Keep the project catalog current for top-level project dirs"""
+        def top_level(path):
+            project, rel = storage.locate(path)
+            return project if project and not rel else None
+
+        name = top_level(event.src_path)
+        if event.event_type == "created" and name:
+            catalog.add(name)
+        elif event.event_type == "deleted" and name:
+            catalog.remove(name)
+            update_store("delete_project", name)
+        elif event.event_type == "moved":
+            dest = top_level(getattr(event, "dest_path", None))
+            if name:
+                catalog.remove(name)
+                update_store("delete_project", name)
+            if dest:
+                catalog.add(dest)
+                update_store("scan_project", dest)
+
+class WatchManager:
+    """Refcounted per-project watches on one observer; thread-safe"""
+
+    def __init__(self, observer, handler: FileChangeHandler):
+        self.observer = observer
+        self.handler = handler
+        handler.manager = self
+        self._lock = threading.RLock()
+        self._refs: Dict[str, int] = {}
+        self._watches: Dict[str, Dict[str, object]] = {}  # project -> {top-level dir or "": ObservedWatch}
+
+    # ---------- refcounts ----------
+
+    def acquire(self, project: str):
+        """A client opened `project`; the first one attaches the watch"""
+        with self._lock:
+            self._refs[project] = self._refs.get(project, 0) + 1
+            if project not in self._watches:
+                self._attach(project)
+
+    def release(self, project: str):
+        """A client left `project`; the last one detaches the watch"""
+        with self._lock:
+            count = self._refs.get(project, 0) - 1
+            if count > 0:
+                self._refs[project] = count
+                return
+            self._refs.pop(project, None)
+            self._detach(project)
+
+    def sync(self, wanted: Dict[str, int]):
+        """Match the refcounts to `wanted` (project -> clients), e.g. from the session registry"""
+        with self._lock:
+            for project in list(self._refs):
+                if project not in wanted:
+                    self._refs.pop(project)
+                    self._detach(project)
+            for project, count in wanted.items():
+                self._refs[project] = count
+            # retry projects whose dir did not exist yet, drop watches on dirs that are gone
+            for project in self._refs:
+                attached = project in self._watches
+                exists = storage.path_for(project).is_dir()
+                if attached and not exists:
+                    self._detach(project)
+                elif not attached and exists:
+                    self._attach(project)
+
+    def watched(self) -> List[str]:
+        with self._lock:
+            return sorted(self._watches)
+
+    # ---------- watches ----------
+
+    def _schedule(self, path: Path, recursive: bool):
+        try:
+            return self.observer.schedule(self.handler, str(path), recursive=recursive)
+        except OSError as e:  # dir vanished / inotify limit
+            print(f"⚠️ Cannot watch {path}: {e}")
+            return None
+
+    def _unschedule(self, watch):
+        try:
+            self.observer.unschedule(watch)
+        except (KeyError, OSError):
+            pass  # emitter already gone with its dir
+
+    def _attach(self, project: str):
+        project_path = storage.path_for(project)
+        if not project_path.is_dir():
+            return  # not created yet - sync() retries
+        try:
+            recover_batches(project)  # finish a batch write cut short by a crash
+        except OSError as e:
+            print(f"⚠️ Batch recovery failed for {project}: {e}")
+        root = self._schedule(project_path, recursive=False)
+        if root is None:
+            return
+        watches = {"": root}
+        with os.scandir(project_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.name not in HEAVY_DIRS:
+                    watch = self._schedule(Path(entry.path), recursive=True)
+                    if watch is not None:
+                        watches[entry.name] = watch
+        self._watches[project] = watches
+        print(f"👀 Watching {project} ({len(watches)} watches)")
+
+    def _detach(self, project: str):
+        for watch in self._watches.pop(project, {}).values():
+            self._unschedule(watch)
+
+    def on_dir_event(self, event):
+        """Top-level dirs created / removed inside a watched project get their own watch"""
+        def top_level_dir(path):
+            project, rel = storage.locate(path)
+            if project and rel and "/" not in rel and rel not in HEAVY_DIRS:
+                return project, rel
+            return None, None
+
+        with self._lock:
+            if event.event_type in ("deleted", "moved"):
+                project, name = top_level_dir(event.src_path)
+                watch = self._watches.get(project, {}).pop(name, None) if project else None
+                if watch is not None:
+                    self._unschedule(watch)
+            if event.event_type in ("created", "moved"):
+                path = event.src_path if event.event_type == "created" else getattr(event, "dest_path", None)
+                project, name = top_level_dir(path)
+                watches = self._watches.get(project) if project else None
+                if watches is not None and name not in watches:
+                    watch = self._schedule(Path(path), recursive=True)
+                    if watch is not None:
+                        watches[name] = watch
+
+def watch_projects(emitter, registry=None):
+    """Blocking: watch the projects clients have open until interrupted"""
+    PROJECTS_ROOT.mkdir(parents=True, exist_ok=True)
+    try:
+        print(f"🗂️ Project store reconciled: {get_project_store().reconcile()}")
+    except Exception as e:
+        print(f"⚠️ Project store reconcile failed: {e}")
+    registry = registry or open_session_registry()
+    observer = Observer()
+    manager = WatchManager(observer, FileChangeHandler(emitter))
+    observer.start()
+    print(f"👀 Watching open projects under: {PROJECTS_ROOT}")
+    next_sweep = time.time() + SWEEP_INTERVAL_SECONDS / 60  # first sweep shortly after startup
+    last_sweep = time.time() - SWEEP_INTERVAL_SECONDS  # the first dedup pass covers the previous hour
+
+    try:
+        while True:
+            try:
+                manager.sync(registry.watched_projects())
+            except Exception as e:
+                print(f"⚠️ Watch sync failed: {e}")
+            if time.time() >= next_sweep:
+                # this process runs once per deployment - the natural home for the archive sweep
+                sweep_started = time.time()
+                next_sweep = sweep_started + SWEEP_INTERVAL_SECONDS
+                try:
+                    archive_cold_projects(registry)
+                except Exception as e:
+                    print(f"⚠️ Archive sweep failed: {e}")
+                try:
+                    dedupe_changed(last_sweep, active=active_projects(registry))
+                except Exception as e:
+                    print(f"⚠️ Dedup sweep failed: {e}")
+                last_sweep = sweep_started
+                try:
+                    pool.collect_garbage(keep=get_snapshot_store().live_blobs())
+                except Exception as e:
+                    print(f"⚠️ Blob cleanup failed: {e}")
+            time.sleep(WATCH_SYNC_SECONDS)
+    except KeyboardInterrupt:
+        observer.stop()
+    observer.join()
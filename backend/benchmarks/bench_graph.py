@@ -0,0 +1,244 @@
+"""
+Offline benchmark for the LangGraph agent (graph.py)
+
+Swaps llm_heavy / llm_fast for deterministic StubLLMs and the npx/npm scaffold
+for a fake one, then replays a prompt corpus through agent.invoke from N
+concurrent sessions. Reports p50/p95 end-to-end latency, per-node time,
+allocations and throughput. No network, no Groq key, no npm needed.
+
+Usage (from backend/):
+    python benchmarks/bench_graph.py --sessions 4 --repeat 2
+    python benchmarks/bench_graph.py --json out.json
+    python benchmarks/bench_graph.py --baseline baseline.json --max-regression 0.25   # CI gate
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+AGENT_DIR = BENCH_DIR.parent / "agent"
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(values) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2) if values else 0.0,
+        "total_s": round(sum(values), 3),
+    }
+
+def load_offline_graph(args):
+    """Import graph.py against stubs inside a throwaway PROJECTS_ROOT"""
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    os.environ["DEVDOST_TRACING"] = "0"
+    os.chdir(args.workdir)  # tools.PROJECTS_ROOT is cwd/generated_projects
+
+    for path in (str(AGENT_DIR), str(BENCH_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    from stub_llm import StubLLM, install_fake_scaffold
+    import graph
+
+    graph.llm_heavy = StubLLM("stub-heavy", latency=args.heavy_latency,
+                              tokens_per_second=args.heavy_tps, code_lines=args.code_lines)
+    graph.llm_fast = StubLLM("stub-fast", latency=args.fast_latency,
+                             tokens_per_second=args.fast_tps, code_lines=args.code_lines)
+    install_fake_scaffold(args.scaffold_delay)
+    return graph
+
+CARRIED_KEYS = ("chat_history", "current_project")
+# node spans every full benchmark run must contain - without them it measured nothing
+REQUIRED_SPANS = ("node.coder", "node.verify")
+
+def run_session(agent, prompts, results, lock):
+    """One chat session: prompts in order; like the app, only history and project carry over"""
+    carried = {"chat_history": [], "current_project": None}
+    for prompt in prompts:
+        state = dict(carried, user_prompt=prompt)
+        started = time.perf_counter()
+        try:
+            result = agent.invoke(state, config={"recursion_limit": 100})
+            carried = {key: result.get(key, carried[key]) for key in CARRIED_KEYS}
+            ok = True
+        except Exception as e:
+            result, ok = {}, False
+            print(f"❌ Benchmark invoke failed: {e}", file=sys.__stderr__)
+        elapsed = time.perf_counter() - started
+        with lock:
+            results.append({"prompt": prompt, "intent": result.get("intent"), "seconds": elapsed, "ok": ok})
+
+def run_benchmark(args) -> dict:
+    graph = load_offline_graph(args)
+    import telemetry
+
+    corpus = json.loads(Path(args.corpus).read_text(encoding="utf-8"))
+    prompts = corpus * args.repeat
+
+    span_times = defaultdict(list)
+    span_lock = threading.Lock()
+
+    def collect(span):
+        if span.kind in ("node", "llm", "tool", "run"):
+            with span_lock:
+                span_times[span.name].append(span.duration)
+
+    telemetry.add_span_listener(collect)
+
+    results, lock = [], threading.Lock()
+    output = sys.stdout if args.verbose else open(os.devnull, "w")
+
+    if args.trace_alloc:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            futures = [pool.submit(run_session, graph.agent, prompts, results, lock) for _ in range(args.sessions)]
+            for future in futures:
+                future.result()
+    wall = time.perf_counter() - started
+
+    allocations = None
+    if args.trace_alloc:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        allocations = {"current_mb": round(current / 2**20, 2), "peak_mb": round(peak / 2**20, 2)}
+
+    telemetry.remove_span_listener(collect)
+
+    by_intent = defaultdict(list)
+    for r in results:
+        by_intent[r["intent"] or "ERROR"].append(r["seconds"])
+
+    return {
+        "config": {
+            "sessions": args.sessions,
+            "repeat": args.repeat,
+            "corpus_size": len(corpus),
+            "heavy_latency": args.heavy_latency,
+            "fast_latency": args.fast_latency,
+            "heavy_tps": args.heavy_tps,
+            "fast_tps": args.fast_tps,
+            "scaffold_delay": args.scaffold_delay,
+        },
+        "end_to_end": summarize([r["seconds"] for r in results]),
+        "by_intent": {k: summarize(v) for k, v in sorted(by_intent.items())},
+        "spans": {k: summarize(v) for k, v in sorted(span_times.items())},
+        "failures": sum(1 for r in results if not r["ok"]),
+        "throughput_rps": round(len(results) / wall, 3) if wall else 0.0,
+        "wall_s": round(wall, 3),
+        "allocations": allocations,
+    }
+
+def print_report(report: dict):
+    e2e = report["end_to_end"]
+    print(f"\n{'=' * 60}")
+    print(f"📊 Agent benchmark ({report['config']['sessions']} sessions, {e2e['count']} invocations)")
+    print(f"{'=' * 60}")
+    print(f"End-to-end: p50 {e2e['p50_ms']}ms | p95 {e2e['p95_ms']}ms | max {e2e['max_ms']}ms")
+    print(f"Throughput: {report['throughput_rps']} req/s (wall {report['wall_s']}s), failures: {report['failures']}")
+    if report["allocations"]:
+        print(f"Memory: peak {report['allocations']['peak_mb']}MB, retained {report['allocations']['current_mb']}MB")
+
+    print("\nBy intent:")
+    for intent, stats in report["by_intent"].items():
+        print(f"  {intent:<16} n={stats['count']:<4} p50 {stats['p50_ms']:>9}ms  p95 {stats['p95_ms']:>9}ms")
+
+    print("\nBy span:")
+    for name, stats in report["spans"].items():
+        print(f"  {name:<28} n={stats['count']:<4} p50 {stats['p50_ms']:>9}ms  p95 {stats['p95_ms']:>9}ms  total {stats['total_s']}s")
+
+def check_regression(report: dict, baseline_path: str, max_regression: float) -> list:
+    """Compare against a saved report; returns human-readable failures"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    failures = []
+
+    for key in ("p50_ms", "p95_ms"):
+        old, new = baseline["end_to_end"][key], report["end_to_end"][key]
+        if old and new > old * (1 + max_regression):
+            failures.append(f"end_to_end.{key}: {old}ms → {new}ms")
+
+    old_rps, new_rps = baseline.get("throughput_rps", 0), report["throughput_rps"]
+    if old_rps and new_rps < old_rps * (1 - max_regression):
+        failures.append(f"throughput_rps: {old_rps} → {new_rps}")
+
+    if report["failures"] > baseline.get("failures", 0):
+        failures.append(f"failures: {baseline.get('failures', 0)} → {report['failures']}")
+
+    return failures
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark for the DevDost agent graph")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "corpus.json"))
+    parser.add_argument("--sessions", type=int, default=1, help="concurrent chat sessions")
+    parser.add_argument("--repeat", type=int, default=1, help="times each session replays the corpus")
+    parser.add_argument("--heavy-latency", type=float, default=0.05, help="heavy model base latency (s)")
+    parser.add_argument("--fast-latency", type=float, default=0.01, help="fast model base latency (s)")
+    parser.add_argument("--heavy-tps", type=float, default=2000.0, help="heavy model tokens/s")
+    parser.add_argument("--fast-tps", type=float, default=8000.0, help="fast model tokens/s")
+    parser.add_argument("--code-lines", type=int, default=40, help="lines per generated file")
+    parser.add_argument("--scaffold-delay", type=float, default=0.2, help="fake scaffold duration (s)")
+    parser.add_argument("--trace-alloc", action="store_true", help="track allocations with tracemalloc")
+    parser.add_argument("--workdir", default=None, help="where generated_projects is created (temp dir by default)")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--verbose", action="store_true", help="keep agent print() output")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    cwd = os.getcwd()
+    # run_benchmark chdirs into the workdir - pin user paths first
+    for attr in ("corpus", "json", "baseline"):
+        if getattr(args, attr):
+            setattr(args, attr, os.path.abspath(getattr(args, attr)))
+
+    with tempfile.TemporaryDirectory(prefix="devdost-bench-") as tmp:
+        args.workdir = args.workdir or tmp
+        report = run_benchmark(args)
+        os.chdir(cwd)
+
+    print_report(report)
+
+    missing = [name for name in REQUIRED_SPANS if name not in report["spans"]]
+    if missing:
+        print(f"\n❌ Corpus never reached {', '.join(missing)} - the benchmark did not measure code generation")
+        return 1
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n💾 Report saved: {args.json}")
+
+    if args.baseline:
+        failures = check_regression(report, args.baseline, args.max_regression)
+        if failures:
+            print("\n❌ Performance regression:")
+            for failure in failures:
+                print(f"  • {failure}")
+            return 1
+        print("\n✅ No regression against baseline")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Import-time budget check for the backend entry points
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+target (inside a throwaway cwd, so nothing is created in the repo), takes the
+median over --runs, and compares the target's cumulative import time against a
+budget. Also reports the slowest modules pulled in, so a new eager import shows
+up by name.
+
+Usage (from backend/):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget app=600 --budget graph=900 --top 15
+    python benchmarks/bench_startup.py --json startup.json      # exit 1 if over budget
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+AGENT_DIR = BENCH_DIR.parent / "agent"
+
+# module -> budget in ms (cumulative import time of that module)
+DEFAULT_BUDGETS = {
+    "app": 800,       # web worker cold start
+    "graph": 1000,    # CLI (python graph.py) before the first prompt
+}
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def parse_importtime(stderr: str) -> dict:
+    """module -> (self_us, cumulative_us) from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(AGENT_DIR), env.get("PYTHONPATH")]))
+    env.setdefault("GROQ_API_KEY", "offline-benchmark")
+    env["DEVDOST_TRACING"] = "0"
+    return env
+
+def measure_import(module: str, cwd: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+def measure_agent_build(cwd: str) -> float:
+    """Seconds for graph.get_agent() after import - the part deferred to first use"""
+    code = (
+        "import time, graph\n"
+        "started = time.perf_counter()\n"
+        "graph.get_agent()\n"
+        "print(time.perf_counter() - started)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=child_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"agent build failed:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+def run(args) -> dict:
+    report = {"targets": {}, "agent_build_ms": None}
+    with tempfile.TemporaryDirectory(prefix="devdost-startup-") as cwd:
+        # one unmeasured run per target so .pyc compilation doesn't count
+        for module in args.budgets:
+            measure_import(module, cwd)
+
+        for module, budget in args.budgets.items():
+            samples = [measure_import(module, cwd) for _ in range(args.runs)]
+            totals = [s.get(module, (0, 0))[1] / 1000 for s in samples]
+            last = samples[-1]
+            slowest = sorted(last.items(), key=lambda kv: kv[1][0], reverse=True)[:args.top]
+            report["targets"][module] = {
+                "median_ms": round(statistics.median(totals), 1),
+                "budget_ms": budget,
+                "ok": statistics.median(totals) <= budget,
+                "modules_imported": len(last),
+                "slowest_self_ms": {name: round(t[0] / 1000, 1) for name, t in slowest},
+            }
+
+        if args.agent_build:
+            report["agent_build_ms"] = round(measure_agent_build(cwd) * 1000, 1)
+
+    return report
+
+def print_report(report: dict):
+    print(f"\n{'=' * 60}")
+    print("⏱️ Backend import-time budgets")
+    print(f"{'=' * 60}")
+    for module, stats in report["targets"].items():
+        mark = "✅" if stats["ok"] else "❌"
+        print(f"{mark} import {module:<10} {stats['median_ms']:>8}ms  (budget {stats['budget_ms']}ms, "
+              f"{stats['modules_imported']} modules)")
+        for name, ms in stats["slowest_self_ms"].items():
+            print(f"     {name:<48} {ms:>8}ms")
+    if report["agent_build_ms"] is not None:
+        print(f"\nℹ️ First get_agent() (deferred to first request): {report['agent_build_ms']}ms")
+
+def parse_budget(value: str):
+    module, _, ms = value.partition("=")
+    if not module or not ms:
+        raise argparse.ArgumentTypeError("use MODULE=MS, e.g. app=800")
+    return module, float(ms)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time budgets for the DevDost backend")
+    parser.add_argument("--budget", action="append", type=parse_budget, default=[],
+                        help="MODULE=MS (repeatable); defaults: " +
+                             ", ".join(f"{k}={v}" for k, v in DEFAULT_BUDGETS.items()))
+    parser.add_argument("--runs", type=int, default=3, help="measured runs per target (median)")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list per target")
+    parser.add_argument("--no-agent-build", dest="agent_build", action="store_false")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+    args.budgets = dict(args.budget) if args.budget else dict(DEFAULT_BUDGETS)
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run(args)
+    print_report(report)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n💾 Report saved: {args.json}")
+
+    over = [m for m, s in report["targets"].items() if not s["ok"]]
+    if over:
+        print(f"\n❌ Over budget: {', '.join(over)}")
+        return 1
+    print("\n✅ All imports within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
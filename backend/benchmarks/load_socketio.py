@@ -0,0 +1,365 @@
+"""
+Load test for the Flask-SocketIO backend (agent/app.py)
+
+Starts the real server with a stub agent (stub_server.py) in a throwaway
+PROJECTS_ROOT, then connects N python-socketio clients:
+- typists open a project (/get_files) and send `update_file` at typing speed
+- everyone else just watches, like extra browser tabs
+- a disk writer touches project files so the watchdog broadcasts fire
+- one chat client sends `chat_message` to the stub agent
+
+Every file payload carries a `// bench <origin> <seq> <sent_at>` header so each
+receiver can time delivery. Reports latency distributions, fan-out (deliveries
+per update, echoes back to the sender) and server RSS growth.
+
+Usage (from backend/):
+    python benchmarks/load_socketio.py --clients 200 --typists 40 --duration 30
+    python benchmarks/load_socketio.py --url http://localhost:5000 --projects 0   # existing server
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import psutil
+import socketio
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_graph import summarize
+
+MARKER = re.compile(r"^// bench (\S+) (\d+) ([\d.]+)")
+
+class Recorder:
+    """Thread-safe sink for everything the clients observe"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)       # metric -> [seconds]
+        self.counts = defaultdict(int)         # event name -> deliveries
+        self.deliveries = defaultdict(list)    # (origin, seq) -> [latency]
+        self.echoes = 0
+
+    def count(self, event: str):
+        with self.lock:
+            self.counts[event] += 1
+
+    def sample(self, metric: str, seconds: float):
+        with self.lock:
+            self.samples[metric].append(seconds)
+
+    def received(self, client_id: str, event: str, payload):
+        now = time.time()
+        with self.lock:
+            self.counts[event] += 1
+        if not isinstance(payload, dict):
+            return
+        match = MARKER.match(payload.get("content") or "")
+        if not match:
+            return
+        origin, seq, sent_at = match.group(1), int(match.group(2)), float(match.group(3))
+        latency = now - sent_at
+        metric = "watcher_broadcast" if origin.startswith("disk") else "update_fanout"
+        with self.lock:
+            self.samples[metric].append(latency)
+            self.deliveries[(origin, seq)].append(latency)
+            if origin == client_id:
+                self.echoes += 1
+
+class RssSampler(threading.Thread):
+    """Polls the server's resident memory once per interval"""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def rss_mb(self) -> float:
+        return self.process.memory_info().rss / 2**20
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.samples.append((time.time(), self.rss_mb()))
+            except psutil.Error:
+                return
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+def http_get(url: str, timeout: float = 10.0):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+def wait_for_server(url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            http_get(f"{url}/test", timeout=2)
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout}s")
+
+def start_server(args, workdir: str):
+    command = [
+        sys.executable, str(BENCH_DIR / "stub_server.py"),
+        "--port", str(args.port),
+        "--projects", str(args.projects),
+        "--workdir", workdir,
+        "--progress-events", str(args.progress_events),
+    ]
+    log = open(Path(workdir) / "server.log", "w")
+    return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+
+def make_client(client_id: str, recorder: Recorder):
+    client = socketio.Client(reconnection=False)
+    for event in ("file_updated", "file_created"):
+        client.on(event, lambda payload, event=event: recorder.received(client_id, event, payload))
+    for event in ("ai_progress", "chat_response", "agent_started", "chat_name_generated"):
+        client.on(event, lambda payload=None, event=event: recorder.received(client_id, event, payload))
+    return client
+
+def connect_client(url: str, client_id: str, recorder: Recorder, transports):
+    client = make_client(client_id, recorder)
+    started = time.perf_counter()
+    client.connect(url, transports=transports, wait_timeout=10)
+    recorder.sample("connect", time.perf_counter() - started)
+    return client
+
+def open_project(url: str, project: str, recorder: Recorder):
+    started = time.perf_counter()
+    http_get(f"{url}/get_files?{urllib.parse.urlencode({'project': project})}")
+    recorder.sample("open_project", time.perf_counter() - started)
+
+def typist(client, client_id: str, project: str, args, recorder: Recorder, stop: threading.Event):
+    """Open a project, then type into one file at args.typing_rate keystrokes/s"""
+    open_project(args.url, project, recorder)
+    name = f"bench/{client_id}.js"
+    body = ""
+    interval = 1.0 / args.typing_rate
+    seq = 0
+    # spread first keystrokes so clients don't fire in lockstep
+    stop.wait(random.random() * interval)
+    while not stop.is_set():
+        seq += 1
+        body += random.choice("abcdefghij;\n ")
+        content = f"// bench {client_id} {seq} {time.time():.6f}\n{body[-args.file_size:]}"
+        started = time.perf_counter()
+        try:
+            client.emit("update_file", {"project": project, "name": name, "content": content})
+        except Exception:
+            recorder.count("emit_errors")
+            return
+        recorder.sample("emit", time.perf_counter() - started)
+        stop.wait(interval)
+
+def disk_writer(projects_root: Path, projects, args, stop: threading.Event):
+    """Write files straight to disk, like the agent does, to drive watcher broadcasts"""
+    seq = 0
+    interval = 1.0 / args.watcher_rate
+    while not stop.is_set():
+        seq += 1
+        project = projects[seq % len(projects)]
+        path = projects_root / project / "bench" / f"disk-{seq % 10}.js"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"// bench disk {seq} {time.time():.6f}\nconsole.log({seq});\n", encoding="utf-8")
+        stop.wait(interval)
+
+def chatter(url: str, args, recorder: Recorder, stop: threading.Event):
+    """One client round-tripping chat messages through the stub agent"""
+    client = make_client("chat", recorder)
+    done = threading.Event()
+    client.on("chat_response", lambda payload: done.set())
+    client.connect(url, transports=args.transports, wait_timeout=10)
+    try:
+        while not stop.is_set():
+            done.clear()
+            started = time.perf_counter()
+            client.emit("chat_message", {"message": "hello", "session_id": "load-chat"})
+            if done.wait(30):
+                recorder.sample("chat_round_trip", time.perf_counter() - started)
+            stop.wait(1.0 / args.chat_rate)
+    finally:
+        client.disconnect()
+
+def run_load(args, projects_root: Path, server_pid) -> dict:
+    recorder = Recorder()
+    projects = [f"load-project-{i}" for i in range(max(args.projects, 1))]
+    sampler = RssSampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+    rss_idle = sampler.rss_mb() if sampler else None
+
+    with ThreadPoolExecutor(max_workers=args.connect_concurrency) as pool:
+        futures = [pool.submit(connect_client, args.url, f"c{i}", recorder, args.transports)
+                   for i in range(args.clients)]
+        clients = []
+        for future in futures:
+            try:
+                clients.append(future.result())
+            except Exception as e:
+                recorder.count("connect_errors")
+                print(f"⚠️ Connect failed: {e}")
+    rss_connected = sampler.rss_mb() if sampler else None
+
+    stop = threading.Event()
+    workers = []
+    for i, client in enumerate(clients[:args.typists]):
+        client_id = f"c{i}"
+        workers.append(threading.Thread(
+            target=typist, args=(client, client_id, projects[i % len(projects)], args, recorder, stop), daemon=True))
+    if args.watcher_rate > 0 and projects_root is not None:
+        workers.append(threading.Thread(target=disk_writer, args=(projects_root, projects, args, stop), daemon=True))
+    if args.chat_rate > 0:
+        workers.append(threading.Thread(target=chatter, args=(args.url, args, recorder, stop), daemon=True))
+
+    started = time.time()
+    for worker in workers:
+        worker.start()
+    stop.wait(args.duration)
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=5)
+    time.sleep(args.drain)  # let in-flight broadcasts land
+    wall = time.time() - started
+
+    rss_end = sampler.rss_mb() if sampler else None
+    if sampler:
+        sampler.stop()
+    for client in clients:
+        try:
+            client.disconnect()
+        except Exception:
+            pass
+
+    fanout = [len(v) for k, v in recorder.deliveries.items() if not k[0].startswith("disk")]
+    last_delivery = [max(v) for k, v in recorder.deliveries.items() if not k[0].startswith("disk")]
+    sent_updates = len(recorder.samples["emit"])
+
+    return {
+        "config": {
+            "clients": args.clients,
+            "connected": len(clients),
+            "typists": min(args.typists, len(clients)),
+            "typing_rate": args.typing_rate,
+            "watcher_rate": args.watcher_rate,
+            "chat_rate": args.chat_rate,
+            "duration_s": args.duration,
+            "transports": args.transports,
+        },
+        "latency": {metric: summarize(values) for metric, values in sorted(recorder.samples.items())},
+        "fanout": {
+            "updates_sent": sent_updates,
+            "updates_seen": len(fanout),
+            "deliveries_per_update": round(sum(fanout) / len(fanout), 2) if fanout else 0.0,
+            "expected_per_update": max(len(clients) - 1, 0),
+            "echoes_to_sender": recorder.echoes,
+            "time_to_last_recipient": summarize(last_delivery),
+        },
+        "events_received": dict(sorted(recorder.counts.items())),
+        "events_per_s": round(sum(recorder.counts.values()) / wall, 1) if wall else 0.0,
+        "memory_mb": {
+            "idle": round(rss_idle, 1) if rss_idle else None,
+            "connected": round(rss_connected, 1) if rss_connected else None,
+            "end": round(rss_end, 1) if rss_end else None,
+            "peak": round(max(s[1] for s in sampler.samples), 1) if sampler and sampler.samples else None,
+            "per_client_kb": round((rss_connected - rss_idle) * 1024 / len(clients), 1)
+                             if sampler and clients else None,
+        },
+        "wall_s": round(wall, 2),
+    }
+
+def print_report(report: dict):
+    config, fanout, memory = report["config"], report["fanout"], report["memory_mb"]
+    print(f"\n{'=' * 60}")
+    print(f"📡 Socket.IO load ({config['connected']}/{config['clients']} clients, "
+          f"{config['typists']} typing at {config['typing_rate']}/s, {config['duration_s']}s)")
+    print(f"{'=' * 60}")
+
+    print("Latency:")
+    for metric, stats in report["latency"].items():
+        print(f"  {metric:<20} n={stats['count']:<7} p50 {stats['p50_ms']:>9}ms  "
+              f"p95 {stats['p95_ms']:>9}ms  max {stats['max_ms']:>9}ms")
+
+    last = fanout["time_to_last_recipient"]
+    print("\nFan-out:")
+    print(f"  updates sent/seen:      {fanout['updates_sent']} / {fanout['updates_seen']}")
+    print(f"  deliveries per update:  {fanout['deliveries_per_update']} (direct broadcast alone: {fanout['expected_per_update']})")
+    print(f"  echoes to sender:       {fanout['echoes_to_sender']} (watcher re-broadcasting editor saves)")
+    print(f"  time to last recipient: p50 {last['p50_ms']}ms | p95 {last['p95_ms']}ms")
+    print(f"  events received:        {report['events_per_s']}/s {report['events_received']}")
+
+    if memory["idle"] is not None:
+        print("\nServer memory (RSS):")
+        print(f"  idle {memory['idle']}MB → connected {memory['connected']}MB → end {memory['end']}MB "
+              f"(peak {memory['peak']}MB, ~{memory['per_client_kb']}KB/client)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Socket.IO load test for the DevDost backend")
+    parser.add_argument("--url", help="use an already running server instead of starting stub_server.py")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--clients", type=int, default=100, help="connected socket clients")
+    parser.add_argument("--typists", type=int, default=20, help="clients sending update_file")
+    parser.add_argument("--typing-rate", type=float, default=5.0, help="update_file events/s per typist")
+    parser.add_argument("--file-size", type=int, default=2000, help="max characters per edited file")
+    parser.add_argument("--watcher-rate", type=float, default=2.0, help="direct disk writes/s (0 to disable)")
+    parser.add_argument("--chat-rate", type=float, default=0.5, help="chat messages/s (0 to disable)")
+    parser.add_argument("--progress-events", type=int, default=5, help="ai_progress events per stub agent run")
+    parser.add_argument("--projects", type=int, default=20, help="seeded projects")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--drain", type=float, default=2.0, help="seconds to wait for late deliveries")
+    parser.add_argument("--connect-concurrency", type=int, default=20)
+    parser.add_argument("--transport", choices=("websocket", "polling"), default="websocket")
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args(argv)
+    args.transports = [args.transport]
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    with tempfile.TemporaryDirectory(prefix="devdost-load-") as workdir:
+        server = None
+        projects_root = None
+        if not args.url:
+            args.url = f"http://127.0.0.1:{args.port}"
+            server = start_server(args, workdir)
+            projects_root = Path(workdir) / "generated_projects"
+        try:
+            wait_for_server(args.url)
+            report = run_load(args, projects_root, server.pid if server else None)
+        finally:
+            if server:
+                server.terminate()
+                try:
+                    server.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    server.kill()
+
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n💾 Report saved: {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
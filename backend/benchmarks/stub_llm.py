@@ -0,0 +1,191 @@
+"""
+Deterministic offline stand-ins for ChatGroq and the project scaffold
+Latency = base latency + completion tokens / token rate, so benchmark numbers
+track prompt/response sizes without any network access.
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+_name_counter = itertools.count(1)
+_name_lock = threading.Lock()
+
+def _flatten(payload) -> str:
+    """str | list[dict] | list[BaseMessage] -> plain text"""
+    if isinstance(payload, str):
+        return payload
+    parts = []
+    for item in payload:
+        if isinstance(item, dict):
+            parts.append(str(item.get("content", "")))
+        elif isinstance(item, tuple):
+            parts.append(str(item[-1]))
+        else:
+            parts.append(str(getattr(item, "content", item)))
+    return "\n".join(parts)
+
+def _techstack_for(text: str) -> str:
+    text = text.lower()
+    if re.search(r"\bnext\.?js\b", text):
+        return "Next.js"
+    if "react" in text:
+        return "React"
+    if "express" in text or re.search(r"\bnode\b", text):
+        return "Node.js/Express"
+    return "HTML/CSS/JS"
+
+FILES_BY_STACK = {
+    "React": ["src/App.js", "src/index.js", "src/App.css"],
+    "Next.js": ["app/page.js", "app/layout.js"],
+    "Node.js/Express": ["src/index.js", "src/routes.js"],
+    "HTML/CSS/JS": ["index.html", "style.css", "script.js"],
+}
+
+def stub_code(filepath: str, lines: int) -> str:
+    """Syntactically valid content for a file type, `lines` lines long"""
+    ext = filepath.rsplit(".", 1)[-1].lower() if "." in filepath else ""
+    filler = max(lines - 4, 1)
+    if ext == "html":
+        body = "\n".join(f"    <p>Item {i}</p>" for i in range(filler))
+        return f"<!DOCTYPE html>\n<html>\n<head><title>Stub</title></head>\n<body>\n{body}\n</body>\n</html>\n"
+    if ext in ("css", "scss"):
+        return "\n".join(f".item-{i} {{ margin: {i}px; }}" for i in range(filler)) + "\n"
+    if ext in ("js", "jsx", "ts", "tsx", "mjs"):
+        if filepath.startswith(("src/App", "app/")):
+            items = "\n".join(f"      <li key=\"{i}\">Item {i}</li>" for i in range(filler))
+            return f"import React from 'react';\n\nexport default function App() {{\n  return (\n    <ul>\n{items}\n    </ul>\n  );\n}}\n"
+        return "\n".join(f"const value{i} = {i} * 2; // stub" for i in range(filler)) + "\nconsole.log('ready');\n"
+    if ext == "json":
+        return json.dumps({f"key{i}": i for i in range(filler)}, indent=2) + "\n"
+    if ext == "py":
+        return "\n".join(f"VALUE_{i} = {i}" for i in range(filler)) + "\n"
+    return "\n".join(f"line {i}" for i in range(filler)) + "\n"
+
+INTENT_RULES = [
+    ("PROJECT_LIST", r"\bprojects\b"),
+    ("RUN_PROJECT", r"\b(run|chala\w*)\b"),
+    ("PROJECT_SWITCH", r"\b(switch|open|kholo)\b"),
+    ("NEW_PROJECT", r"\b(create|build|make|new|naya|banao|bana)\b"),
+]
+
+def stub_intent(text: str) -> str:
+    """Keyword intent for the classifier prompt's user input (anything else is CHAT)"""
+    match = re.search(r'User input: "(.*)"', text)
+    request = (match.group(1) if match else text).lower()
+    for intent, pattern in INTENT_RULES:
+        if re.search(pattern, request):
+            return intent
+    return "CHAT"
+
+class StubLLM:
+    """Drop-in replacement for ChatGroq: invoke() and with_structured_output()"""
+
+    def __init__(self, model_name: str = "stub-model", latency: float = 0.05,
+                 tokens_per_second: float = 500.0, code_lines: int = 40):
+        self.model_name = model_name
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.code_lines = code_lines
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, text: str, completion: str):
+        prompt_tokens = max(len(text) // 4, 1)
+        completion_tokens = max(len(completion) // 4, 1)
+        delay = self.latency + (completion_tokens / self.tokens_per_second if self.tokens_per_second else 0)
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.calls += 1
+        return SimpleNamespace(
+            content=completion,
+            usage_metadata={"input_tokens": prompt_tokens, "output_tokens": completion_tokens},
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _text_reply(self, text: str) -> str:
+        if "intent classifier" in text:
+            return stub_intent(text)
+        if "project name" in text.lower() and "Return ONLY the name" in text:
+            return "stub-project"
+        if "title for this chat" in text:
+            return "Stub Chat Title"
+        match = re.search(r"^File: (.+)$", text, re.MULTILINE)
+        if match:
+            filepath = match.group(1).strip()
+            fence = filepath.rsplit(".", 1)[-1] if "." in filepath else ""
+            return f"```{fence}\n{stub_code(filepath, self.code_lines)}```"
+        return "Namaste! Main DevDost hoon, stub mode mein jawab de raha hoon."
+
+    def invoke(self, payload, *args, **kwargs):
+        text = _flatten(payload)
+        return self._respond(text, self._text_reply(text))
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs):
+        return _StubStructured(self, schema, include_raw)
+
+class _StubStructured:
+    def __init__(self, llm: StubLLM, schema, include_raw: bool):
+        self.llm = llm
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def _build(self, text: str):
+        name = self.schema.__name__
+        request = re.search(r"User request: (.+)", text)
+        request = request.group(1).strip() if request else text[:200]
+        techstack = _techstack_for(request)
+        files = FILES_BY_STACK[techstack]
+
+        with _name_lock:
+            suffix = next(_name_counter)
+        words = re.findall(r"[a-z]+", request.lower())[:2] or ["stub"]
+        project_name = "-".join(words + [str(suffix)])
+
+        plan = {
+            "name": project_name,
+            "description": request[:100],
+            "techstack": techstack,
+            "features": ["Core functionality", "Responsive layout"],
+            "files": [{"path": f, "purpose": f"Stub purpose for {f}"} for f in files],
+        }
+        steps = [{"filepath": f, "task_description": f"Implement {f} for {request[:60]}"} for f in files]
+
+        if name == "ProjectBlueprint":
+            return self.schema(**plan, implementation_steps=steps)
+        if name == "Plan":
+            return self.schema(**plan)
+        if name == "TaskPlan":
+            return self.schema(implementation_steps=steps)
+        if name == "DebugInfo":
+            return self.schema(
+                error_message="stub", diagnosis="Stub diagnosis", fix_type="install_package",
+                filepath=None, fix_content="", explanation="Stub explanation"
+            )
+        return self.schema.model_construct()
+
+    def invoke(self, payload, *args, **kwargs):
+        text = _flatten(payload)
+        parsed = self._build(text)
+        raw = self.llm._respond(text, parsed.model_dump_json())
+        if self.include_raw:
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+        return parsed
+
+def install_fake_scaffold(delay: float = 0.2):
+    """Replace npx/npm scaffolding with a directory + package.json after `delay` seconds"""
+    import scaffold
+
+    def _fake_build(job):
+        time.sleep(delay)
+        job.staging_path.mkdir(parents=True, exist_ok=True)
+        if job.kind != "html":
+            package = {"name": job.dir_name, "version": "0.1.0", "scripts": {}}
+            (job.staging_path / "package.json").write_text(json.dumps(package), encoding="utf-8")
+        return job.kind
+
+    scaffold.ScaffoldJob._build = _fake_build
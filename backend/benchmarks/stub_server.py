@@ -0,0 +1,86 @@
+"""
+Runs agent/app.py exactly like `python app.py` does, but with a stub agent
+and a throwaway PROJECTS_ROOT seeded with projects. Used by load_socketio.py.
+
+Usage (from backend/):
+    python benchmarks/stub_server.py --port 5055 --projects 20 --workdir /tmp/devdost-load
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+AGENT_DIR = BENCH_DIR.parent / "agent"
+
+SEED_FILES = {
+    "index.html": "<!DOCTYPE html>\n<html>\n<head><link rel=\"stylesheet\" href=\"style.css\"></head>\n<body><h1>Seed</h1><script src=\"script.js\"></script></body>\n</html>\n",
+    "style.css": "body { margin: 0; font-family: sans-serif; }\n",
+    "script.js": "console.log('seed project');\n",
+}
+
+class StubAgent:
+    """Answers instantly, streaming a few progress events like the real graph"""
+
+    def __init__(self, progress_events: int = 5, delay: float = 0.0):
+        self.progress_events = progress_events
+        self.delay = delay
+
+    def invoke(self, state, config=None):
+        emit = state.get("_emit_progress")
+        for i in range(self.progress_events):
+            if emit:
+                emit(f"⚙️ stub step {i + 1}/{self.progress_events}", state.get("current_project"))
+            if self.delay:
+                time.sleep(self.delay)
+        history = list(state.get("chat_history", []))
+        history.append({"role": "user", "content": state.get("user_prompt", "")})
+        history.append({"role": "assistant", "content": "✅ stub reply"})
+        return {**state, "chat_history": history, "status": "DONE"}
+
+def seed_projects(projects_root: Path, count: int):
+    for i in range(count):
+        project = projects_root / f"load-project-{i}"
+        project.mkdir(parents=True, exist_ok=True)
+        for name, content in SEED_FILES.items():
+            (project / name).write_text(content, encoding="utf-8")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DevDost backend with a stub agent")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--workdir", required=True)
+    parser.add_argument("--progress-events", type=int, default=5)
+    parser.add_argument("--no-watcher", action="store_true")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    os.environ["DEVDOST_TRACING"] = "0"
+    Path(args.workdir).mkdir(parents=True, exist_ok=True)
+    os.chdir(args.workdir)  # tools.PROJECTS_ROOT is cwd/generated_projects
+    sys.path.insert(0, str(AGENT_DIR))
+
+    import app as backend
+
+    backend.agent = StubAgent(progress_events=args.progress_events)
+    backend.PROJECTS_ROOT.mkdir(parents=True, exist_ok=True)
+    seed_projects(backend.PROJECTS_ROOT, args.projects)
+
+    if not args.no_watcher:
+        threading.Thread(target=backend.start_watcher, daemon=True).start()
+
+    print(f"🧪 Stub backend on :{args.port} ({args.projects} projects in {backend.PROJECTS_ROOT})", flush=True)
+    backend.socketio.run(
+        backend.app,
+        host="127.0.0.1",
+        port=args.port,
+        debug=False,
+        use_reloader=False,
+        allow_unsafe_werkzeug=True
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""The agent modules import each other flat (they run from backend/agent)"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+AGENT_DIR = Path(__file__).resolve().parent.parent / "agent"
+sys.path.insert(0, str(AGENT_DIR))
+
+@pytest.fixture
+def projects_root(tmp_path, monkeypatch):
+    """PROJECTS_ROOT, the project store and the blob pool, all under tmp_path"""
+    import dedup
+    import paths
+    import project_store
+
+    root = tmp_path / "generated_projects"
+    root.mkdir()
+    monkeypatch.setattr(paths.storage, "root", root)
+    monkeypatch.setattr(dedup.pool, "root", root / dedup.BLOB_DIR)
+    monkeypatch.setattr(project_store, "_store", project_store.ProjectStore(tmp_path / "projects.db"))
+    return root
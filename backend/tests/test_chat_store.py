@@ -0,0 +1,93 @@
+import chat_store
+from chat_records import ChatRecord
+from chat_store import ChatStore, split_run_history
+
+class DictRegistry:
+    """The chat half of a SessionRegistry, kept in a dict"""
+
+    def __init__(self):
+        self.chats = {}
+
+    def get_chat(self, key):
+        return self.chats.get(key)
+
+    def put_chat(self, key, data):
+        self.chats[key] = data
+
+    def delete_chat(self, key):
+        self.chats.pop(key, None)
+
+    def prune_chats(self, keep):
+        for key in sorted(self.chats, key=lambda k: self.chats[k]["updated_at"])[:-keep]:
+            del self.chats[key]
+
+def _turns(store, key, count, start=0):
+    for i in range(start, start + count):
+        store.add_turn(key, f"question {i}", f"answer {i}", [f"step {i}"])
+
+def test_window_keeps_the_latest_turns_verbatim():
+    store = ChatStore(window=4)
+    _turns(store, "c", 5)
+    assert [m["content"] for m in store.window_dicts("c")] == ["question 3", "answer 3", "question 4", "answer 4"]
+    assert store.progress("c") == [f"step {i}" for i in range(5)]
+
+def test_context_carries_older_turns_as_a_summary():
+    store = ChatStore(window=4)
+    _turns(store, "c", 3)
+    context = store.context("c")
+    assert context[0].role == "system"
+    assert "user: question 0" in context[0].content
+    assert [r.content for r in context[1:]] == ["question 1", "answer 1", "question 2", "answer 2"]
+
+def test_compact_folds_turns_through_the_summarizer():
+    seen = []
+    def summarizer(summary, turns):
+        seen.append([t.content for t in turns])
+        return "short summary"
+
+    store = ChatStore(window=2, summarizer=summarizer)
+    _turns(store, "c", 2)
+    store.compact("c")
+    assert seen == []  # below SUMMARIZE_BATCH
+    _turns(store, "c", 2, start=2)
+    store.compact("c")
+    assert seen == [["question 0", "answer 0", "question 1", "answer 1", "question 2", "answer 2"]]
+    assert store.context("c")[0].content == "Earlier in this chat:\nshort summary"
+
+def test_seed_drops_progress_and_only_applies_once():
+    store = ChatStore(window=2)
+    store.seed("c", [
+        {"role": "user", "content": "make a game"},
+        {"role": "assistant", "content": "working", "type": "progress"},
+        {"role": "assistant", "content": "done"},
+    ])
+    store.seed("c", [{"role": "user", "content": "ignored"}])
+    assert store.window_dicts("c") == [{"role": "user", "content": "make a game"},
+                                       {"role": "assistant", "content": "done"}]
+
+def test_long_messages_are_clipped():
+    store = ChatStore()
+    store.add_turn("c", "x" * (chat_store.MAX_MESSAGE_CHARS + 10), "ok")
+    assert store.window_dicts("c")[0]["content"].endswith("[+10 chars]")
+
+def test_in_memory_store_evicts_the_oldest_chat(monkeypatch):
+    monkeypatch.setattr(chat_store, "MAX_SESSIONS", 2)
+    store = ChatStore()
+    for key in ("a", "b", "c"):
+        store.add_turn(key, "q", "r")
+    assert not store.has("a") and store.has("b") and store.has("c")
+
+def test_registry_backed_stores_share_history():
+    registry = DictRegistry()
+    first, second = ChatStore(window=4, registry=registry), ChatStore(window=4, registry=registry)
+    first.add_turn("c", "question 0", "answer 0")
+    second.add_turn("c", "question 1", "answer 1")
+    assert [m["content"] for m in first.window_dicts("c")] == ["question 0", "answer 0", "question 1", "answer 1"]
+    first.clear("c")
+    assert not second.has("c")
+
+def test_split_run_history_takes_the_last_reply():
+    history = [ChatRecord("user", "old"), ChatRecord("user", "new"),
+               ChatRecord("assistant", "planning"), {"role": "assistant", "content": "done"}]
+    assert split_run_history(history, 1) == ("done", ["planning"])
+    assert split_run_history(history, 4) == ("", [])
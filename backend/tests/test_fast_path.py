@@ -0,0 +1,50 @@
+import pytest
+
+import fast_path
+from fast_path import is_greeting, switch_query, try_fast_path
+from project_index import ProjectCatalog
+
+@pytest.fixture
+def catalog(projects_root, monkeypatch):
+    for name in ("todo-app", "weather-dashboard"):
+        (projects_root / name).mkdir()
+    fresh = ProjectCatalog()
+    monkeypatch.setattr(fast_path, "catalog", fresh)
+    return fresh
+
+@pytest.mark.parametrize("text", ["hi", "hello bhai", "good morning", "hey there devdost"])
+def test_greetings(text):
+    assert is_greeting(text)
+
+@pytest.mark.parametrize("text", ["hi make a todo app", "todo", "", "hi hi hi hi hi hi"])
+def test_not_greetings(text):
+    assert not is_greeting(text)
+
+def test_greeting_reply_mentions_the_current_project(catalog):
+    reply = try_fast_path("Hello!", "todo-app")
+    assert reply.intent == "CHAT"
+    assert "todo-app" in reply.message
+    assert reply.current_project == "todo-app"
+
+@pytest.mark.parametrize("text", ["show all projects", "list my projects", "projects list", "mere projects dikhao",
+                                  "how many projects are there"])
+def test_project_list(catalog, text):
+    reply = try_fast_path(text)
+    assert reply.intent == "PROJECT_LIST"
+    assert "`todo-app`" in reply.message and "`weather-dashboard`" in reply.message
+
+def test_switch_resolves_a_fuzzy_project_name(catalog):
+    assert switch_query("todo app kholo") == "todo"
+    reply = try_fast_path("switch to weather dashboard", "todo-app")
+    assert reply.intent == "PROJECT_SWITCH"
+    assert reply.current_project == "weather-dashboard"
+
+@pytest.mark.parametrize("text", [
+    "open the snake game",            # no such project
+    "open todo app and add a file",   # a file op, not a plain switch
+    "create a new todo app",
+    "run weather dashboard",
+    "what is react?",
+])
+def test_anything_else_goes_to_the_graph(catalog, text):
+    assert try_fast_path(text, "todo-app") is None
@@ -0,0 +1,67 @@
+import json
+
+import file_batch
+import project_store
+from file_batch import BATCH_PREFIX, JOURNAL_SUFFIX, recover_batches, write_files
+
+def _leftovers(project_path):
+    return sorted(p.name for p in project_path.rglob(f"{BATCH_PREFIX}*"))
+
+def test_commit_writes_every_file_and_cleans_up(projects_root):
+    changed = write_files("demo", {"index.html": "<h1>hi</h1>", "src/app.js": "let a = 1;"})
+
+    project_path = projects_root / "demo"
+    assert [c["name"] for c in changed] == ["index.html", "src/app.js"]
+    assert all(c["created"] for c in changed)
+    assert (project_path / "src" / "app.js").read_text() == "let a = 1;"
+    assert _leftovers(project_path) == []
+    assert project_store.get_project_store().get("demo", scan_missing=False)["file_count"] == 2
+
+def test_commit_notifies_listeners_once_per_batch(projects_root):
+    calls = []
+    listener = lambda project, files: calls.append((project, [f["name"] for f in files]))
+    file_batch.add_commit_listener(listener)
+    try:
+        write_files("demo", {"a.txt": "a", "b.txt": "b"})
+    finally:
+        file_batch.remove_commit_listener(listener)
+    assert calls == [("demo", ["a.txt", "b.txt"])]
+
+def test_recover_rolls_a_journaled_batch_forward(projects_root):
+    project_path = projects_root / "demo"
+    (project_path / "src").mkdir(parents=True)
+    (project_path / "index.html").write_text("old")
+    (project_path / f"{BATCH_PREFIX}abc_index.html").write_text("new")
+    (project_path / "src" / f"{BATCH_PREFIX}abc_app.js").write_text("let b = 2;")
+    (project_path / f"{BATCH_PREFIX}abc{JOURNAL_SUFFIX}").write_text(json.dumps({"files": [
+        [f"{BATCH_PREFIX}abc_index.html", "index.html"],
+        [f"src/{BATCH_PREFIX}abc_app.js", "src/app.js"],
+    ]}))
+
+    assert recover_batches("demo") == 1
+    assert (project_path / "index.html").read_text() == "new"
+    assert (project_path / "src" / "app.js").read_text() == "let b = 2;"
+    assert _leftovers(project_path) == []
+    assert project_store.get_project_store().get("demo", scan_missing=False)["file_count"] == 2
+
+def test_recover_drops_the_temps_of_a_torn_journal(projects_root):
+    project_path = projects_root / "demo"
+    (project_path / "src").mkdir(parents=True)
+    (project_path / "index.html").write_text("old")
+    (project_path / f"{BATCH_PREFIX}abc_index.html").write_text("new")
+    (project_path / "src" / f"{BATCH_PREFIX}abc_app.js").write_text("let b = 2;")
+    (project_path / f"{BATCH_PREFIX}abc{JOURNAL_SUFFIX}").write_text('{"files": [["')
+    (project_path / f"{BATCH_PREFIX}other_keep.txt").write_text("another batch")
+
+    assert recover_batches("demo") == 1
+    assert (project_path / "index.html").read_text() == "old"
+    assert not (project_path / "src" / "app.js").exists()
+    assert _leftovers(project_path) == [f"{BATCH_PREFIX}other_keep.txt"]
+
+def test_recover_without_a_project_is_a_no_op(projects_root):
+    assert recover_batches("missing") == 0
+
+def test_batch_temps_count_as_temp_files():
+    # the watcher, the store walk and snapshots all skip temps through this one check
+    assert project_store.is_temp_file(f"{BATCH_PREFIX}abc_index.html")
+    assert not project_store.is_indexed(f"src/{BATCH_PREFIX}abc_app.js")
@@ -0,0 +1,44 @@
+import sys
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("langgraph")
+pytest.importorskip("langchain_core")
+pytest.importorskip("dotenv")
+
+from conftest import AGENT_DIR
+
+BENCH_DIR = AGENT_DIR.parent / "benchmarks"
+
+@pytest.fixture
+def offline_graph(projects_root, tmp_path, monkeypatch):
+    """graph.py on the benchmark's stub models and fake scaffold, writing under tmp_path"""
+    monkeypatch.setenv("GROQ_API_KEY", "offline-test")
+    monkeypatch.syspath_prepend(str(BENCH_DIR))
+    import graph
+    import scaffold
+    import snapshots
+    import telemetry
+    from stub_llm import StubLLM, install_fake_scaffold
+
+    monkeypatch.setattr(telemetry, "TRACING_ENABLED", False)
+    monkeypatch.setattr(scaffold, "STAGING_ROOT", projects_root / ".scaffold")
+    monkeypatch.setattr(snapshots, "_store", snapshots.SnapshotStore(tmp_path / "snapshots"))
+    monkeypatch.setattr(scaffold.ScaffoldJob, "_build", scaffold.ScaffoldJob._build)  # restored after the test
+    install_fake_scaffold(0)
+    monkeypatch.setattr(graph, "llm_heavy", StubLLM("stub-heavy", latency=0, code_lines=5))
+    monkeypatch.setattr(graph, "llm_fast", StubLLM("stub-fast", latency=0, code_lines=5))
+    return graph
+
+def test_every_chat_entry_is_recorded_once(offline_graph):
+    result = offline_graph.get_agent().invoke(
+        {"user_prompt": "naya portfolio website banao", "chat_history": [], "current_project": None},
+        config={"recursion_limit": 100},
+    )
+
+    entries = Counter((r.role, r.content) for r in result["chat_history"])
+    assert ("user", "naya portfolio website banao") in entries
+    assert ("assistant", "✅ सभी coding steps पूरे हो गए!") in entries
+    assert any("🎉" in content for _, content in entries)
+    assert [entry for entry, count in entries.items() if count > 1] == []
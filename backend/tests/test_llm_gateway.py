@@ -0,0 +1,101 @@
+import asyncio
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from conftest import AGENT_DIR
+from llm_gateway import LLMGateway, call_kwargs, request_key
+
+class EchoModel:
+    model_name = "test-echo"
+
+    def __init__(self, delay=0.0, fail=None):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def ainvoke(self, payload):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise self.fail
+        return f"echo:{payload}"
+
+def test_invoke_returns_the_model_result():
+    assert LLMGateway().invoke(EchoModel(), "hi") == "echo:hi"
+
+def test_invoke_raises_the_model_error():
+    with pytest.raises(ValueError, match="bad prompt"):
+        LLMGateway().invoke(EchoModel(fail=ValueError("bad prompt")), "hi")
+
+def test_identical_inflight_calls_share_one_request():
+    gateway, model = LLMGateway(), EchoModel(delay=0.2)
+
+    async def both():
+        return await asyncio.gather(gateway.ainvoke(model, "same"), gateway.ainvoke(model, "same"))
+
+    assert asyncio.run(both()) == ["echo:same", "echo:same"]
+    assert model.calls == 1
+
+def test_request_key_separates_models_and_prompts():
+    assert request_key("a", "p") == request_key("a", "p")
+    assert request_key("a", "p") != request_key("b", "p")
+    assert request_key("a", "p") != request_key("a", "q")
+
+class LoopModel:
+    model_name = "test-loop"
+
+    async def ainvoke(self, payload, **call):
+        return asyncio.get_running_loop(), call
+
+def test_acall_runs_on_the_gateway_loop():
+    gateway = LLMGateway()
+    loop, call = asyncio.run(gateway.acall(LoopModel(), "hi", call={"config": {"tags": ["t"]}}))
+    assert loop is gateway._ensure_loop()
+    assert call == {"config": {"tags": ["t"]}}
+
+def test_invoke_passes_config_through():
+    _, call = LLMGateway().invoke(LoopModel(), "hi", call=call_kwargs(({"tags": ["t"]},), {}))
+    assert call == {"config": {"tags": ["t"]}}
+    with pytest.raises(TypeError):
+        call_kwargs(({}, {}), {})
+
+MONKEY_PATCHED = textwrap.dedent("""
+    import eventlet
+    eventlet.monkey_patch()
+
+    import asyncio, sys, time
+    sys.path.insert(0, {agent_dir!r})
+    from llm_gateway import gateway
+
+    class SlowModel:
+        model_name = "test-slow"
+        async def ainvoke(self, payload):
+            await asyncio.sleep(0.3)
+            return "echo:" + payload
+
+    ticks = []
+    def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            eventlet.sleep(0.02)
+
+    ticking = eventlet.spawn(ticker)
+    started = time.monotonic()
+    results = list(eventlet.GreenPool().imap(lambda i: gateway.invoke(SlowModel(), "p%d" % i), range(4)))
+    ticking.wait()
+    assert results == ["echo:p%d" % i for i in range(4)], results
+    # the hub kept running while the calls waited on the gateway thread
+    assert ticks and ticks[-1] - started < 0.3, ticks
+    print("ok")
+""")
+
+def test_invoke_under_eventlet_monkey_patch():
+    pytest.importorskip("eventlet")
+    script = MONKEY_PATCHED.format(agent_dir=str(AGENT_DIR))
+    # a deadlocked hub shows up as a timeout, not a hung test run
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
@@ -0,0 +1,32 @@
+import pytest
+
+import model_router
+from model_router import FAST, HEAVY, PROBE_EVERY, record_outcome, route_coder
+
+@pytest.fixture(autouse=True)
+def fresh_history(monkeypatch):
+    monkeypatch.setattr(model_router, "_history", {})
+    monkeypatch.setattr(model_router, "_escalated", {})
+    monkeypatch.delenv("DEVDOST_MODEL_ROUTES", raising=False)
+
+def test_boilerplate_goes_fast_and_retries_go_heavy():
+    assert route_coder("style.css").tier == FAST
+    assert route_coder("style.css", retry=1).tier == HEAVY
+    assert route_coder("src/App.js", techstack="React").tier == HEAVY
+
+def test_failing_fast_tier_escalates_and_recovers_through_probes():
+    for _ in range(5):
+        record_outcome(route_coder("style.css"), ok=False, seconds=0.1, ext=".css")
+
+    tiers = [route_coder("style.css").tier for _ in range(PROBE_EVERY)]
+    assert tiers.count(FAST) == 1 and tiers[-1] == FAST
+
+    # probes that pass bring the failure rate down until fast is the plain choice again
+    for _ in range(20 * PROBE_EVERY):
+        route = route_coder("style.css")
+        if route.reason == "boilerplate/config file":
+            break
+        if route.tier == FAST:
+            record_outcome(route, ok=True, seconds=0.1, ext=".css")
+    else:
+        pytest.fail("fast tier never recovered")
@@ -0,0 +1,44 @@
+from project_index import ProjectCatalog, edit_distance, normalize_name
+
+def _catalog(projects_root, *names):
+    for name in names:
+        (projects_root / name).mkdir()
+    return ProjectCatalog()
+
+def test_normalize_and_edit_distance():
+    assert normalize_name("Todo_App ") == normalize_name("todo-app")
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("", "abc") == 3
+
+def test_exact_name_scores_one(projects_root):
+    catalog = _catalog(projects_root, "todo-app", "weather-dashboard")
+    assert catalog.search("Todo App") == [("todo-app", 1.0)]
+
+def test_search_ranks_the_closest_name_first(projects_root):
+    catalog = _catalog(projects_root, "todo-app", "weather-dashboard", "snake-game")
+    matches = catalog.search("weather")
+    assert matches[0][0] == "weather-dashboard"
+    assert all(score < 1.0 for _, score in matches)
+
+def test_resolve_needs_a_clear_winner(projects_root):
+    catalog = _catalog(projects_root, "todo-app", "weather-dashboard", "chat-app-v1", "chat-app-v2")
+    assert catalog.resolve("weathr dashboard") == "weather-dashboard"
+    assert catalog.resolve("chat app") is None  # two equally good matches
+    assert catalog.resolve("zzzz") is None
+    assert catalog.resolve("") is None
+
+def test_catalog_follows_projects_added_and_removed_on_disk(projects_root):
+    catalog = _catalog(projects_root, "todo-app")
+    assert "todo-app" in catalog
+    (projects_root / "todo-app").rmdir()
+    (projects_root / "snake-game").mkdir()
+    catalog.refresh(force=True)
+    assert catalog.names() == ["snake-game"]
+
+def test_rename_moves_the_index_entry(projects_root):
+    catalog = _catalog(projects_root, "old-name")
+    assert catalog.names() == ["old-name"]
+    (projects_root / "old-name").rename(projects_root / "new-name")
+    catalog.rename("old-name", "new-name")
+    assert catalog.search("new name") == [("new-name", 1.0)]
+    assert catalog.resolve("old name") != "old-name"
@@ -0,0 +1,42 @@
+import pytest
+
+import snapshots
+from snapshots import RUN_LABEL, SnapshotStore, snapshot_before, undo_last_run
+from telemetry import span
+
+@pytest.fixture
+def store(projects_root, tmp_path, monkeypatch):
+    fresh = SnapshotStore(tmp_path / "snapshots")
+    monkeypatch.setattr(snapshots, "_store", fresh)
+    (projects_root / "demo").mkdir()
+    return fresh
+
+def _write(projects_root, name, content):
+    (projects_root / "demo" / name).write_text(content)
+
+def test_one_snapshot_per_run_however_many_deletes(projects_root, store):
+    _write(projects_root, "a.txt", "a")
+    with span("agent.run", kind="run"):
+        for i in range(5):
+            _write(projects_root, f"f{i}.txt", str(i))
+            snapshot_before("demo", "before-delete")
+    assert len(store.list("demo")) == 1
+
+    snapshot_before("demo", "before-delete")  # outside a run: one per call (request)
+    assert len(store.list("demo")) == 2
+
+def test_prune_keeps_the_latest_run_snapshot(projects_root, store, monkeypatch):
+    monkeypatch.setattr(snapshots, "KEEP_SNAPSHOTS", 3)
+    _write(projects_root, "app.js", "original")
+    run = store.take("demo", label=RUN_LABEL)
+    for i in range(6):
+        _write(projects_root, f"f{i}.txt", str(i))
+        store.take("demo", label="before-delete")
+
+    ids = [s["id"] for s in store.list("demo")]
+    assert len(ids) == 4 and ids[-1] == run["id"]
+
+    _write(projects_root, "app.js", "changed")
+    undo_last_run("demo")
+    assert (projects_root / "demo" / "app.js").read_text() == "original"
+    assert not (projects_root / "demo" / "f0.txt").exists()
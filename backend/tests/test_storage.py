@@ -0,0 +1,50 @@
+from storage import FLAT, SHARDED, ProjectStorage, shard_of
+
+def test_flat_layout_keeps_projects_under_root(tmp_path):
+    storage = ProjectStorage(tmp_path, FLAT)
+    assert storage.path_for("todo") == tmp_path / "todo"
+    assert storage.archive_path("todo") == tmp_path / ".archive" / "todo.zip"
+
+def test_sharded_layout_uses_the_name_hash_bucket(tmp_path):
+    storage = ProjectStorage(tmp_path, SHARDED)
+    bucket = shard_of("todo")
+    assert len(bucket) == 2
+    assert storage.path_for("todo") == tmp_path / ".shards" / bucket / "todo"
+    assert storage.archive_path("todo") == tmp_path / ".archive" / bucket / "todo.zip"
+
+def test_sharded_layout_resolves_unmigrated_projects_at_the_flat_path(tmp_path):
+    (tmp_path / "legacy").mkdir()
+    storage = ProjectStorage(tmp_path, SHARDED)
+    assert storage.path_for("legacy") == tmp_path / "legacy"
+
+    assert storage.migrate() == 1
+    assert storage.path_for("legacy") == storage.sharded_path("legacy")
+    assert storage.path_for("legacy").is_dir()
+    assert storage.list_projects() == ["legacy"]
+
+def test_migrate_leaves_projects_present_in_both_layouts(tmp_path):
+    storage = ProjectStorage(tmp_path, SHARDED)
+    (tmp_path / "twice").mkdir()
+    storage.sharded_path("twice").mkdir(parents=True)
+    assert storage.migrate() == 0
+    assert (tmp_path / "twice").is_dir()
+
+def test_unknown_layout_falls_back_to_flat(tmp_path):
+    assert ProjectStorage(tmp_path, "weird").layout == FLAT
+
+def test_list_projects_includes_archives_and_skips_hidden_dirs(tmp_path):
+    storage = ProjectStorage(tmp_path, SHARDED)
+    storage.sharded_path("live").mkdir(parents=True)
+    (tmp_path / ".scaffold").mkdir()
+    storage.archive_path("cold").parent.mkdir(parents=True)
+    storage.archive_path("cold").write_bytes(b"")
+    assert sorted(storage.list_projects()) == ["cold", "live"]
+    assert storage.exists("cold") and storage.is_archived("cold")
+
+def test_locate_maps_paths_back_to_projects(tmp_path):
+    storage = ProjectStorage(tmp_path, SHARDED)
+    assert storage.locate(storage.sharded_path("todo") / "src" / "app.js") == ("todo", "src/app.js")
+    assert storage.locate(tmp_path / "flat" / "index.html") == ("flat", "index.html")
+    assert storage.locate(tmp_path / "todo") == ("todo", "")
+    assert storage.locate(tmp_path / ".blobs" / "ab" / "abcd") == (None, None)
+    assert storage.locate(tmp_path.parent / "elsewhere") == (None, None)
@@ -0,0 +1,55 @@
+import pytest
+
+from validators import scan_source, validate_content
+
+@pytest.mark.parametrize("source", [
+    "const a = [1, 2, {b: (3)}];",
+    "const s = 'it\\'s'; const t = \"}\";",
+    "const re = /[/)]+/g; const half = a / 2;",
+    "const t = `x ${a ? `${b}` : '}'} y`;",
+    "// unbalanced ( in a comment\n/* and { here */",
+    "if (x) return /ab+c/.test(y);",
+])
+def test_valid_js(source):
+    assert scan_source(source) is None
+
+@pytest.mark.parametrize("source, error", [
+    ("function f() {\n  return 1;\n", "'{' opened on line 1 is never closed"),
+    ("const a = [1, 2);", "')' on line 1 does not match '[' opened on line 1"),
+    ("const a = 1;\n}", "unexpected '}' on line 2"),
+    ("const s = 'open;\n", "unterminated string starting on line 1"),
+    ("/* never ends", "unterminated comment starting on line 1"),
+    ("const t = `abc", "unterminated template literal starting on line 1"),
+    ("const t = `a ${b", "unterminated template expression '${'"),
+])
+def test_invalid_js(source, error):
+    assert scan_source(source) == error
+
+def test_jsx_apostrophes_and_closing_tags():
+    source = "const App = () => (\n  <p>Don't panic</p>\n);"
+    assert scan_source(source, jsx=True) is None
+    assert scan_source(source) is not None
+
+@pytest.mark.parametrize("source", [
+    "const A = () => <p>Don't worry :)</p>;",
+    "const L = () => (\n  <ul>{items.map(i => <li key={i}>{i} :)</li>)}</ul>\n);",
+    "const A = () => <div style={{color: 'red'}} title=\"a > b\">[x<br/>{ok ? <b>y)</b> : null}</div>;",
+    "const [v, setV] = useState<string>('');\nconst F = () => <>ok ]</>;",
+])
+def test_jsx_text_is_not_code(source):
+    assert scan_source(source, jsx=True) is None
+
+def test_jsx_expressions_are_still_checked():
+    assert scan_source("const A = () => <p>{f(}</p>;", jsx=True) == "'}' on line 1 does not match '(' opened on line 1"
+    assert scan_source("function A() { return <p>hi</p>;", jsx=True) == "'{' opened on line 1 is never closed"
+
+def test_css_has_no_line_comments():
+    assert scan_source("a { background: url(//cdn.example.com/x.png); }", js=False) is None
+    assert scan_source("a { color: red;", js=False) == "'{' opened on line 1 is never closed"
+
+def test_validate_content_picks_the_validator_by_extension():
+    assert validate_content("app.jsx", "const A = () => <div>Don't</div>;") is None
+    assert validate_content("style.css", "a {").startswith("CSS syntax error")
+    assert validate_content("data.json", "{\"a\": }") is not None
+    assert validate_content("main.py", "def f(:\n") is not None
+    assert validate_content("notes.txt", "((((") is None
@@ -359,6 +359,7 @@ export default function DevDostAI() {
       if (mounted) {
         console.log("✅ Socket connected");
         setSocketConnected(true);
+        socket.emit("watch_project", { project: currentProjectRef.current || null });
       }
     };
 
@@ -545,6 +546,9 @@ export default function DevDostAI() {
   };
 
   useEffect(() => {
+    // the backend only watches projects some client has open
+    socket.emit("watch_project", { project: currentProject || null });
+
     if (currentProject) {
       fetchFiles(currentProject);
     } else {
@@ -639,6 +643,22 @@ export default function DevDostAI() {
       }
     });
 
+    // one event for a batch of written files (agent generation, save all)
+    socket.on("files_batch", (data) => {
+      if (data.project !== currentProjectRef.current) return;
+
+      setFiles((prev) => {
+        const byName = new Map(data.files.map(f => [f.name, f]));
+        const updated = prev.map(f => byName.has(f.name) ? { ...f, content: byName.get(f.name).content } : f);
+        const known = new Set(prev.map(f => f.name));
+        const added = data.files.filter(f => !known.has(f.name));
+        const merged = [...updated, ...added];
+        updatePreview(merged);
+        setFileTree(buildFileTree(merged));
+        return merged;
+      });
+    });
+
     socket.on("ai_progress", (data) => {
       console.log('📡 RECEIVED ai_progress:', data.message);
 
@@ -746,6 +766,12 @@ export default function DevDostAI() {
       }
     });
 
+    // a snapshot restore / undo rewrote the project on disk
+    socket.on("project_restored", (data) => {
+      if (data.project === currentProjectRef.current) fetchFiles(data.project);
+      fetchProjects();
+    });
+
     socket.on("project_deleted", (data) => {
       if (!data.id) data.id = crypto.randomUUID();
       fetchProjects();
@@ -781,12 +807,14 @@ export default function DevDostAI() {
       socket.off("chat_error");
       socket.off("file_updated");
       socket.off("file_created");
+      socket.off("files_batch");
       socket.off("file_deleted");
       socket.off("file_renamed");
       socket.off("ai_progress");
       socket.off("agent_complete");
       socket.off("agent_error");
       socket.off("project_deleted");
+      socket.off("project_restored");
       socket.off("project_status");
       socket.off("terminal_output");
     };
@@ -883,7 +911,8 @@ export default function DevDostAI() {
       socket.emit('chat_message', {
         message: userPrompt || userMessage.content,
         session_id: sessionId,
-        chat_history: chatMessages,
+        // backend keeps the full history; this only seeds chats it has not seen yet
+        chat_history: chatMessages.filter(m => m.type !== 'progress').slice(-20),
         chat_id: currentChatId,
         is_first_message: isFirstUserMessage && !currentChat.isNamed
       });